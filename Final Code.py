@@ -1,100 +1,823 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 from datetime import datetime, timedelta
-from tkcalendar import Calendar
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import sqlite3
-from contextlib import contextmanager
+import queue
+import threading
+import sys
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+# Validación, base de datos, almacén y filtros: el núcleo sin interfaz
+from task_engine import (
+    PRIORITIES, TaskValidationError, build_task, QueryCancelled,
+    TaskImporter, import_from_command_line, TaskFilter, Profiler, TaskEngine,
+    timeline_rows, density_bins,
+)
 
 # ======================
-# BASE DE DATOS (SQLite)
+# EJECUTOR DE BASE DE DATOS
 # ======================
-class DatabaseManager:
-    def __init__(self, db_name="tasks.db"):
-        self.db_name = db_name
-        self._create_tables()
-
-    @contextmanager
-    def _get_cursor(self):
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
+class DatabaseExecutor:
+    """Ejecuta las operaciones de base de datos fuera del hilo de Tk.
+
+    submit() encola la llamada en un hilo de trabajo y devuelve un Future
+    (si se cancela antes de empezar, sus callbacks no se llaman).
+    Los callbacks on_done/on_error nunca se ejecutan en el hilo de trabajo:
+    se devuelven al hilo de Tk con root.after, consultando la cola cada
+    poll_interval ms (~60 fps) solo mientras haya trabajo pendiente. Con un
+    único hilo las operaciones se ejecutan y se notifican en orden de envío.
+    """
+
+    def __init__(self, root, workers=1, poll_interval=16):
+        self.root = root
+        self.poll_interval = poll_interval
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="db")
+        self._results = queue.Queue()  # callbacks listos para el hilo de Tk
+        self._pending = 0
+        self._poll_id = None
+
+    def submit(self, fn, *args, on_done=None, on_error=None, **kwargs):
+        future = self._executor.submit(fn, *args, **kwargs)
+        self._pending += 1
+        future.add_done_callback(lambda f: self._results.put((f, on_done, on_error)))
+        self._schedule()
+        return future
+
+    def call_in_ui(self, fn, *args):
+        """Pide ejecutar fn(*args) en el hilo de Tk desde una tarea en curso"""
+        self._results.put((None, lambda _: fn(*args), None))
+
+    def _schedule(self):
+        if self._poll_id is None:
+            self._poll_id = self.root.after(self.poll_interval, self._poll)
+
+    def _poll(self):
+        self._poll_id = None
         try:
-            yield cursor
-            conn.commit()
+            while True:
+                try:
+                    future, on_done, on_error = self._results.get_nowait()
+                except queue.Empty:
+                    break
+                if future is not None:
+                    self._pending -= 1
+                try:
+                    self._dispatch(future, on_done, on_error)
+                except Exception as error:
+                    # Un callback que falla no deja sin atender al resto de la cola
+                    self.root.report_callback_exception(type(error), error, error.__traceback__)
         finally:
-            conn.close()
-
-    def _create_tables(self):
-        with self._get_cursor() as cursor:
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS tasks (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    title TEXT NOT NULL,
-                    description TEXT,
-                    due_date TEXT,
-                    priority TEXT CHECK(priority IN ('alta', 'media', 'baja')),
-                    status TEXT CHECK(status IN ('pendiente', 'en progreso', 'completada')),
-                    tags TEXT
-                )
-            """)
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_priority ON tasks(priority)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_status ON tasks(status)")
-
-    def add_task(self, task):
-        with self._get_cursor() as cursor:
-            cursor.execute("""
-                INSERT INTO tasks (title, description, due_date, priority, status, tags)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (
-                task['title'],
-                task['description'],
-                task['due_date'],
-                task['priority'],
-                task['status'],
-                ",".join(task['tags']) if task['tags'] else ""
-            ))
-            return cursor.lastrowid
-
-    def get_all_tasks(self):
-        with self._get_cursor() as cursor:
-            cursor.execute("SELECT * FROM tasks")
-            rows = cursor.fetchall()
-            return [{
-                'id': row[0],
-                'title': row[1],
-                'description': row[2],
-                'due_date': row[3],
-                'priority': row[4],
-                'status': row[5],
-                'tags': row[6].split(",") if row[6] else []
-            } for row in rows]
-
-    def update_task(self, task_id, updated_task):
-        with self._get_cursor() as cursor:
-            cursor.execute("""
-                UPDATE tasks 
-                SET title=?, description=?, due_date=?, priority=?, status=?, tags=?
-                WHERE id=?
-            """, (
-                updated_task['title'],
-                updated_task['description'],
-                updated_task['due_date'],
-                updated_task['priority'],
-                updated_task['status'],
-                ",".join(updated_task['tags']) if updated_task['tags'] else "",
-                task_id
-            ))
-
-    def delete_task(self, task_id):
-        with self._get_cursor() as cursor:
-            cursor.execute("DELETE FROM tasks WHERE id=?", (task_id,))
+            if self._pending:
+                self._schedule()
+
+    def _dispatch(self, future, on_done, on_error):
+        if future is None:
+            on_done(None)
+            return
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is None:
+            if on_done is not None:
+                on_done(future.result())
+        elif on_error is not None:
+            on_error(error)
+        else:
+            self.root.report_callback_exception(type(error), error, error.__traceback__)
+
+    @property
+    def busy(self):
+        return self._pending > 0
+
+    def shutdown(self):
+        """Espera a que terminen las operaciones en curso y libera el hilo"""
+        if self._poll_id is not None:
+            self.root.after_cancel(self._poll_id)
+            self._poll_id = None
+        self._executor.shutdown(wait=True)
+
+# ======================
+# LISTA DE TAREAS (Treeview)
+# ======================
+class TaskListView:
+    """Lista de tareas sobre un Treeview que solo toca las filas que cambian.
+
+    Con pocas filas cada tarea tiene su propio item y set_tasks() aplica un
+    diff: borra, inserta o mueve únicamente los items necesarios (los que
+    forman la subsecuencia creciente más larga se quedan quietos). Por encima
+    de virtual_threshold pasa a modo virtual: solo existen los items de la
+    ventana visible más un margen (overscan) y se reciclan al desplazarse, así
+    que el costo de refrescar o hacer scroll no depende del total de tareas.
+    """
+
+    def __init__(self, tree, scrollbar, row_builder, virtual_threshold=500, overscan=10):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.row_builder = row_builder
+        self.virtual_threshold = virtual_threshold
+        self.overscan = overscan
+        self.virtual = False
+        
+        self._ids = []  # orden de las filas (ids de tarea)
+        self._tasks = {}  # id -> tarea
+        self._values = {}  # item -> valores mostrados
+        
+        # Modo completo: un item por tarea, con el id de la tarea como iid
+        self._items = {}  # id -> item
+        self._item_ids = {}  # item -> id
+        
+        # Modo virtual: items reciclables de la ventana materializada
+        self._slots = []
+        self._slot_ids = []
+        self._slot_tasks = {}  # item -> id de la tarea que muestra
+        self._start = 0  # índice de la primera fila materializada
+        self._first = 0  # índice de la primera fila visible
+        
+        self.tree.configure(yscrollcommand=self._on_tree_scroll)
+        self.scrollbar.configure(command=self.yview)
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.tree.bind(sequence, self._on_mousewheel)
+        self.tree.bind("<Configure>", lambda event: self.virtual and self._render())
+
+    def __len__(self):
+        return len(self._ids)
+
+    # ---------------------------
+    # API pública
+    # ---------------------------
+    def set_tasks(self, tasks):
+        """Reemplaza el contenido de la lista por las tareas dadas (en orden)"""
+        tasks = list(tasks)
+        self._ids = [task.id for task in tasks]
+        self._tasks = {task.id: task for task in tasks}
+        
+        virtual = len(tasks) > self.virtual_threshold
+        if virtual != self.virtual:
+            self._clear()
+            self.virtual = virtual
+        
+        if self.virtual:
+            self._render()
+        else:
+            self._apply_diff()
+
+    def upsert(self, task):
+        """Agrega una tarea al final o actualiza su fila si ya está en la lista"""
+        self.extend((task,))
+
+    def extend(self, tasks):
+        """Agrega tareas al final; las que ya están en la lista solo se actualizan"""
+        tasks = list(tasks)
+        for task in tasks:
+            if task.id not in self._tasks:
+                self._ids.append(task.id)
+            self._tasks[task.id] = task
+        
+        if not self.virtual and len(self._ids) > self.virtual_threshold:
+            self.set_tasks(self._tasks[i] for i in self._ids)
+        elif self.virtual:
+            self._render()
+        else:
+            for task in tasks:
+                item = self._items.get(task.id)
+                if item is None:
+                    item = self.tree.insert("", tk.END, iid=str(task.id))
+                    self._items[task.id] = item
+                    self._item_ids[item] = task.id
+                self._show(item, task)
+
+    def remove(self, task_id):
+        """Quita una tarea de la lista si está presente"""
+        if self._tasks.pop(task_id, None) is None:
+            return
+        self._ids.remove(task_id)
+        
+        if self.virtual:
+            self._render()
+        else:
+            item = self._items.pop(task_id)
+            del self._item_ids[item]
+            self._values.pop(item, None)
+            self.tree.delete(item)
+
+    def task_id(self, item):
+        """Devuelve el id de la tarea mostrada en un item del Treeview"""
+        if not item:
+            return None
+        if self.virtual:
+            return self._slot_tasks.get(item)
+        return self._item_ids.get(item)
+
+    def yview(self, *args):
+        """Comando de la barra de desplazamiento"""
+        if not self.virtual:
+            return self.tree.yview(*args)
+        
+        visible = self._visible_rows()
+        if args[0] == "moveto":
+            self._first = int(float(args[1]) * len(self._ids))
+        elif args[0] == "scroll":
+            step = int(args[1])
+            self._first += step * visible if args[2] == "pages" else step
+        self._render()
+
+    # ---------------------------
+    # Modo completo: diff
+    # ---------------------------
+    def _apply_diff(self):
+        new_ids = self._ids
+        wanted = set(new_ids)
+        
+        # Borrar los items de tareas que ya no están
+        for task_id in [i for i in self._items if i not in wanted]:
+            item = self._items.pop(task_id)
+            del self._item_ids[item]
+            self._values.pop(item, None)
+            self.tree.delete(item)
+        
+        # Los items que forman la subsecuencia creciente más larga de sus
+        # posiciones actuales ya están en orden relativo y no se mueven
+        order = [self._item_ids[item] for item in self.tree.get_children()]
+        position = {task_id: index for index, task_id in enumerate(order)}
+        stable = _longest_increasing_subsequence([i for i in new_ids if i in position], position)
+        
+        previous = None
+        for task_id in new_ids:
+            task = self._tasks[task_id]
+            item = self._items.get(task_id)
+            if item is None or task_id not in stable:
+                # Colocar justo después de la tarea anterior en el nuevo orden
+                if item is None:
+                    index = order.index(previous) + 1 if previous is not None else 0
+                    item = self.tree.insert("", index, iid=str(task_id))
+                    self._items[task_id] = item
+                    self._item_ids[item] = task_id
+                else:
+                    order.remove(task_id)
+                    self.tree.detach(item)
+                    index = order.index(previous) + 1 if previous is not None else 0
+                    self.tree.move(item, "", index)
+                order.insert(index, task_id)
+            self._show(item, task)
+            previous = task_id
+
+    def _show(self, item, task):
+        values = self.row_builder(task)
+        if self._values.get(item) != values:
+            self.tree.item(item, values=values)
+            self._values[item] = values
+
+    def _clear(self):
+        self.tree.delete(*self.tree.get_children())
+        self._items, self._item_ids, self._values = {}, {}, {}
+        self._slots, self._slot_ids, self._slot_tasks = [], [], {}
+        self._start = self._first = 0
+
+    # ---------------------------
+    # Modo virtual: ventana reciclable
+    # ---------------------------
+    def _visible_rows(self):
+        rowheight = int(ttk.Style().lookup('Treeview', 'rowheight') or 20)
+        return max(int(self.tree.cget('height')), self.tree.winfo_height() // rowheight, 1)
+
+    def _render(self):
+        total = len(self._ids)
+        visible = self._visible_rows()
+        self._first = max(0, min(self._first, total - visible))
+        start = max(0, self._first - self.overscan)
+        stop = min(total, self._first + visible + self.overscan)
+        
+        focused = self.task_id(self.tree.focus())
+        self._recycle(start, stop)
+        
+        # Mantener la selección sobre la misma tarea aunque cambie de item
+        if focused in self._slot_ids:
+            item = self._slots[self._slot_ids.index(focused)]
+            self.tree.focus(item)
+            self.tree.selection_set(item)
+        elif self.tree.selection():
+            self.tree.selection_set(())
+        
+        if self._slots:
+            self.tree.yview_moveto((self._first - start) / len(self._slots))
+        if total:
+            self.scrollbar.set(self._first / total, min(1.0, (self._first + visible) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def _recycle(self, start, stop):
+        slots, slot_ids = self._slots, self._slot_ids
+        shift = start - self._start
+        
+        # Al desplazarse, los items que salen por un extremo pasan al otro
+        if 0 < shift < len(slots):
+            for item in slots[:shift]:
+                self.tree.move(item, "", tk.END)
+            slots[:] = slots[shift:] + slots[:shift]
+            slot_ids[:] = slot_ids[shift:] + slot_ids[:shift]
+        elif 0 < -shift < len(slots):
+            for item in reversed(slots[shift:]):
+                self.tree.move(item, "", 0)
+            slots[:] = slots[shift:] + slots[:shift]
+            slot_ids[:] = slot_ids[shift:] + slot_ids[:shift]
+        self._start = start
+        
+        # Ajustar la cantidad de items al tamaño de la ventana
+        count = stop - start
+        while len(slots) < count:
+            slots.append(self.tree.insert("", tk.END))
+            slot_ids.append(None)
+        while len(slots) > count:
+            item = slots.pop()
+            slot_ids.pop()
+            self._slot_tasks.pop(item, None)
+            self._values.pop(item, None)
+            self.tree.delete(item)
+        
+        for offset, item in enumerate(slots):
+            task_id = self._ids[start + offset]
+            slot_ids[offset] = task_id
+            self._slot_tasks[item] = task_id
+            self._show(item, self._tasks[task_id])
+
+    def _on_tree_scroll(self, first, last):
+        if not self.virtual:
+            self.scrollbar.set(first, last)
+
+    def _on_mousewheel(self, event):
+        if not self.virtual:
+            return None
+        if event.num == 4 or event.delta > 0:
+            self.yview("scroll", -3, "units")
+        else:
+            self.yview("scroll", 3, "units")
+        return "break"
+
+
+def _longest_increasing_subsequence(ids, position):
+    """Conjunto de ids cuya posición forma la subsecuencia creciente más larga"""
+    tails = []  # índice (en ids) del último elemento de cada longitud
+    parents = [None] * len(ids)
+    for index, task_id in enumerate(ids):
+        lo, hi = 0, len(tails)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if position[ids[tails[mid]]] < position[task_id]:
+                lo = mid + 1
+            else:
+                hi = mid
+        parents[index] = tails[lo - 1] if lo else None
+        if lo == len(tails):
+            tails.append(index)
+        else:
+            tails[lo] = index
+    
+    stable = set()
+    index = tails[-1] if tails else None
+    while index is not None:
+        stable.add(ids[index])
+        index = parents[index]
+    return stable
+
+# ======================
+# LÍNEA DE TIEMPO
+# ======================
+def _load_chart_modules():
+    """Importa matplotlib y numpy la primera vez que se necesita el gráfico.
+
+    Son las dependencias más lentas de importar, así que no se cargan al
+    arrancar; quedan como globales del módulo para TimelineChart.
+    """
+    global np, plt, mdates, ticker, FigureCanvasTkAgg, NavigationToolbar2Tk, LineCollection, PolyCollection
+    import numpy as np
+    import matplotlib.pyplot as plt
+    import matplotlib.dates as mdates
+    import matplotlib.ticker as ticker
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+    from matplotlib.collections import LineCollection, PolyCollection
+
+
+class TimelineChart:
+    """Línea de tiempo con artistas persistentes.
+
+    Todas las barras son una sola LineCollection y las etiquetas salen de un
+    pool de Text que se reutiliza entre actualizaciones, así que set_tasks()
+    solo cambia datos y no crea artistas. Si los límites de los ejes no
+    cambian se redibujan únicamente los artistas animados sobre el fondo
+    guardado (blitting); tight_layout y el dibujo completo quedan para cuando
+    cambian los límites. Con más filas que max_labels se etiqueta una de cada
+    tantas para que el pool no crezca con la cantidad de tareas.
+
+    Por encima de lod_threshold tareas se pasa a modo densidad: barras
+    apiladas por prioridad con la cantidad de tareas por día, semana o mes
+    según el rango visible. Al hacer zoom o desplazar el eje x se vuelve a
+    agrupar solo ese rango.
+    """
+
+    COLORS = {'alta': '#e63946', 'media': '#ffbe0b', 'baja': '#2a9d8f'}
+    # Tareas sin prioridad o con una que no está en PRIORITIES
+    DEFAULT_COLOR = '#8d99ae'
+
+    def __init__(self, ax, max_labels=40, lod_threshold=500):
+        _load_chart_modules()
+        self.ax = ax
+        self.fig = ax.figure
+        self.canvas = self.fig.canvas
+        self.max_labels = max_labels
+        self.lod_threshold = lod_threshold
+        self._rows = None
+        self._x = None
+        self._colors = None
+        self._limits = None
+        self._background = None
+        self._updating = False
+        self._epoch = mdates.date2num(np.datetime64('1970-01-01', 'D'))
+        
+        self._bars = LineCollection([], linewidths=3, animated=True)
+        ax.add_collection(self._bars)
+        self._labels = []
+        self._empty = ax.text(0.5, 0.5, 'No hay tareas para mostrar', transform=ax.transAxes,
+                              ha='center', va='center', fontsize=12, color='white', animated=True)
+        
+        # Modo densidad: días de cada tarea, código de prioridad y barras apiladas
+        self._days = None
+        self._codes = None
+        self._density = PolyCollection([], animated=True, visible=False)
+        ax.add_collection(self._density)
+        self._caption = ax.text(0.01, 0.97, '', transform=ax.transAxes, ha='left', va='top',
+                                color='white', animated=True, visible=False)
+        # Una columna por prioridad y la última para las desconocidas (ver density_bins)
+        self._priority_colors = np.array([self.COLORS[p] for p in PRIORITIES] + [self.DEFAULT_COLOR])
+        
+        ax.xaxis_date()
+        ax.grid(True, color='#4d4d4d')
+        ax.set_facecolor('#2d2d2d')
+        # Cada dibujo completo (también al redimensionar) renueva el fondo
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+        ax.callbacks.connect('xlim_changed', self._on_xlim_changed)
+
+    def set_tasks(self, tasks, force=False):
+        """Muestra las tareas con fecha, ordenadas por vencimiento"""
+        rows = timeline_rows(tasks)
+        if rows == self._rows and not force:
+            return
+        self._rows = rows
+        
+        days = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        if len(rows) > self.lod_threshold:
+            codes = {priority: code for code, priority in enumerate(PRIORITIES)}
+            limits = self._show_density(days, np.array([codes.get(row[2], -1) for row in rows], dtype=np.int64))
+        else:
+            limits = self._show_rows(rows, days + self._epoch)
+        self._render(limits, not rows, force)
+
+    def set_density(self, days, codes):
+        """Modo densidad directo desde arreglos (por ejemplo, de TaskColumns).
+
+        days son días desde 1970-01-01 en orden ascendente y codes el índice
+        de la prioridad de cada tarea en PRIORITIES.
+        """
+        self._rows = None
+        limits = self._show_density(days, codes) if len(days) else self._show_rows([], days)
+        self._render(limits, not len(days))
+
+    def _render(self, limits, empty, force=False):
+        self._empty.set_visible(empty)
+        if empty:
+            limits = self._limits
+        if force or limits != self._limits:
+            self._relayout(limits)
+        else:
+            self._blit()
+
+    def refresh(self):
+        """Redibuja todo, recalculando el layout"""
+        self._relayout(self._limits)
+
+    def _show_rows(self, rows, x):
+        self._days = self._codes = None
+        self._density.set_visible(False)
+        self._caption.set_visible(False)
+        self._bars.set_visible(True)
+        
+        # Solo se reemplazan los datos que cambiaron
+        if not np.array_equal(x, self._x):
+            self._x = x
+            y = np.arange(len(rows), dtype=float)
+            segments = np.empty((len(rows), 2, 2))
+            segments[:, :, 0] = x[:, None]
+            segments[:, 0, 1] = y - 0.4
+            segments[:, 1, 1] = y + 0.4
+            self._bars.set_segments(segments)
+        colors = [self.COLORS.get(row[2], self.DEFAULT_COLOR) for row in rows]
+        if colors != self._colors:
+            self._colors = colors
+            self._bars.set_color(colors)
+        self._update_labels(rows, x)
+        if not rows:
+            return None
+        return ('filas', x.min() - 2, x.max() + 5, -1, len(rows))
+
+    def _show_density(self, days, codes):
+        self._bars.set_visible(False)
+        for label in self._labels:
+            label.set_visible(False)
+        self._x = self._colors = None
+        self._density.set_visible(True)
+        self._caption.set_visible(True)
+        
+        self._days = days
+        self._codes = codes
+        start = self._epoch + days[0] - 2
+        end = self._epoch + days[-1] + 5
+        return ('densidad', start, end, 0, self._aggregate(start, end))
+
+    def _aggregate(self, start, end):
+        """Agrupa por periodo y prioridad las tareas entre start y end.
+
+        Devuelve la altura máxima de las barras apiladas.
+        """
+        period, total, starts, widths, counts = density_bins(self._days, self._codes,
+                                                             start - self._epoch, end - self._epoch)
+        self._caption.set_text(f"{total:,} tareas por {period}")
+        
+        tops = counts.cumsum(axis=1)
+        bottoms = tops - counts
+        
+        # Un rectángulo por cada (periodo, prioridad) con tareas
+        bucket_index, priority = np.nonzero(counts)
+        left = starts[bucket_index] + self._epoch
+        right = left + widths[bucket_index] * 0.9
+        bottom = bottoms[bucket_index, priority]
+        top = tops[bucket_index, priority]
+        verts = np.stack([np.column_stack([left, bottom]), np.column_stack([left, top]),
+                          np.column_stack([right, top]), np.column_stack([right, bottom])], axis=1)
+        self._density.set_verts(verts)
+        self._density.set_facecolor(self._priority_colors[priority])
+        return max(1, int(tops[:, -1].max()) if len(tops) else 0) * 1.1
+
+    def _on_xlim_changed(self, ax):
+        # Zoom o desplazamiento: volver a agrupar solo el rango visible
+        if self._updating or self._days is None:
+            return
+        start, end = ax.get_xlim()
+        self._updating = True
+        try:
+            ax.set_ylim(0, self._aggregate(start, end))
+        finally:
+            self._updating = False
+
+    def _update_labels(self, rows, x):
+        step = -(-len(rows) // self.max_labels) or 1
+        indexes = range(0, len(rows), step)
+        while len(self._labels) < len(indexes):
+            self._labels.append(self.ax.text(0, 0, '', va='center', color='white', animated=True))
+        
+        for label, i in zip(self._labels, indexes):
+            position = (x[i] + 1, i)
+            if label.get_position() != position:
+                label.set_position(position)
+            if label.get_text() != rows[i][3]:
+                label.set_text(rows[i][3])
+            label.set_visible(True)
+        for label in self._labels[len(indexes):]:
+            label.set_visible(False)
+
+    def _relayout(self, limits):
+        self._limits = limits
+        if limits is not None:
+            mode, x0, x1, y0, y1 = limits
+            if mode == 'filas':
+                self.ax.yaxis.set_major_locator(ticker.NullLocator())
+            else:
+                self.ax.yaxis.set_major_locator(ticker.MaxNLocator(integer=True))
+            self._updating = True
+            try:
+                self.ax.set_xlim(x0, x1)
+                self.ax.set_ylim(y0, y1)
+            finally:
+                self._updating = False
+            # Rotar etiquetas de fecha
+            for label in self.ax.get_xticklabels():
+                label.set_rotation(45)
+                label.set_ha('right')
+        self.fig.tight_layout()
+        self.canvas.draw()
+
+    def _blit(self):
+        if self._background is None:
+            self.canvas.draw()
+            return
+        self.canvas.restore_region(self._background)
+        self._draw_animated()
+        self.canvas.blit(self.fig.bbox)
+
+    def _on_draw(self, event):
+        self._background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self._draw_animated()
+
+    def _draw_animated(self):
+        for artist in (self._bars, self._density, self._caption, *self._labels, self._empty):
+            if artist.get_visible():
+                self.ax.draw_artist(artist)
+
+# ======================
+# CALENDARIO DE TAREAS
+# ======================
+class CalendarEventLayer:
+    """Eventos de un tkcalendar.Calendar sincronizados con las tareas por id.
+
+    Indexa todas las tareas por fecha pero solo crea eventos para los días a
+    la vista (el mes mostrado y los días vecinos que completan las semanas),
+    con un máximo de max_per_day por día más un evento "y N más". Guarda id
+    de tarea -> id de evento, así que set_tasks(), upsert() y remove() solo
+    crean, mueven, reetiquetan o borran los eventos que cambiaron. Al cambiar
+    de mes se hace lo mismo con los días que entran y salen de la vista.
+    """
+
+    TAG_COLORS = {'alta': '#e63946', 'media': '#ffbe0b', 'baja': '#2a9d8f'}
+    PRIORITY_ORDER = {'alta': 0, 'media': 1, 'baja': 2}
+
+    def __init__(self, calendar, max_per_day=15):
+        self.calendar = calendar
+        self.max_per_day = max_per_day
+        self._tasks = {}  # id -> tarea con fecha
+        self._by_day = defaultdict(set)  # date -> ids
+        self._visible = set()  # dates de los días a la vista
+        
+        self._events = {}  # id de tarea -> id de evento
+        self._shown = {}  # id de tarea -> (día, texto, tag) dibujados
+        self._drawn = defaultdict(set)  # día -> ids de tarea con evento
+        self._overflow = {}  # día -> (id de evento, texto) del resumen "y N más"
+        
+        for priority, color in self.TAG_COLORS.items():
+            calendar.tag_config(priority, background=color, foreground='black')
+        calendar.bind("<<CalendarMonthChanged>>", lambda event: self.refresh(), add="+")
+
+    # ---------------------------
+    # API pública
+    # ---------------------------
+    def set_tasks(self, tasks):
+        """Reemplaza las tareas; solo se tocan los eventos de los días que cambian"""
+        self._tasks = {}
+        self._by_day = defaultdict(set)
+        for task in tasks:
+            if task.due is not None:
+                self._tasks[task.id] = task
+                self._by_day[task.due].add(task.id)
+        self.refresh()
+
+    def upsert(self, task):
+        old = self._tasks.pop(task.id, None)
+        if old is not None:
+            self._by_day[old.due].discard(task.id)
+        if task.due is not None:
+            self._tasks[task.id] = task
+            self._by_day[task.due].add(task.id)
+        for day in {old.due if old is not None else None, task.due}:
+            if day in self._visible:
+                self._sync_day(day)
+
+    def remove(self, task_id):
+        old = self._tasks.pop(task_id, None)
+        if old is not None:
+            self._by_day[old.due].discard(task_id)
+            if old.due in self._visible:
+                self._sync_day(old.due)
+
+    def visible_range(self):
+        """Primer y último día a la vista (date)"""
+        days = self._visible_days()
+        return min(days), max(days)
+
+    def refresh(self):
+        """Sincroniza los eventos con los días a la vista (al cambiar de mes)"""
+        previous = set(self._drawn) | set(self._overflow)
+        self._visible = self._visible_days()
+        for day in previous | set(self._visible):
+            self._sync_day(day)
+
+    # ---------------------------
+    # Eventos
+    # ---------------------------
+    def _visible_days(self):
+        month, year = self.calendar.get_displayed_month()
+        first = datetime(year, month, 1).date()
+        if self.calendar.cget('firstweekday') == 'sunday':
+            offset = (first.weekday() + 1) % 7
+        else:
+            offset = first.weekday()
+        start = first - timedelta(days=offset)
+        # tkcalendar siempre muestra 6 semanas
+        return {start + timedelta(days=i) for i in range(42)}
+
+    def _sync_day(self, day):
+        wanted = []
+        if day in self._visible:
+            order = self.PRIORITY_ORDER
+            wanted = sorted(self._by_day.get(day, ()),
+                            key=lambda task_id: (order.get(self._tasks[task_id].priority, 3), task_id))
+        hidden = 0
+        if len(wanted) > self.max_per_day:
+            hidden = len(wanted) - (self.max_per_day - 1)
+            wanted = wanted[:self.max_per_day - 1]
+        
+        for task_id in self._drawn[day] - set(wanted):
+            self._remove_event(task_id)
+        for task_id in wanted:
+            self._show(task_id, day)
+        self._show_overflow(day, hidden)
+        if not self._drawn[day]:
+            del self._drawn[day]
+
+    def _show(self, task_id, day):
+        task = self._tasks[task_id]
+        look = (day, task.title, task.priority)
+        event = self._events.get(task_id)
+        if event is None:
+            self._events[task_id] = self.calendar.calevent_create(day, task.title, tags=[task.priority])
+        elif self._shown[task_id] != look:
+            changes = {'text': task.title, 'tags': [task.priority]}
+            old_day = self._shown[task_id][0]
+            if old_day != day:
+                changes['date'] = day
+                self._drawn[old_day].discard(task_id)
+            self.calendar.calevent_configure(event, **changes)
+        self._shown[task_id] = look
+        self._drawn[day].add(task_id)
+
+    def _remove_event(self, task_id):
+        day = self._shown.pop(task_id)[0]
+        self._drawn[day].discard(task_id)
+        self.calendar.calevent_remove(self._events.pop(task_id))
+
+    def _show_overflow(self, day, hidden):
+        event, text = self._overflow.get(day, (None, None))
+        if not hidden:
+            if event is not None:
+                self.calendar.calevent_remove(event)
+                del self._overflow[day]
+            return
+        new_text = f"… y {hidden} más"
+        if event is None:
+            event = self.calendar.calevent_create(day, new_text)
+        elif text != new_text:
+            self.calendar.calevent_configure(event, text=new_text)
+        self._overflow[day] = (event, new_text)
+
+# ======================
+# INSTRUMENTACIÓN
+# ======================
+class ProfilerOverlay:
+    """Tabla de p50/p95 por etapa sobre la ventana principal (F12 la muestra u oculta)"""
+
+    def __init__(self, root, profiler, interval=500):
+        self.root = root
+        self.profiler = profiler
+        self.interval = interval
+        self._after = None
+        self.label = tk.Label(root, font=('Courier', 9), justify=tk.LEFT, anchor='nw',
+                              bg='#111111', fg='#e0e0e0', padx=6, pady=4)
+
+    @property
+    def visible(self):
+        return self._after is not None
+
+    def toggle(self, event=None):
+        if self.visible:
+            self.root.after_cancel(self._after)
+            self._after = None
+            self.label.place_forget()
+        else:
+            self.label.place(relx=1.0, y=0, anchor='ne')
+            self.label.lift()
+            self._refresh()
+
+    def _refresh(self):
+        lines = [f"{'etapa':<38}{'n':>7}{'p50 ms':>10}{'p95 ms':>10}  última llamada"]
+        for stage, (calls, p50, p95, counters) in sorted(self.profiler.stats().items()):
+            detail = " ".join(f"{name}={value}" for name, value in counters.items())
+            lines.append(f"{stage:<38}{calls:>7}{p50:>10.2f}{p95:>10.2f}  {detail}")
+        self.label.configure(text="\n".join(lines))
+        self._after = self.root.after(self.interval, self._refresh)
 
 # ======================
 # INTERFAZ GRÁFICA
 # ======================
 class TaskManager:
-    def __init__(self, root):
+    """Vista de Tkinter sobre TaskEngine: formularios, lista, gráfico y calendario"""
+
+    # Filtrado en vivo: espera tras la última tecla y tamaño de cada tanda
+    FILTER_DELAY = 250
+    STREAM_CHUNK = 2000
+    # Cada cuántos ms se consultan los cambios de otras instancias
+    SYNC_INTERVAL = 1000
+    # Etapas propias que mide el Profiler (además de la base, la lista,
+    # el gráfico y el calendario)
+    PROFILED_METHODS = ("apply_filters", "update_tasks_list", "update_timeline_chart",
+                        "show_calendar_tasks", "update_calendar_events")
+    
+    def __init__(self, root, profiler=None):
         self.root = root
         self.root.title("Gestor de Tareas Avanzado")
         self.root.geometry("1200x700")
@@ -103,15 +826,44 @@ class TaskManager:
         # Configuración de estilos
         self._setup_styles()
         
-        # Base de datos
-        self.db = DatabaseManager()
-        self.tasks = self.db.get_all_tasks()
-        self.filtered_tasks = []
+        # Base de datos, almacén y filtros
+        self.engine = TaskEngine()
+        self.db = self.engine.db
+        self.tasks = self.engine.tasks
+        self.change_feed = self.engine.change_feed
+        self.paged = self.engine.paged
+        
+        # Instrumentación opcional: tiempos por etapa, overlay con F12
+        self.profiler = profiler
+        self.profiler_overlay = None
+        if profiler is not None:
+            profiler.instrument(self.db, Profiler.DB_METHODS, "DatabaseManager")
+            profiler.instrument(self, self.PROFILED_METHODS, "TaskManager")
+            self.profiler_overlay = ProfilerOverlay(self.root, profiler)
+            self.root.bind("<F12>", self.profiler_overlay.toggle)
+        
+        # Las operaciones de base de datos corren en un hilo aparte
+        self.db_executor = DatabaseExecutor(self.root)
+        self._sync_after = None
+        self._syncing = False  # aplicando un lote de cambios ajenos
+        self._sync_refresh = False
+        self._sync_chart = False
+        self.filtered_tasks = {}  # id -> tarea visible con los filtros actuales
+        self.calendar_window = None  # calendario grande, se crea al abrirlo
+        self.calendar_events = None
         
         # Variables para filtros
         self.filter_priority = tk.StringVar(value="Todas")
         self.filter_status = tk.StringVar(value="Todas")
         self.filter_tags = tk.StringVar(value="")
+        self.filter_search = tk.StringVar(value="")
+        self._filter_generation = 0
+        self._filter_after = None  # filtrado pendiente tras la última tecla
+        self._stream_after = None  # siguiente tanda de resultados
+        self._filter_cancel = threading.Event()  # corta las consultas del filtro anterior
+        self._filter_futures = []
+        for variable in (self.filter_priority, self.filter_status, self.filter_tags, self.filter_search):
+            variable.trace_add("write", self.schedule_filters)
         
         # Variables para nueva tarea
         self.new_task_title = tk.StringVar()
@@ -123,6 +875,107 @@ class TaskManager:
         
         # Crear widgets
         self.create_widgets()
+        
+        # Aplicar solo los cambios de cada escritura sobre la vista
+        self.tasks.subscribe(self.on_task_changed)
+        
+        # Cargar las tareas sin bloquear la ventana
+        if self.paged:
+            self.load_columns()
+        else:
+            self.load_tasks(first_page=True)
+        
+        # Cerrar el pool de conexiones al salir
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+    
+    def on_close(self):
+        """Libera las conexiones de la base de datos y cierra la ventana"""
+        self._cancel_filter()
+        if self._sync_after is not None:
+            self.root.after_cancel(self._sync_after)
+            self._sync_after = None
+        self.db_executor.shutdown()
+        self.engine.close()
+        if self.profiler is not None and self.profiler.trace_path:
+            self.profiler.dump_trace(self.profiler.trace_path)
+        self.root.destroy()
+    
+    def load_tasks(self, first_page=False):
+        """Lee todas las tareas y arma los índices de filtros en segundo plano.
+
+        Con first_page se muestra antes una primera página leída con LIMIT,
+        para que la lista aparezca sin esperar a la carga completa.
+        """
+        if first_page:
+            self.db_executor.submit(self.db.query_tasks, limit=self.engine.PAGE_SIZE,
+                                    on_done=self._show_first_page, on_error=self.show_db_error)
+        self.db_executor.submit(self.engine.read_tasks, on_done=self._install_tasks, on_error=self.show_db_error)
+    
+    def _show_first_page(self, tasks):
+        if self.engine.filter_engine is None:
+            self.tasks.remember(tasks)
+            self.task_list.set_tasks(tasks)
+    
+    def _install_tasks(self, result):
+        self.engine.install_tasks(result)
+        self.apply_filters()
+        self._schedule_sync()
+    
+    def load_columns(self):
+        """Construye la caché columnar en segundo plano (modo paginado)"""
+        self.db_executor.submit(self.engine.read_columns, on_done=self._install_columns,
+                                on_error=self.show_db_error)
+    
+    def _install_columns(self, columns):
+        self.engine.install_columns(columns)
+        self.apply_filters()
+        self._schedule_sync()
+    
+    def _schedule_sync(self):
+        if self._sync_after is None:
+            self._sync_after = self.root.after(self.SYNC_INTERVAL, self.poll_changes)
+    
+    def poll_changes(self):
+        """Trae los cambios de otras instancias: una consulta indexada por ciclo"""
+        def apply(changes):
+            self._sync_after = None
+            if changes is None:
+                # Demasiados cambios juntos: sale más barato recargar una vez
+                if self.paged:
+                    self.load_columns()
+                else:
+                    self.load_tasks()
+            else:
+                self.apply_remote_changes(changes)
+                self._schedule_sync()
+        
+        def failed(error):
+            self._sync_after = None
+            # Un bloqueo pasajero no merece un diálogo: se reintenta en el próximo ciclo
+            if self.db.is_locked(error):
+                self._schedule_sync()
+            else:
+                self.show_db_error(error)
+        
+        self.db_executor.submit(self.engine.poll_changes, on_done=apply, on_error=failed)
+    
+    def apply_remote_changes(self, changes):
+        """Aplica un lote de cambios ajenos refrescando la vista una sola vez"""
+        if not changes:
+            return
+        self._syncing = True
+        try:
+            self.tasks.apply_changes(changes)
+        finally:
+            self._syncing = False
+        if self._sync_refresh:
+            self._refresh_filtered()
+        elif self._sync_chart:
+            self.update_timeline_chart()
+        self._sync_refresh = self._sync_chart = False
+    
+    def show_db_error(self, error):
+        messagebox.showerror("Error", f"Error de base de datos: {error}")
     
     def _setup_styles(self):
         """Configura los estilos visuales de la aplicación"""
@@ -205,7 +1058,8 @@ class TaskManager:
         ttk.Label(form_frame, text="Etiquetas (separadas por comas):").grid(row=5, column=0, sticky=tk.W, pady=2)
         ttk.Entry(form_frame, textvariable=self.new_task_tags, width=30).grid(row=5, column=1, pady=2, padx=5)
         
-        ttk.Button(form_frame, text="Agregar Tarea", command=self.add_task, style='Accent.TButton').grid(row=6, column=1, pady=10)
+        self.add_button = ttk.Button(form_frame, text="Agregar Tarea", command=self.add_task, style='Accent.TButton')
+        self.add_button.grid(row=6, column=1, pady=10)
         
         # ---------------------------
         # Panel izquierdo - Filtros
@@ -224,7 +1078,12 @@ class TaskManager:
         ttk.Label(filter_frame, text="Etiquetas:").grid(row=2, column=0, sticky=tk.W, pady=2)
         ttk.Entry(filter_frame, textvariable=self.filter_tags, width=15).grid(row=2, column=1, pady=2, padx=5)
         
-        ttk.Button(filter_frame, text="Aplicar Filtros", command=self.apply_filters, style='Accent.TButton').grid(row=3, column=1, pady=10)
+        ttk.Label(filter_frame, text="Buscar:").grid(row=3, column=0, sticky=tk.W, pady=2)
+        search_entry = ttk.Entry(filter_frame, textvariable=self.filter_search, width=15)
+        search_entry.grid(row=3, column=1, pady=2, padx=5)
+        search_entry.bind("<Return>", lambda event: self.apply_filters())
+        
+        ttk.Button(filter_frame, text="Aplicar Filtros", command=self.apply_filters, style='Accent.TButton').grid(row=4, column=1, pady=10)
         
         # ---------------------------
         # Panel derecho - Lista de tareas
@@ -249,10 +1108,16 @@ class TaskManager:
         self.tasks_tree.pack(fill=tk.BOTH, expand=True)
         
         # Barra de desplazamiento
-        scrollbar = ttk.Scrollbar(tasks_frame, orient=tk.VERTICAL, command=self.tasks_tree.yview)
-        self.tasks_tree.configure(yscroll=scrollbar.set)
+        scrollbar = ttk.Scrollbar(tasks_frame, orient=tk.VERTICAL)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
+        # Vista con diff de filas y modo virtual para listas grandes
+        self.task_list = TaskListView(self.tasks_tree, scrollbar, self._task_row)
+        if self.profiler is not None:
+            self.profiler.instrument(self.task_list, ("set_tasks", "extend", "remove"), "TaskListView")
+            self.profiler.count_calls(self.tasks_tree, {'insert': 'insertados', 'move': 'movidos',
+                                                        'delete': 'borrados', 'item': 'actualizados'})
+        
         # Botones para editar/eliminar
         button_frame = ttk.Frame(tasks_frame)
         button_frame.pack(fill=tk.X, pady=(5, 0))
@@ -260,6 +1125,14 @@ class TaskManager:
         ttk.Button(button_frame, text="Editar", command=self.edit_task, style='Accent.TButton').pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Eliminar", command=self.delete_task, style='Danger.TButton').pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Ver Detalles", command=self.view_details).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Importar...", command=self.import_tasks).pack(side=tk.LEFT, padx=5)
+        
+        # Navegación entre páginas (solo con bases grandes)
+        if self.paged:
+            ttk.Button(button_frame, text="Siguiente ▶", command=self.next_page).pack(side=tk.RIGHT, padx=5)
+            self.page_label = ttk.Label(button_frame, text="")
+            self.page_label.pack(side=tk.RIGHT, padx=5)
+            ttk.Button(button_frame, text="◀ Anterior", command=self.previous_page).pack(side=tk.RIGHT, padx=5)
         
         # ---------------------------
         # Panel derecho - Calendario
@@ -267,73 +1140,74 @@ class TaskManager:
         calendar_frame = ttk.LabelFrame(right_panel, text="Calendario", padding=10)
         calendar_frame.pack(fill=tk.BOTH, expand=True, pady=(10, 0))
         
-        # Calendario interactivo
-        self.calendar = Calendar(calendar_frame, selectmode='day', date_pattern='yyyy-mm-dd',
-                               background='#3d3d3d', foreground='white', headersbackground='#284b63',
-                               normalbackground='#3d3d3d', weekendbackground='#4d4d4d')
-        self.calendar.pack(fill=tk.BOTH, expand=True)
-        
         # Visualización de tareas en el calendario
         ttk.Button(calendar_frame, text="Mostrar Tareas en Calendario", 
-                  command=self.show_calendar_tasks, style='Accent.TButton').pack(pady=5)
+                  command=self.show_calendar_tasks, style='Accent.TButton').pack(side=tk.BOTTOM, pady=5)
         
-        # Gráfico de tareas pendientes
-        self.create_timeline_chart(right_panel)
+        # Calendario interactivo (se construye después del primer dibujo)
+        self.calendar = None
+        self.build_when_exposed(calendar_frame, self.create_calendar)
+        
+        # Gráfico de tareas pendientes (matplotlib se importa al mostrarlo)
+        chart_frame = ttk.LabelFrame(right_panel, text="Línea de Tiempo de Tareas", padding=10)
+        chart_frame.pack(fill=tk.BOTH, expand=True, pady=(10, 0))
+        self.timeline = None
+        self.build_when_exposed(chart_frame, self.create_timeline_chart)
         
         # Cargar datos iniciales
         self.apply_filters()
     
-    def create_timeline_chart(self, parent):
-        chart_frame = ttk.LabelFrame(parent, text="Línea de Tiempo de Tareas", padding=10)
-        chart_frame.pack(fill=tk.BOTH, expand=True, pady=(10, 0))
+    def build_when_exposed(self, frame, build):
+        """Llama a build(frame) cuando el frame se muestra por primera vez.
+
+        El callback se encola con after_idle para que Tk termine de pintar la
+        ventana antes de construir el widget.
+        """
+        def on_map(event):
+            frame.unbind("<Map>", binding)
+            self.root.after_idle(build, frame)
+        binding = frame.bind("<Map>", on_map)
+    
+    def create_calendar(self, calendar_frame):
+        from tkcalendar import Calendar
         
+        self.calendar = Calendar(calendar_frame, selectmode='day', date_pattern='yyyy-mm-dd',
+                               background='#3d3d3d', foreground='white', headersbackground='#284b63',
+                               normalbackground='#3d3d3d', weekendbackground='#4d4d4d')
+        self.calendar.pack(fill=tk.BOTH, expand=True)
+    
+    def create_timeline_chart(self, chart_frame):
+        _load_chart_modules()
         plt.style.use('dark_background')
         self.fig, self.ax = plt.subplots(figsize=(8, 3), facecolor='#2d2d2d')
         self.canvas = FigureCanvasTkAgg(self.fig, master=chart_frame)
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self.timeline = TimelineChart(self.ax)
+        if self.profiler is not None:
+            self.profiler.instrument(self.timeline, ("set_tasks", "set_density"), "TimelineChart")
+            self.profiler.count_calls(self.canvas, {'draw': 'dibujos', 'blit': 'blits'})
+        
+        # Zoom y desplazamiento del eje x (el modo densidad reagrupa al vuelo)
+        toolbar = NavigationToolbar2Tk(self.canvas, chart_frame, pack_toolbar=False)
+        toolbar.update()
+        toolbar.pack(fill=tk.X)
         
         ttk.Button(chart_frame, text="Actualizar Gráfico", 
-                  command=self.update_timeline_chart, style='Accent.TButton').pack(pady=5)
+                  command=self.timeline.refresh, style='Accent.TButton').pack(pady=5)
+        
+        self.update_timeline_chart()
     
     def update_timeline_chart(self):
-        self.ax.clear()
-        
-        if not self.filtered_tasks:
-            self.ax.text(0.5, 0.5, 'No hay tareas para mostrar', 
-                        ha='center', va='center', fontsize=12, color='white')
-            self.canvas.draw()
+        if self.timeline is None:
             return
-        
-        # Preparar datos para el gráfico
-        tasks = sorted(self.filtered_tasks, key=lambda x: x['due_date'])
-        titles = [task['title'] for task in tasks]
-        dates = [datetime.strptime(task['due_date'], '%Y-%m-%d') for task in tasks if task['due_date'] != "Sin fecha"]
-        priorities = [task['priority'] for task in tasks if task['due_date'] != "Sin fecha"]
-        
-        # Colores según prioridad
-        colors = {'alta': '#e63946', 'media': '#ffbe0b', 'baja': '#2a9d8f'}
-        
-        # Crear líneas de tiempo
-        for i, (title, date, priority) in enumerate(zip(titles, dates, priorities)):
-            self.ax.plot([date, date], [i-0.4, i+0.4], color=colors[priority], linewidth=3)
-            self.ax.text(date + timedelta(days=1), i, title, va='center', color='white')
-        
-        # Configurar el gráfico
-        self.ax.set_yticks(range(len(tasks)))
-        self.ax.set_yticklabels(titles)
-        self.ax.set_xlim(min(dates) - timedelta(days=2), max(dates) + timedelta(days=5))
-        self.ax.grid(True, color='#4d4d4d')
-        self.ax.set_facecolor('#2d2d2d')
-        
-        # Rotar etiquetas de fecha
-        for label in self.ax.get_xticklabels():
-            label.set_rotation(45)
-            label.set_ha('right')
-        
-        self.fig.tight_layout()
-        self.canvas.draw()
+        if self.engine.column_mask is not None:
+            self.timeline.set_density(*self.engine.due_days())
+        else:
+            self.timeline.set_tasks(self.filtered_tasks.values())
     
     def select_date(self):
+        from tkcalendar import Calendar
+        
         def set_date():
             self.new_task_due_date.set(cal.get_date())
             top.destroy()
@@ -346,37 +1220,69 @@ class TaskManager:
         ttk.Button(top, text="Seleccionar", command=set_date, style='Accent.TButton').pack(pady=5)
     
     def add_task(self):
-        title = self.new_task_title.get()
-        due_date = self.new_task_due_date.get()
+        try:
+            task = build_task(
+                self.new_task_title.get(),
+                self.new_task_desc.get(),
+                self.new_task_due_date.get(),
+                self.new_task_priority.get(),
+                self.new_task_status.get(),
+                self.new_task_tags.get()
+            )
+        except TaskValidationError as error:
+            messagebox.showerror("Error", str(error))
+            return
+        
+        # El formulario se limpia solo si la tarea quedó guardada; mientras
+        # tanto el botón queda desactivado para no agregarla dos veces
+        def added(new_task):
+            self.add_button.state(["!disabled"])
+            self.tasks.apply_add(new_task)
+            self.clear_form()
+            messagebox.showinfo("Éxito", "Tarea agregada correctamente")
         
-        if not title:
-            messagebox.showerror("Error", "El título es obligatorio")
+        def failed(error):
+            self.add_button.state(["!disabled"])
+            self.show_db_error(error)
+        
+        self.add_button.state(["disabled"])
+        self.db_executor.submit(self.db.add_task, task, on_done=added, on_error=failed)
+    
+    def import_tasks(self):
+        """Importa tareas desde un archivo CSV o JSON Lines"""
+        path = filedialog.askopenfilename(
+            title="Importar tareas",
+            filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl *.ndjson"), ("Todos los archivos", "*.*")])
+        if not path:
             return
         
-        if due_date and due_date != "Sin fecha":
-            try:
-                task_date = datetime.strptime(due_date, '%Y-%m-%d')
-                if task_date < datetime.now():
-                    messagebox.showerror("Error", "La fecha no puede ser en el pasado")
-                    return
-            except ValueError:
-                messagebox.showerror("Error", "Formato de fecha inválido. Use YYYY-MM-DD")
-                return
+        title = self.root.title()
+        def show_progress(read, rate):
+            self.root.title(f"Importando... {read:,} filas ({rate:,.0f} filas/s)")
+        
+        # El progreso llega desde el hilo de trabajo: se muestra desde el de Tk
+        importer = TaskImporter(self.db, progress=lambda read, rate:
+                                self.db_executor.call_in_ui(show_progress, read, rate))
+        
+        def imported(count):
+            self.root.title(title)
+            # Una importación masiva justifica releer la tabla una vez
+            if self.paged:
+                self.load_columns()
+            else:
+                self.load_tasks()
+            
+            summary = f"{importer.imported:,} tareas importadas ({importer.rate:,.0f} filas/s)"
+            if importer.errors:
+                line, message = importer.errors[0]
+                summary += f"\n{len(importer.errors):,} filas omitidas (línea {line}: {message})"
+            messagebox.showinfo("Importación", summary)
         
-        task = {
-            'title': title,
-            'description': self.new_task_desc.get(),
-            'due_date': due_date if due_date else "Sin fecha",
-            'priority': self.new_task_priority.get(),
-            'status': self.new_task_status.get(),
-            'tags': [tag.strip() for tag in self.new_task_tags.get().split(",") if tag.strip()]
-        }
-        
-        self.db.add_task(task)
-        self.tasks = self.db.get_all_tasks()
-        self.apply_filters()
-        self.clear_form()
-        messagebox.showinfo("Éxito", "Tarea agregada correctamente")
+        def failed(error):
+            self.root.title(title)
+            messagebox.showerror("Error", f"No se pudo importar el archivo: {error}")
+        
+        self.db_executor.submit(importer.import_file, path, on_done=imported, on_error=failed)
     
     def clear_form(self):
         self.new_task_title.set("")
@@ -386,50 +1292,209 @@ class TaskManager:
         self.new_task_status.set("pendiente")
         self.new_task_tags.set("")
     
+    def current_filter(self):
+        """Compila los valores actuales del panel de filtros"""
+        return TaskFilter(self.filter_priority.get(), self.filter_status.get(), self.filter_tags.get())
+    
+    def schedule_filters(self, *args):
+        """Filtrado en vivo: aplica los filtros cuando se deja de escribir"""
+        if self._filter_after is not None:
+            self.root.after_cancel(self._filter_after)
+        self._filter_after = self.root.after(self.FILTER_DELAY, self.apply_filters)
+    
+    def _cancel_filter(self):
+        """Descarta el filtro en curso: consultas, búsqueda y tandas pendientes"""
+        if self._filter_after is not None:
+            self.root.after_cancel(self._filter_after)
+            self._filter_after = None
+        if self._stream_after is not None:
+            self.root.after_cancel(self._stream_after)
+            self._stream_after = None
+        # Las que todavía no empezaron no llegan a ejecutarse; la que está
+        # corriendo en SQLite se interrumpe
+        for future in self._filter_futures:
+            future.cancel()
+        self._filter_futures = []
+        self._filter_cancel.set()
+        self._filter_cancel = threading.Event()
+    
+    def _submit_query(self, fn, *args, on_done, **kwargs):
+        """Lectura en segundo plano que se cancela si cambia el filtro"""
+        cancelled = self._filter_cancel
+        def run():
+            with self.db.cancellable(cancelled):
+                return fn(*args, **kwargs)
+        future = self.db_executor.submit(run, on_done=on_done, on_error=self._query_failed)
+        self._filter_futures = [f for f in self._filter_futures if not f.done()]
+        self._filter_futures.append(future)
+    
+    def _query_failed(self, error):
+        if not isinstance(error, QueryCancelled):
+            self.show_db_error(error)
+    
     def apply_filters(self):
-        priority_filter = self.filter_priority.get()
-        status_filter = self.filter_status.get()
-        tags_filter = self.filter_tags.get().lower()
-        
-        self.filtered_tasks = []
-        
-        for task in self.tasks:
-            # Filtrar por prioridad
-            if priority_filter != "Todas" and task['priority'] != priority_filter:
-                continue
-                
-            # Filtrar por estado
-            if status_filter != "Todas" and task['status'] != status_filter:
-                continue
-                
-            # Filtrar por etiquetas
-            if tags_filter:
-                task_tags = [tag.lower() for tag in (task.get('tags', []) or [])]
-                search_tags = [tag.strip().lower() for tag in tags_filter.split(",") if tag.strip()]
-                
-                if not all(any(st in tt for st in search_tags) for tt in task_tags):
-                    continue
+        """Aplica el panel de filtros; el texto de Buscar se resuelve con FTS5"""
+        self._cancel_filter()
+        self._filter_generation += 1
+        task_filter = self.current_filter()
+        search = self.filter_search.get().strip()
+        
+        if self.paged and self.engine.columns is None:
+            # Filtrar, ordenar y paginar en SQLite mientras se construye la caché
+            self._fetch_page(self.engine.page_sql(task_filter, search).first)
+            return
+        if not self.paged and self.engine.filter_engine is None:
+            return  # la carga inicial todavía no terminó
+        
+        if not search:
+            self._show_filtered(task_filter, None)
+            return
+        
+        generation = self._filter_generation
+        def searched(ids):
+            # Si mientras tanto se aplicó otro filtro, este resultado ya no sirve
+            if generation == self._filter_generation:
+                self._show_filtered(task_filter, ids)
+        self._submit_query(self.db.search_ids, search, on_done=searched)
+    
+    def _show_filtered(self, task_filter, search_ids):
+        """Muestra el filtro; search_ids restringe y ordena por relevancia"""
+        if self.paged:
+            pager = self.engine.page_columns(task_filter, search_ids)
+            self.update_timeline_chart()
+            self.update_calendar_events()
+            self._fetch_page(pager.first)
+            return
+        self._stream_tasks(task_filter, self.engine.select(task_filter, search_ids))
+    
+    def _stream_tasks(self, task_filter, tasks):
+        """Llena la lista por tandas de STREAM_CHUNK tareas con root.after.
+
+        Entre tanda y tanda Tk atiende el teclado, así que escribir en los
+        filtros no se traba aunque el resultado tenga decenas de miles de
+        tareas. Cada tanda toma la versión actual de la tarea del almacén y
+        la vuelve a comprobar, por si cambió mientras tanto.
+        """
+        generation = self._filter_generation
+        self.filtered_tasks = {}
+        
+        def show_chunk(start):
+            self._stream_after = None
+            if generation != self._filter_generation:
+                return
+            chunk = []
+            for task in tasks[start:start + self.STREAM_CHUNK]:
+                task = self.tasks.get(task.id)
+                if task is not None and task_filter.matches(task):
+                    chunk.append(task)
+                    self.filtered_tasks[task.id] = task
             
-            self.filtered_tasks.append(task)
+            if start == 0:
+                self.task_list.set_tasks(chunk)
+            else:
+                self.task_list.extend(chunk)
+            
+            if start + self.STREAM_CHUNK < len(tasks):
+                self._stream_after = self.root.after(1, show_chunk, start + self.STREAM_CHUNK)
+            else:
+                self.update_timeline_chart()
+                self.update_calendar_events()
+        
+        show_chunk(0)
+    
+    def show_page(self, tasks):
+        self.tasks.remember(tasks)
+        self.filtered_tasks = {task.id: task for task in tasks}
+        pager = self.engine.pager
+        if self.engine.columns is not None:
+            self.page_label.config(text=f"Página {pager.page + 1} de {pager.pages} "
+                                        f"({len(pager.ids):,} tareas)")
+        else:
+            self.page_label.config(text=f"Página {pager.page + 1}")
         
         self.update_tasks_list()
-        self.update_timeline_chart()
+        # Con la caché columnar la línea de tiempo muestra todo el filtro, no la página
+        if self.engine.columns is None:
+            self.update_timeline_chart()
+    
+    def _fetch_page(self, fetch):
+        """Pide una página en segundo plano; se descarta si cambió el filtro"""
+        pager = self.engine.pager
+        def show(tasks):
+            if pager is self.engine.pager:
+                self.show_page(tasks)
+        self._submit_query(fetch, on_done=show)
+    
+    def next_page(self):
+        pager = self.engine.pager
+        if pager and pager.has_next:
+            self._fetch_page(pager.next)
+    
+    def previous_page(self):
+        pager = self.engine.pager
+        if pager and pager.page > 0:
+            self._fetch_page(pager.previous)
+    
+    def on_task_changed(self, action, task):
+        """Actualiza solo la fila afectada por una escritura en el almacén"""
+        # La caché columnar ya la actualizó el motor
+        if self.engine.search_ids is not None or self.paged:
+            if self._syncing:
+                self._sync_refresh = True  # una sola vez al final del lote
+            else:
+                self._refresh_filtered()
+            return
+        if action == 'reload':
+            self.apply_filters()
+            return
+        
+        task_id = task.id
+        visible = action != 'delete' and self.current_filter().matches(task)
+        
+        if visible:
+            self.filtered_tasks[task_id] = task
+            self.task_list.upsert(task)
+            if self._calendar_shown():
+                self.calendar_events.upsert(task)
+        elif task_id in self.filtered_tasks:
+            del self.filtered_tasks[task_id]
+            self.task_list.remove(task_id)
+            if self._calendar_shown():
+                self.calendar_events.remove(task_id)
+        else:
+            return
+        
+        if self._syncing:
+            self._sync_chart = True
+        else:
+            self.update_timeline_chart()
+    
+    def _refresh_filtered(self):
+        """Vuelve a resolver el filtro actual cuando no alcanza con tocar una fila"""
+        if self.engine.search_ids is not None:
+            # El texto de la tarea pudo cambiar: repetir la búsqueda
+            self.apply_filters()
+            return
+        if self.engine.columns is not None:
+            self.engine.refresh_columns()
+            self.update_timeline_chart()
+        self.update_calendar_events()
+        # Releer la página actual es una consulta indexada acotada
+        self._fetch_page(self.engine.pager.reload)
+    
+    def _task_row(self, task):
+        tags = ", ".join(task.tags) if task.tags else ""
+        return (
+            task.title,
+            task.due_date,
+            task.priority,
+            task.status,
+            tags
+        )
     
     def update_tasks_list(self):
-        # Limpiar el treeview
-        for item in self.tasks_tree.get_children():
-            self.tasks_tree.delete(item)
-        
-        # Agregar las tareas filtradas
-        for task in self.filtered_tasks:
-            tags = ", ".join(task['tags']) if task['tags'] else ""
-            self.tasks_tree.insert("", tk.END, values=(
-                task['title'],
-                task['due_date'],
-                task['priority'],
-                task['status'],
-                tags
-            ))
+        # Solo se insertan, mueven o borran las filas que cambiaron
+        self.task_list.set_tasks(self.filtered_tasks.values())
     
     def get_selected_task(self):
         selected_item = self.tasks_tree.focus()
@@ -437,15 +1502,11 @@ class TaskManager:
             messagebox.showwarning("Advertencia", "Por favor seleccione una tarea")
             return None
         
-        item_data = self.tasks_tree.item(selected_item)
-        task_title = item_data['values'][0]
-        
-        # Buscar la tarea completa en la lista
-        for task in self.tasks:
-            if task['title'] == task_title:
-                return task, selected_item
-        
-        return None
+        # El item guarda el id de la tarea: búsqueda directa en el almacén
+        task = self.tasks.get(self.task_list.task_id(selected_item))
+        if task is None:
+            return None
+        return task, selected_item
     
     def edit_task(self):
         selected = self.get_selected_task()
@@ -455,39 +1516,33 @@ class TaskManager:
         task, item_id = selected
         
         def save_changes():
-            # Validar título
-            new_title = edit_title.get()
-            if not new_title:
-                messagebox.showerror("Error", "El título es obligatorio")
+            # Validar y actualizar la tarea
+            try:
+                updated_task = build_task(
+                    edit_title.get(),
+                    edit_desc.get(),
+                    edit_due_date.get(),
+                    edit_priority.get(),
+                    edit_status.get(),
+                    edit_tags.get()
+                )
+            except TaskValidationError as error:
+                messagebox.showerror("Error", str(error))
                 return
             
-            # Validar fecha
-            new_date = edit_due_date.get()
-            if new_date and new_date != "Sin fecha":
-                try:
-                    task_date = datetime.strptime(new_date, '%Y-%m-%d')
-                    if task_date < datetime.now():
-                        messagebox.showerror("Error", "La fecha no puede ser en el pasado")
-                        return
-                except ValueError:
-                    messagebox.showerror("Error", "Formato de fecha inválido. Use YYYY-MM-DD")
-                    return
+            # La ventana se cierra solo si la tarea quedó guardada
+            def updated(_):
+                edit_window.destroy()
+                self.tasks.apply_update(task.id, updated_task)
+                messagebox.showinfo("Éxito", "Tarea actualizada correctamente")
             
-            # Actualizar la tarea
-            updated_task = {
-                'title': new_title,
-                'description': edit_desc.get(),
-                'due_date': new_date if new_date else "Sin fecha",
-                'priority': edit_priority.get(),
-                'status': edit_status.get(),
-                'tags': [tag.strip() for tag in edit_tags.get().split(",") if tag.strip()]
-            }
+            def failed(error):
+                save_button.state(["!disabled"])
+                self.show_db_error(error)
             
-            self.db.update_task(task['id'], updated_task)
-            self.tasks = self.db.get_all_tasks()
-            self.apply_filters()
-            edit_window.destroy()
-            messagebox.showinfo("Éxito", "Tarea actualizada correctamente")
+            save_button.state(["disabled"])
+            self.db_executor.submit(self.db.update_task, task.id, updated_task,
+                                    on_done=updated, on_error=failed)
         
         # Crear ventana de edición
         edit_window = tk.Toplevel(self.root)
@@ -495,12 +1550,12 @@ class TaskManager:
         edit_window.configure(bg='#2d2d2d')
         
         # Variables para el formulario de edición
-        edit_title = tk.StringVar(value=task['title'])
-        edit_desc = tk.StringVar(value=task['description'])
-        edit_due_date = tk.StringVar(value=task['due_date'])
-        edit_priority = tk.StringVar(value=task['priority'])
-        edit_status = tk.StringVar(value=task['status'])
-        edit_tags = tk.StringVar(value=", ".join(task['tags']))
+        edit_title = tk.StringVar(value=task.title)
+        edit_desc = tk.StringVar(value=task.description)
+        edit_due_date = tk.StringVar(value=task.due_date)
+        edit_priority = tk.StringVar(value=task.priority)
+        edit_status = tk.StringVar(value=task.status)
+        edit_tags = tk.StringVar(value=", ".join(task.tags))
         
         # Formulario de edición
         ttk.Label(edit_window, text="Título:").grid(row=0, column=0, sticky=tk.W, pady=2)
@@ -523,7 +1578,8 @@ class TaskManager:
         ttk.Label(edit_window, text="Etiquetas (separadas por comas):").grid(row=5, column=0, sticky=tk.W, pady=2)
         ttk.Entry(edit_window, textvariable=edit_tags, width=30).grid(row=5, column=1, pady=2, padx=5)
         
-        ttk.Button(edit_window, text="Guardar Cambios", command=save_changes, style='Accent.TButton').grid(row=6, column=1, pady=10)
+        save_button = ttk.Button(edit_window, text="Guardar Cambios", command=save_changes, style='Accent.TButton')
+        save_button.grid(row=6, column=1, pady=10)
     
     def delete_task(self):
         selected = self.get_selected_task()
@@ -532,11 +1588,13 @@ class TaskManager:
         
         task, item_id = selected
         
-        if messagebox.askyesno("Confirmar", f"¿Está seguro que desea eliminar la tarea '{task['title']}'?"):
-            self.db.delete_task(task['id'])
-            self.tasks = self.db.get_all_tasks()
-            self.apply_filters()
-            messagebox.showinfo("Éxito", "Tarea eliminada correctamente")
+        if messagebox.askyesno("Confirmar", f"¿Está seguro que desea eliminar la tarea '{task.title}'?"):
+            def deleted(_):
+                self.tasks.apply_delete(task.id)
+                messagebox.showinfo("Éxito", "Tarea eliminada correctamente")
+            
+            self.db_executor.submit(self.db.delete_task, task.id,
+                                    on_done=deleted, on_error=self.show_db_error)
     
     def view_details(self):
         selected = self.get_selected_task()
@@ -546,54 +1604,78 @@ class TaskManager:
         task, item_id = selected
         
         details_window = tk.Toplevel(self.root)
-        details_window.title(f"Detalles: {task['title']}")
+        details_window.title(f"Detalles: {task.title}")
         details_window.configure(bg='#2d2d2d')
         
         # Mostrar detalles completos
-        ttk.Label(details_window, text=f"Título: {task['title']}", font=('Arial', 11, 'bold')).pack(anchor=tk.W, pady=(10, 2), padx=10)
-        ttk.Label(details_window, text=f"Descripción: {task['description']}").pack(anchor=tk.W, pady=2, padx=10)
-        ttk.Label(details_window, text=f"Fecha límite: {task['due_date']}").pack(anchor=tk.W, pady=2, padx=10)
-        ttk.Label(details_window, text=f"Prioridad: {task['priority']}").pack(anchor=tk.W, pady=2, padx=10)
-        ttk.Label(details_window, text=f"Estado: {task['status']}").pack(anchor=tk.W, pady=2, padx=10)
-        ttk.Label(details_window, text=f"Etiquetas: {', '.join(task['tags']) if task['tags'] else 'Ninguna'}").pack(anchor=tk.W, pady=2, padx=10)
+        ttk.Label(details_window, text=f"Título: {task.title}", font=('Arial', 11, 'bold')).pack(anchor=tk.W, pady=(10, 2), padx=10)
+        ttk.Label(details_window, text=f"Descripción: {task.description}").pack(anchor=tk.W, pady=2, padx=10)
+        ttk.Label(details_window, text=f"Fecha límite: {task.due_date}").pack(anchor=tk.W, pady=2, padx=10)
+        ttk.Label(details_window, text=f"Prioridad: {task.priority}").pack(anchor=tk.W, pady=2, padx=10)
+        ttk.Label(details_window, text=f"Estado: {task.status}").pack(anchor=tk.W, pady=2, padx=10)
+        ttk.Label(details_window, text=f"Etiquetas: {', '.join(task.tags) if task.tags else 'Ninguna'}").pack(anchor=tk.W, pady=2, padx=10)
     
     def show_calendar_tasks(self):
+        """Abre el calendario grande; la ventana se crea una sola vez"""
+        if self.calendar_window is not None:
+            self.calendar_window.deiconify()
+            self.calendar_window.lift()
+            self.update_calendar_events()
+            return
+        
+        from tkcalendar import Calendar
+        
         # Crear ventana para mostrar tareas en el calendario
         calendar_window = tk.Toplevel(self.root)
         calendar_window.title("Tareas en Calendario")
         calendar_window.geometry("800x600")
         calendar_window.configure(bg='#2d2d2d')
+        # Cerrar solo la oculta: los eventos ya creados se reutilizan al volver
+        calendar_window.protocol("WM_DELETE_WINDOW", calendar_window.withdraw)
         
         # Calendario grande
         big_calendar = Calendar(calendar_window, selectmode='day', date_pattern='yyyy-mm-dd',
                               background='#3d3d3d', foreground='white', headersbackground='#284b63')
         big_calendar.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
-        # Mostrar tareas en fechas correspondientes
-        for task in self.filtered_tasks:
-            if task['due_date'] and task['due_date'] != "Sin fecha":
-                try:
-                    big_calendar.calevent_create(
-                        datetime.strptime(task['due_date'], '%Y-%m-%d'),
-                        task['title'],
-                        f"Prioridad: {task['priority']}, Estado: {task['status']}"
-                    )
-                except ValueError:
-                    continue
-        
-        # Configurar colores según prioridad
-        tag_colors = {'alta': '#e63946', 'media': '#ffbe0b', 'baja': '#2a9d8f'}
-        for priority, color in tag_colors.items():
-            big_calendar.tag_config(priority, background=color)
-        
-        # Asignar tags según prioridad
-        for event in big_calendar.calevent_get():
-            for task in self.filtered_tasks:
-                if task['title'] == big_calendar.calevent_cget(event, 'text'):
-                    big_calendar.calevent_cget(event, 'tags', task['priority'])
-                    break
+        self.calendar_window = calendar_window
+        self.calendar_events = CalendarEventLayer(big_calendar)
+        if self.profiler is not None:
+            self.profiler.instrument(self.calendar_events, ("set_tasks", "upsert", "remove", "refresh"),
+                                     "CalendarEventLayer")
+            self.profiler.count_calls(big_calendar, {'calevent_create': 'eventos_creados',
+                                                     'calevent_configure': 'eventos_cambiados',
+                                                     'calevent_remove': 'eventos_borrados'})
+        if self.paged:
+            # Con bases grandes cada mes se pide a SQLite al mostrarlo
+            big_calendar.bind("<<CalendarMonthChanged>>", lambda event: self.update_calendar_events(), add="+")
+        self.update_calendar_events()
+    
+    def _calendar_shown(self):
+        return self.calendar_window is not None and self.calendar_window.state() != 'withdrawn'
+    
+    def update_calendar_events(self):
+        """Lleva el filtro actual al calendario grande, si está abierto"""
+        if not self._calendar_shown():
+            return  # se actualiza al volver a abrirlo
+        if not self.paged:
+            self.calendar_events.set_tasks(self.filtered_tasks.values())
+            return
+        
+        # Modo paginado: solo las tareas del filtro en los días a la vista
+        task_filter = self.current_filter()
+        search = self.filter_search.get().strip()
+        due_from, due_to = self.calendar_events.visible_range()
+        self._submit_query(self.engine.query, task_filter, search, on_done=self.calendar_events.set_tasks,
+                           due_from=due_from, due_to=due_to)
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] != "--profile":
+        sys.exit(import_from_command_line(sys.argv[1:]))
+    # python "Final Code.py" --profile [traza.json]: overlay con F12 y traza al cerrar
+    profiler = None
+    if len(sys.argv) > 1:
+        profiler = Profiler(trace_path=sys.argv[2] if len(sys.argv) > 2 else "tasks_trace.json")
     root = tk.Tk()
-    app = TaskManager(root)
+    app = TaskManager(root, profiler=profiler)
     root.mainloop()
\ No newline at end of file
@@ -11,7 +11,8 @@ class TaskManager:
         self.root.geometry("900x600")
         
         # Variables principales
-        self.tasks = []
+        self.tasks = {}  # id -> tarea (el id también es el iid del Treeview)
+        self._next_id = 1
         self.current_task = None
         
         # Crear interfaz
@@ -146,12 +147,14 @@ class TaskManager:
         
         if self.current_task is None:
             # Nueva tarea
-            self.tasks.append(task)
+            task["id"] = self._next_id
+            self._next_id += 1
+            self.tasks[task["id"]] = task
             messagebox.showinfo("Éxito", "Tarea agregada correctamente")
         else:
             # Editar tarea existente
-            index = self.tasks.index(self.current_task)
-            self.tasks[index] = task
+            task["id"] = self.current_task["id"]
+            self.tasks[task["id"]] = task
             messagebox.showinfo("Éxito", "Tarea actualizada correctamente")
             self.current_task = None
         
@@ -171,8 +174,8 @@ class TaskManager:
             self.task_tree.delete(item)
         
         # Agregar tareas
-        for task in self.tasks:
-            self.task_tree.insert("", tk.END, values=(
+        for task in self.tasks.values():
+            self.task_tree.insert("", tk.END, iid=str(task["id"]), values=(
                 task["title"],
                 task["due_date"],
                 task["priority"],
@@ -185,14 +188,8 @@ class TaskManager:
             messagebox.showwarning("Advertencia", "Seleccione una tarea para editar")
             return
             
-        item = self.task_tree.item(selected)
-        task_title = item["values"][0]
-        
-        # Buscar la tarea completa
-        for task in self.tasks:
-            if task["title"] == task_title:
-                self.current_task = task
-                break
+        # Buscar la tarea completa por su id
+        self.current_task = self.tasks.get(int(selected))
         
         # Llenar el formulario
         if self.current_task:
@@ -209,14 +206,12 @@ class TaskManager:
             messagebox.showwarning("Advertencia", "Seleccione una tarea para eliminar")
             return
             
-        item = self.task_tree.item(selected)
-        task_title = item["values"][0]
-        
-        if messagebox.askyesno("Confirmar", f"¿Eliminar la tarea '{task_title}'?"):
-            for task in self.tasks:
-                if task["title"] == task_title:
-                    self.tasks.remove(task)
-                    break
+        task = self.tasks.get(int(selected))
+        if task is None:
+            return
+        
+        if messagebox.askyesno("Confirmar", f"¿Eliminar la tarea '{task['title']}'?"):
+            del self.tasks[task["id"]]
             
             self.update_task_list()
             messagebox.showinfo("Éxito", "Tarea eliminada correctamente")
@@ -227,7 +222,7 @@ class TaskManager:
             self.calendar.calevent_remove(event)
         
         # Agregar tareas al calendario
-        for task in self.tasks:
+        for task in self.tasks.values():
             if task["due_date"] and task["due_date"] != "Sin fecha":
                 try:
                     self.calendar.calevent_create(
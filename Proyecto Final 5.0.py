@@ -1,25 +1,23 @@
 # Gestor de tareas con calendario interactivo usando Tkinter y SQLite
 import tkinter as tk
 from tkinter import ttk, messagebox
-import sqlite3
 import calendar
-from datetime import datetime, date
+from datetime import date
+
+# Base de datos, validación y consultas: el núcleo compartido con Final Code.py
+from task_engine import PRIORITIES, MonthDensityCache, TaskEngine, TaskValidationError
+
 
 class TaskManagerApp(tk.Tk):
+    # Cada cuántos ms se miran los cambios de otras instancias
+    SYNC_INTERVAL = 1000
+
     def __init__(self):
         super().__init__()
         self.title("Gestor de Tareas")
         # Configurar la base de datos
-        self.conn = sqlite3.connect("tasks.db")
-        self.cursor = self.conn.cursor()
-        self.cursor.execute("""CREATE TABLE IF NOT EXISTS tasks (
-                                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                                title TEXT NOT NULL,
-                                description TEXT,
-                                due_date TEXT,
-                                priority TEXT,
-                                tags TEXT)""")
-        self.conn.commit()
+        self.engine = TaskEngine("tasks.db")
+        self.density = MonthDensityCache(self.engine.db)
 
         # Variables de fecha actual
         today = date.today()
@@ -32,6 +30,21 @@ class TaskManagerApp(tk.Tk):
         # Mostrar calendario inicial y tareas
         self.update_calendar()
         self.refresh_tasks()
+        # Enterarse de lo que escriben las otras aplicaciones sobre tasks.db
+        self.change_seq = self.engine.db.change_seq()
+        self.after(self.SYNC_INTERVAL, self.poll_changes)
+
+    def poll_changes(self):
+        """Refresca la vista si otra instancia escribió desde la última vez"""
+        seq = self.engine.db.change_seq()
+        if seq != self.change_seq:
+            self.change_seq = seq
+            # El registro no guarda la fecha anterior de una tarea movida o
+            # borrada: se descartan todos los meses y se recalcula el visible
+            self.density.invalidate_all()
+            self.update_calendar()
+            self.refresh_tasks()
+        self.after(self.SYNC_INTERVAL, self.poll_changes)
 
     def setup_ui(self):
         """Crear los componentes de la interfaz."""
@@ -97,6 +110,8 @@ class TaskManagerApp(tk.Tk):
 
         # Obtener la matriz de días
         cal = calendar.monthcalendar(self.cur_year, self.cur_month)
+        # Cantidad de tareas por día del mes (una consulta o ninguna si está en caché)
+        counts = self.density.get(self.cur_year, self.cur_month)
         # Aplanar semanas a matriz 6x7
         for r in range(6):
             for c in range(7):
@@ -111,8 +126,7 @@ class TaskManagerApp(tk.Tk):
                     btn.config(text=str(day), state=tk.NORMAL)
                     # Verificar si hay tareas en esta fecha
                     date_str = f"{self.cur_year}-{self.cur_month:02d}-{day:02d}"
-                    self.cursor.execute("SELECT COUNT(*) FROM tasks WHERE due_date=?", (date_str,))
-                    has_tasks = self.cursor.fetchone()[0] > 0
+                    has_tasks = counts.get(date_str, 0) > 0
                     # Colorear según estado
                     if self.selected_date.year == self.cur_year and \
                        self.selected_date.month == self.cur_month and \
@@ -122,6 +136,8 @@ class TaskManagerApp(tk.Tk):
                         btn.config(bg="lightblue")
                     else:
                         btn.config(bg="SystemButtonFace")
+        # Dejar listos los meses vecinos para prev_month/next_month
+        self.density.prefetch(self.cur_year, self.cur_month)
 
     def prev_month(self):
         """Navegar al mes anterior."""
@@ -158,10 +174,10 @@ class TaskManagerApp(tk.Tk):
         """Actualizar la lista de tareas para la fecha seleccionada."""
         for i in self.tree.get_children():
             self.tree.delete(i)
-        date_str = self.selected_date.strftime("%Y-%m-%d")
-        self.cursor.execute("SELECT id, title, priority, tags FROM tasks WHERE due_date=? ORDER BY priority", (date_str,))
-        for row in self.cursor.fetchall():
-            self.tree.insert("", "end", iid=row[0], values=(row[1], row[2], row[3]))
+        tasks = self.engine.db.query_tasks(due_from=self.selected_date, due_to=self.selected_date,
+                                           order_by="priority")
+        for task in tasks:
+            self.tree.insert("", "end", iid=task.id, values=(task.title, task.priority, ", ".join(task.tags)))
 
     def add_task(self):
         """Abrir ventana para agregar una nueva tarea."""
@@ -173,12 +189,10 @@ class TaskManagerApp(tk.Tk):
         if not selected:
             messagebox.showwarning("Advertencia", "Seleccione una tarea para editar.")
             return
-        task_id = int(selected[0])
         # Obtener datos de la tarea
-        self.cursor.execute("SELECT title, description, due_date, priority, tags FROM tasks WHERE id=?", (task_id,))
-        task = self.cursor.fetchone()
+        task = self.engine.get(int(selected[0]))
         if task:
-            self.task_window(task_id, task)
+            self.task_window(task)
 
     def delete_task(self):
         """Eliminar la tarea seleccionada."""
@@ -186,44 +200,44 @@ class TaskManagerApp(tk.Tk):
         if not selected:
             messagebox.showwarning("Advertencia", "Seleccione una tarea para eliminar.")
             return
-        task_id = int(selected[0])
+        task = self.engine.get(int(selected[0]))
         # Confirmar eliminación
-        if messagebox.askyesno("Confirmar", "¿Eliminar esta tarea?"):
-            self.cursor.execute("DELETE FROM tasks WHERE id=?", (task_id,))
-            self.conn.commit()
+        if task and messagebox.askyesno("Confirmar", "¿Eliminar esta tarea?"):
+            self.engine.delete_task(task.id)
+            self.density.invalidate(task.due_date)
             self.refresh_tasks()
             self.update_calendar()
 
-    def task_window(self, task_id=None, task=None):
+    def task_window(self, task=None):
         """Ventana para agregar o editar una tarea."""
         win = tk.Toplevel(self)
         win.grab_set()
-        if task_id:
+        if task:
             win.title("Editar Tarea")
         else:
             win.title("Nueva Tarea")
 
         # Etiquetas y entradas
         tk.Label(win, text="Título:").grid(row=0, column=0, sticky=tk.W, pady=2)
-        title_var = tk.StringVar(value=task[0] if task else "")
+        title_var = tk.StringVar(value=task.title if task else "")
         tk.Entry(win, textvariable=title_var, width=30).grid(row=0, column=1, pady=2)
 
         tk.Label(win, text="Descripción:").grid(row=1, column=0, sticky=tk.W, pady=2)
-        desc_var = tk.StringVar(value=task[1] if task else "")
+        desc_var = tk.StringVar(value=task.description if task else "")
         tk.Entry(win, textvariable=desc_var, width=30).grid(row=1, column=1, pady=2)
 
         tk.Label(win, text="Fecha límite (YYYY-MM-DD):").grid(row=2, column=0, sticky=tk.W, pady=2)
-        date_var = tk.StringVar(value=task[2] if task else self.selected_date.strftime("%Y-%m-%d"))
+        date_var = tk.StringVar(value=task.due_date if task else self.selected_date.strftime("%Y-%m-%d"))
         tk.Entry(win, textvariable=date_var, width=15).grid(row=2, column=1, pady=2, sticky=tk.W)
 
         tk.Label(win, text="Prioridad:").grid(row=3, column=0, sticky=tk.W, pady=2)
-        prio_var = tk.StringVar(value=task[3] if task else "Media")
-        prio_combo = ttk.Combobox(win, textvariable=prio_var, values=["Alta", "Media", "Baja"], width=12)
+        prio_var = tk.StringVar(value=task.priority if task else "media")
+        prio_combo = ttk.Combobox(win, textvariable=prio_var, values=PRIORITIES, width=12)
         prio_combo.grid(row=3, column=1, pady=2, sticky=tk.W)
         prio_combo.state(["readonly"])
 
         tk.Label(win, text="Etiquetas:").grid(row=4, column=0, sticky=tk.W, pady=2)
-        tags_var = tk.StringVar(value=task[4] if task else "")
+        tags_var = tk.StringVar(value=", ".join(task.tags) if task else "")
         tk.Entry(win, textvariable=tags_var, width=30).grid(row=4, column=1, pady=2)
 
         def save():
@@ -232,24 +246,28 @@ class TaskManagerApp(tk.Tk):
             due = date_var.get().strip()
             prio = prio_var.get()
             tags = tags_var.get().strip()
-            if not title:
-                messagebox.showwarning("Advertencia", "El título es obligatorio.")
+            if not due:
+                # Sin fecha la tarea no aparecería en el calendario
+                messagebox.showwarning("Advertencia", "Fecha inválida. Use formato YYYY-MM-DD.")
                 return
+            # Validación de task_engine.build_task, pero como siempre en esta
+            # ventana solo se revisa el formato: el día elegido en el
+            # calendario o una tarea vencida pueden estar en el pasado
             try:
-                # Verificar formato de fecha
-                datetime.strptime(due, "%Y-%m-%d")
-            except ValueError:
-                messagebox.showwarning("Advertencia", "Fecha inválida. Use formato YYYY-MM-DD.")
+                if task:
+                    # Actualizar tarea existente (conserva su estado; las filas
+                    # de gestor de tareas.py no lo tienen)
+                    saved = self.engine.update_task(task.id, title, desc, due, prio,
+                                                    task.status or "pendiente", tags, allow_past=True)
+                else:
+                    # Insertar nueva tarea
+                    saved = self.engine.add_task(title, desc, due, prio, tags=tags, allow_past=True)
+            except TaskValidationError as error:
+                messagebox.showwarning("Advertencia", str(error))
                 return
-            if task_id:
-                # Actualizar tarea existente
-                self.cursor.execute("""UPDATE tasks SET title=?, description=?, due_date=?, priority=?, tags=?
-                                       WHERE id=?""", (title, desc, due, prio, tags, task_id))
-            else:
-                # Insertar nueva tarea
-                self.cursor.execute("""INSERT INTO tasks (title, description, due_date, priority, tags)
-                                       VALUES (?, ?, ?, ?, ?)""", (title, desc, due, prio, tags))
-            self.conn.commit()
+            self.density.invalidate(saved.due_date)
+            if task:
+                self.density.invalidate(task.due_date)
             win.destroy()
             self.update_calendar()
             self.refresh_tasks()
@@ -0,0 +1,1082 @@
+# Benchmarks de rendimiento del gestor de tareas
+#
+# Uso:
+#   python benchmark.py pool --ops 2000
+#   python benchmark.py filters --tasks 50000
+#   python benchmark.py columns --tasks 1000000
+#   python benchmark.py search --tasks 1000000
+#   python benchmark.py calendar --tasks 200000
+#   python benchmark.py calendar-events --tasks 50000
+#   python benchmark.py startup --tasks 50000 --json
+#   python benchmark.py engine-import --runs 10 --limit-ms 50
+#   python benchmark.py memory --rows 100000 1000000
+#   python benchmark.py concurrency --readers 4 --writers 2 --seconds 10
+#   python benchmark.py async --tasks 100000 --requests 5000
+#   python benchmark.py suite --rows 1000 100000 --output results.json --baseline baseline.json
+
+import argparse
+import gc
+import importlib.util
+import json
+import os
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+
+import task_engine
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_app(filename="Final Code.py", module_name="final_code"):
+    """Carga un script de la aplicación como módulo (sus nombres llevan espacios)"""
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(HERE, filename))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def sample_task(i):
+    return {
+        'title': f"Tarea {i}",
+        'description': f"Descripción de la tarea {i}",
+        'due_date': f"2030-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+        'priority': ("alta", "media", "baja")[i % 3],
+        'status': ("pendiente", "en progreso", "completada")[i % 3],
+        'tags': [f"tag{i % 7}", f"grupo{i % 3}"]
+    }
+
+
+def new_task(i):
+    """sample_task(i) como Task, lista para guardar"""
+    return task_engine.Task(None, **sample_task(i))
+
+
+def timed(fn, count):
+    """Ejecuta fn(i) count veces y devuelve operaciones por segundo"""
+    start = time.perf_counter()
+    for i in range(count):
+        fn(i)
+    elapsed = time.perf_counter() - start
+    return count / elapsed if elapsed else float('inf')
+
+
+# ======================
+# POOL DE CONEXIONES
+# ======================
+def bench_pool(ops):
+    class ConnectPerCallDatabaseManager(task_engine.DatabaseManager):
+        """Comportamiento anterior: abre y cierra una conexión por operación"""
+
+        @contextmanager
+        def _get_cursor(self):
+            conn = sqlite3.connect(self.db_name)
+            cursor = conn.cursor()
+            try:
+                yield cursor
+                conn.commit()
+            finally:
+                conn.close()
+
+    results = {}
+    for label, cls in (("conexión por llamada", ConnectPerCallDatabaseManager),
+                       ("pool persistente", task_engine.DatabaseManager)):
+        with tempfile.TemporaryDirectory() as tmp:
+            db = cls(os.path.join(tmp, "bench.db"))
+            ids = []
+            results[label] = {
+                'add_task': timed(lambda i: ids.append(db.add_task(new_task(i)).id), ops),
+                'update_task': timed(lambda i: db.update_task(ids[i], new_task(i + 1)), ops),
+                'get_all_tasks': timed(lambda i: db.get_all_tasks(), max(1, ops // 100)),
+                'delete_task': timed(lambda i: db.delete_task(ids[i]), ops),
+            }
+            db.close()
+
+    print(f"{'operación':<16}" + "".join(f"{label:>24}" for label in results))
+    for op in next(iter(results.values())):
+        print(f"{op:<16}" + "".join(f"{r[op]:>18,.0f} ops/s" for r in results.values()))
+    return results
+
+
+# ======================
+# MOTOR DE FILTROS
+# ======================
+def legacy_filter(tasks, priority_filter, status_filter, tags_filter):
+    """Bucle original de TaskManager.apply_filters, usado como referencia"""
+    tags_filter = tags_filter.lower()
+    filtered = []
+    for task in tasks:
+        if priority_filter != "Todas" and task['priority'] != priority_filter:
+            continue
+        if status_filter != "Todas" and task['status'] != status_filter:
+            continue
+        if tags_filter:
+            task_tags = [tag.lower() for tag in (task.get('tags', []) or [])]
+            search_tags = [tag.strip().lower() for tag in tags_filter.split(",") if tag.strip()]
+            if not all(any(st in tt for st in search_tags) for tt in task_tags):
+                continue
+        filtered.append(task)
+    return filtered
+
+
+def random_tasks(count, seed=0):
+    rng = random.Random(seed)
+    vocabulary = [f"{word}{n}" for word in ("Front", "back", "URGENTE", "docs", "qa") for n in range(20)]
+    tasks = []
+    for i in range(count):
+        task = sample_task(i)
+        task['id'] = i + 1
+        task['priority'] = rng.choice(("alta", "media", "baja"))
+        task['status'] = rng.choice(("pendiente", "en progreso", "completada"))
+        task['tags'] = rng.sample(vocabulary, rng.choice((0, 1, 1, 2, 3)))
+        tasks.append(task)
+    return tasks
+
+
+def random_filters(count, seed=1):
+    rng = random.Random(seed)
+    terms = ["front", "back1", "urg", "Docs", "qa", "1", "x", "end", " ", ""]
+    for _ in range(count):
+        yield (rng.choice(("Todas", "alta", "media", "baja")),
+               rng.choice(("Todas", "pendiente", "en progreso", "completada")),
+               ",".join(rng.sample(terms, rng.randint(0, 3))))
+
+
+def bench_filters(count, queries):
+    tasks = random_tasks(count)
+    engine = task_engine.FilterEngine()
+    records = [task_engine.Task(**task) for task in tasks]
+    start = time.perf_counter()
+    engine.load(records)
+    build = time.perf_counter() - start
+    
+    legacy_time = engine_time = 0.0
+    for priority, status, tags in random_filters(queries):
+        start = time.perf_counter()
+        expected = legacy_filter(tasks, priority, status, tags)
+        legacy_time += time.perf_counter() - start
+        
+        start = time.perf_counter()
+        result = engine.query(task_engine.TaskFilter(priority, status, tags))
+        engine_time += time.perf_counter() - start
+        
+        # Comprobación de equivalencia con el bucle original
+        assert [t.id for t in result] == [t['id'] for t in expected], (priority, status, tags)
+    
+    print(f"{count:,} tareas, {queries} consultas (resultados idénticos al bucle original)")
+    print(f"  construcción de índices: {build * 1000:.1f} ms")
+    print(f"  bucle original:          {legacy_time / queries * 1000:.2f} ms/consulta")
+    print(f"  FilterEngine:            {engine_time / queries * 1000:.2f} ms/consulta")
+
+
+def bench_columns(count, queries):
+    tasks = random_tasks(count)
+    with tempfile.TemporaryDirectory() as tmp:
+        db = task_engine.DatabaseManager(os.path.join(tmp, "columns.db"))
+        db.add_tasks_bulk(task_engine.Task(**dict(task, id=None)) for task in tasks)
+        del tasks
+        
+        start = time.perf_counter()
+        columns = task_engine.TaskColumns().load(db)
+        columns_build = time.perf_counter() - start
+        start = time.perf_counter()
+        engine = task_engine.FilterEngine()
+        engine.load(db.get_all_tasks())
+        engine_build = time.perf_counter() - start
+        
+        times = {'SQLite': 0.0, 'FilterEngine': 0.0, 'TaskColumns': 0.0}
+        for priority, status, tags in random_filters(queries):
+            task_filter = task_engine.TaskFilter(priority, status, tags)
+            
+            start = time.perf_counter()
+            expected = [task.id for task in db.query_tasks(priority=task_filter.priority, status=task_filter.status,
+                                                           tag_terms=task_filter.search_tags)]
+            times['SQLite'] += time.perf_counter() - start
+            
+            start = time.perf_counter()
+            from_engine = [task.id for task in engine.query(task_filter)]
+            times['FilterEngine'] += time.perf_counter() - start
+            
+            start = time.perf_counter()
+            from_columns = columns.ids(columns.mask(task_filter))
+            times['TaskColumns'] += time.perf_counter() - start
+            
+            assert from_engine == expected and from_columns.tolist() == expected, (priority, status, tags)
+        db.close()
+    
+    print(f"{count:,} tareas, {queries} filtros (resultados idénticos en los tres)")
+    print(f"  construcción: TaskColumns {columns_build:.2f} s, FilterEngine {engine_build:.2f} s")
+    for label, elapsed in times.items():
+        print(f"  {label:<14}{elapsed / queries * 1000:>10.2f} ms/filtro")
+
+
+# ======================
+# BÚSQUEDA DE TEXTO (FTS5)
+# ======================
+def zipf_vocabulary(size=20000, exponent=1.1, seed=0):
+    """Palabras sintéticas y pesos acumulados con distribución de Zipf"""
+    rng = random.Random(seed)
+    syllables = ["ma", "re", "ti", "lo", "pu", "ser", "can", "dor", "vi", "ga", "pre", "sun", "to", "la", "mi"]
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(syllables) for _ in range(rng.randint(2, 4))))
+    words = sorted(words, key=lambda word: rng.random())
+    cumulative, total = [], 0.0
+    for rank in range(1, size + 1):
+        total += 1 / rank ** exponent
+        cumulative.append(total)
+    return words, cumulative
+
+
+def text_task(rng, i, vocabulary):
+    words, cumulative = vocabulary
+    title = " ".join(rng.choices(words, cum_weights=cumulative, k=4)) + f" {i}"
+    description = " ".join(rng.choices(words, cum_weights=cumulative, k=20))
+    return task_engine.Task(None, title, description, "Sin fecha", "media", "pendiente")
+
+
+def bench_search(count, repeat):
+    rng = random.Random(0)
+    vocabulary = zipf_vocabulary()
+    words = vocabulary[0]
+    # Palabras de frecuencia decreciente, prefijos y combinaciones
+    queries = [words[9], words[99], words[999], words[9999], words[99][:3], words[999][:4],
+               f"{words[49]} {words[199]}", f"{words[9]} {words[99]} {words[999]}", "12345"]
+    with tempfile.TemporaryDirectory() as tmp:
+        db = task_engine.DatabaseManager(os.path.join(tmp, "search.db"))
+        start = time.perf_counter()
+        db.add_tasks_bulk(text_task(rng, i, vocabulary) for i in range(count))
+        print(f"{count:,} tareas insertadas (con índice FTS5) en {time.perf_counter() - start:.1f} s")
+        
+        print(f"  {'consulta':<26}{'search(limit=20)':>18}{'LIKE (sin índice)':>20}")
+        for query in queries:
+            start = time.perf_counter()
+            for _ in range(repeat):
+                results = db.search(query, limit=20)
+            fts = (time.perf_counter() - start) / repeat
+            
+            # Referencia: recorrer la tabla con LIKE por cada palabra
+            terms = query.split()
+            where = " AND ".join("(title LIKE ? OR description LIKE ?)" for _ in terms)
+            params = [f"%{term}%" for term in terms for _ in range(2)]
+            start = time.perf_counter()
+            with db._get_cursor() as cursor:
+                like_count = cursor.execute(f"SELECT COUNT(*) FROM tasks WHERE {where}", params).fetchone()[0]
+            like = time.perf_counter() - start
+            
+            print(f"  {query!r:<26}{fts * 1000:>15.2f} ms{like * 1000:>17.1f} ms"
+                  f"   ({len(results)} de {like_count:,} con LIKE)")
+        db.close()
+
+
+# ======================
+# CALENDARIO (Proyecto Final 5.0)
+# ======================
+def month_cells(year, month):
+    import calendar
+    return [day for week in calendar.monthcalendar(year, month) for day in week if day]
+
+
+def bench_calendar(count, months, pause):
+    rng = random.Random(0)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        db_name = os.path.join(tmp, "calendar.db")
+        conn = sqlite3.connect(db_name)
+        conn.execute("""CREATE TABLE tasks (id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL,
+                        description TEXT, due_date TEXT, priority TEXT, tags TEXT)""")
+        conn.executemany("INSERT INTO tasks (title, due_date, priority) VALUES (?, ?, ?)", (
+            (f"Tarea {i}", f"{rng.randint(2030, 2032)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}", "Media")
+            for i in range(count)))
+        conn.commit()
+        
+        queries = [0]
+        conn.set_trace_callback(lambda sql: queries.__setitem__(0, queries[0] + 1))
+        navigation = [(2030 + m // 12, m % 12 + 1) for m in range(months)]
+        
+        def run(label, show_month, count_queries=lambda: queries[0]):
+            before = count_queries()
+            elapsed = 0.0
+            for year, month in navigation:
+                start = time.perf_counter()
+                show_month(year, month)
+                elapsed += time.perf_counter() - start
+                time.sleep(pause)  # el usuario mira el mes antes de cambiar
+            print(f"  {label:<28}{(count_queries() - before) / months:>6.2f} consultas {elapsed / months * 1000:>9.2f} ms/navegación")
+        
+        def legacy(year, month):
+            for day in month_cells(year, month):
+                conn.execute("SELECT COUNT(*) FROM tasks WHERE due_date=?", (f"{year}-{month:02d}-{day:02d}",)).fetchone()
+        
+        print(f"{count:,} tareas, {months} navegaciones de mes")
+        run("COUNT por día, sin índice", legacy)
+        conn.execute("CREATE INDEX idx_due_date ON tasks(due_date)")
+        run("COUNT por día, con índice", legacy)
+        
+        # Como la abre Proyecto Final 5.0: migra la tabla y agrega due_day
+        db = task_engine.DatabaseManager(db_name)
+        density = task_engine.MonthDensityCache(db)
+        def cached(year, month):
+            density.get(year, month)
+            density.prefetch(year, month)
+        run("MonthDensityCache", cached, lambda: density.queries)
+        conn.close()
+        db.close()
+
+
+def bench_calendar_events(app, count, legacy_count, months):
+    """Eventos del calendario grande: calevent_create por tarea frente a CalendarEventLayer."""
+    import tkinter as tk
+    from tkcalendar import Calendar
+    
+    rng = random.Random(0)
+    today = date.today()
+    tasks = [task_engine.Task(i + 1, f"Tarea {i}", "", (today + timedelta(days=rng.randint(-365, 365))).isoformat(),
+                      rng.choice(("alta", "media", "baja")), "pendiente")
+             for i in range(count)]
+    root = tk.Tk()
+    root.withdraw()
+    
+    def legacy(calendar, subset):
+        # Lo que hacía show_calendar_tasks: un evento por tarea y luego buscar la tarea de cada evento por título
+        for task in subset:
+            calendar.calevent_create(datetime.strptime(task.due_date, '%Y-%m-%d'), task.title, task.priority)
+        for event in calendar.get_calevents():
+            for task in subset:
+                if task.title == calendar.calevent_cget(event, 'text'):
+                    break
+    
+    calendar = Calendar(root, selectmode='day', date_pattern='yyyy-mm-dd')
+    start = time.perf_counter()
+    legacy(calendar, tasks[:legacy_count])
+    root.update()
+    print(f"  {'calevent_create por tarea':<28}{legacy_count:>9,} tareas {(time.perf_counter() - start) * 1000:>9.1f} ms")
+    calendar.destroy()
+    
+    calendar = Calendar(root, selectmode='day', date_pattern='yyyy-mm-dd')
+    layer = app.CalendarEventLayer(calendar)
+    start = time.perf_counter()
+    layer.set_tasks(tasks)
+    root.update()
+    print(f"  {'CalendarEventLayer':<28}{count:>9,} tareas {(time.perf_counter() - start) * 1000:>9.1f} ms "
+          f"({len(calendar.get_calevents())} eventos)")
+    
+    start = time.perf_counter()
+    for _ in range(months):
+        calendar._next_month()  # como la flecha: genera <<CalendarMonthChanged>>
+        root.update()
+    print(f"  {'cambio de mes':<28}{(time.perf_counter() - start) / months * 1000:>31.2f} ms")
+    root.destroy()
+
+
+# ======================
+# ARRANQUE
+# ======================
+def startup_probe(timeout=60.0):
+    """Corre en un proceso nuevo: mide el import y el primer dibujo de la lista.
+
+    Usa tasks.db del directorio actual e imprime los tiempos como JSON.
+    """
+    # benchmark.py ya importó task_engine: se descarta para que el tiempo
+    # de import de la aplicación lo incluya, como en un arranque real
+    del sys.modules['task_engine']
+    start = time.perf_counter()
+    app = load_app()
+    result = {'import_ms': (time.perf_counter() - start) * 1000,
+              'heavy_modules_at_import': sorted(name for name in ("matplotlib", "numpy", "tkcalendar")
+                                                if name in sys.modules)}
+    
+    import tkinter as tk
+    root = tk.Tk()
+    manager = app.TaskManager(root)
+    deadline = time.perf_counter() + timeout
+    
+    def wait_for(condition):
+        while not condition():
+            if time.perf_counter() > deadline:
+                raise TimeoutError("la ventana no terminó de cargar")
+            root.update()
+        return (time.perf_counter() - start) * 1000
+    
+    result['first_paint_ms'] = wait_for(lambda: manager.tasks_tree.get_children())
+    result['ready_ms'] = wait_for(lambda: manager.engine.ready
+                                  and manager.timeline is not None and manager.calendar is not None)
+    manager.on_close()
+    print(json.dumps(result))
+
+
+def bench_startup(count, runs, as_json):
+    with tempfile.TemporaryDirectory() as tmp:
+        db = task_engine.DatabaseManager(os.path.join(tmp, "tasks.db"))
+        db.add_tasks_bulk(new_task(i) for i in range(count))
+        db.close()
+        
+        samples = []
+        for _ in range(runs):
+            # Cada corrida en frío: intérprete nuevo, sin módulos en caché
+            start = time.perf_counter()
+            probe = subprocess.run([sys.executable, os.path.abspath(__file__), "startup", "--probe"],
+                                   cwd=tmp, capture_output=True, text=True, check=True)
+            sample = json.loads(probe.stdout.splitlines()[-1])
+            sample['process_ms'] = (time.perf_counter() - start) * 1000
+            samples.append(sample)
+    
+    result = {'tasks': count, 'runs': runs,
+              'heavy_modules_at_import': samples[0]['heavy_modules_at_import']}
+    for metric in ("import_ms", "first_paint_ms", "ready_ms", "process_ms"):
+        result[metric] = statistics.median(sample[metric] for sample in samples)
+    
+    if as_json:
+        print(json.dumps(result))
+        return result
+    print(f"{count:,} tareas, mediana de {runs} arranques en frío")
+    for metric in ("import_ms", "first_paint_ms", "ready_ms", "process_ms"):
+        print(f"  {metric:<16}{result[metric]:>10.1f} ms")
+    print(f"  importados al cargar el módulo: {', '.join(result['heavy_modules_at_import']) or 'ninguno'}")
+    return result
+
+
+# Se corre con python -c: el tiempo no incluye lo que ya importó benchmark.py
+ENGINE_IMPORT_PROBE = """
+import sys, time
+start = time.perf_counter()
+import task_engine
+elapsed = (time.perf_counter() - start) * 1000
+print(elapsed, *(name for name in ("tkinter", "matplotlib", "numpy") if name in sys.modules))
+"""
+
+
+def bench_engine_import(runs, limit_ms, as_json):
+    """import task_engine en intérpretes nuevos: tiempo y módulos pesados que arrastra.
+
+    Devuelve False si la mediana supera limit_ms o si se cargó tkinter,
+    matplotlib o numpy.
+    """
+    samples = []
+    heavy = set()
+    for _ in range(runs):
+        probe = subprocess.run([sys.executable, "-c", ENGINE_IMPORT_PROBE],
+                               cwd=HERE, capture_output=True, text=True, check=True)
+        elapsed, *modules = probe.stdout.split()
+        samples.append(float(elapsed))
+        heavy.update(modules)
+    
+    result = {'runs': runs, 'import_ms': statistics.median(samples), 'max_ms': max(samples),
+              'limit_ms': limit_ms, 'heavy_modules_at_import': sorted(heavy)}
+    result['ok'] = result['import_ms'] < limit_ms and not heavy
+    if as_json:
+        print(json.dumps(result))
+        return result['ok']
+    print(f"import task_engine, mediana de {runs} intérpretes nuevos")
+    print(f"  {'mediana':<16}{result['import_ms']:>10.1f} ms (límite {limit_ms:.0f} ms)")
+    print(f"  {'máximo':<16}{result['max_ms']:>10.1f} ms")
+    print(f"  importados al cargar el módulo: {', '.join(result['heavy_modules_at_import']) or 'ninguno'}")
+    return result['ok']
+
+
+# ======================
+# MEMORIA
+# ======================
+def legacy_row_to_task(row):
+    """Representación original: un diccionario y una lista nueva por fila"""
+    return {
+        'id': row[0],
+        'title': row[1],
+        'description': row[2],
+        'due_date': row[3],
+        'priority': row[4],
+        'status': row[5],
+        'tags': row[6].split(",") if row[6] else []
+    }
+
+
+def current_rss():
+    """RSS actual del proceso en bytes (en Linux; si no, el máximo alcanzado)"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+def memory_probe(representation, db_name):
+    """Corre en un proceso nuevo: carga todas las tareas e imprime RSS y tiempos"""
+    db = task_engine.DatabaseManager(db_name)
+    gc.collect()
+    before = current_rss()
+    
+    start = time.perf_counter()
+    if representation == "dict":
+        with db._get_cursor() as cursor:
+            cursor.execute(db.SELECT_ALL_SQL)
+            tasks = [legacy_row_to_task(row) for row in cursor.fetchall()]
+    else:
+        tasks = db.get_all_tasks()
+    load = time.perf_counter() - start
+    rss = current_rss() - before
+    
+    # Una colección completa recorre todos los objetos vivos
+    start = time.perf_counter()
+    gc.collect()
+    collect = time.perf_counter() - start
+    
+    print(json.dumps({'rows': len(tasks), 'rss_mb': rss / 2**20,
+                      'load_s': load, 'gc_ms': collect * 1000}))
+    db.close()
+
+
+def bench_memory(row_counts, as_json):
+    results = []
+    for count in row_counts:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_name = os.path.join(tmp, "memory.db")
+            db = task_engine.DatabaseManager(db_name)
+            db.add_tasks_bulk(new_task(i) for i in range(count))
+            db.close()
+            
+            for representation in ("dict", "task"):
+                probe = subprocess.run([sys.executable, os.path.abspath(__file__), "memory",
+                                        "--probe", representation, "--db", db_name],
+                                       capture_output=True, text=True, check=True)
+                result = json.loads(probe.stdout.splitlines()[-1])
+                result['representation'] = representation
+                results.append(result)
+    
+    if as_json:
+        print(json.dumps(results))
+        return results
+    print(f"{'filas':>10}  {'representación':<15}{'RSS':>12}{'carga':>10}{'gc.collect':>12}")
+    for result in results:
+        print(f"{result['rows']:>10,}  {result['representation']:<15}{result['rss_mb']:>9.1f} MB"
+              f"{result['load_s']:>9.2f} s{result['gc_ms']:>9.1f} ms")
+    return results
+
+
+# ======================
+# CONCURRENCIA ENTRE PROCESOS
+# ======================
+PROFILES = ("sqlite", "wal")
+
+
+def make_profile(name, busy_timeout):
+    if name == "sqlite":
+        profile = task_engine.SQLiteProfile.sqlite_defaults()
+    else:
+        profile = task_engine.SQLiteProfile()
+    profile.busy_timeout = busy_timeout
+    return profile
+
+
+def concurrency_probe(role, profile_name, db_name, seconds, start_at, busy_timeout):
+    """Corre en un proceso nuevo: lee o escribe sin parar e imprime sus cuentas.
+
+    Todos los procesos arrancan a la vez en start_at (time.time()). Los
+    errores "database is locked" se cuentan y el proceso sigue.
+    """
+    db = task_engine.DatabaseManager(db_name, pool_size=1, profile=make_profile(profile_name, busy_timeout))
+    rng = random.Random(os.getpid())
+    count = db.count_tasks()
+    ops = locked = 0
+    latencies = []
+    
+    time.sleep(max(0.0, start_at - time.time()))
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        start = time.perf_counter()
+        try:
+            if role == "reader":
+                db.query_tasks(priority=rng.choice(("alta", "media", "baja")), order_by="due_date", limit=200)
+                db.count_tasks(status=rng.choice(("pendiente", "en progreso", "completada")))
+            elif rng.random() < 0.5:
+                db.add_task(new_task(rng.randrange(count)))
+            else:
+                task_id = rng.randrange(1, count)
+                db.update_task(task_id, new_task(task_id + 1))
+        except sqlite3.OperationalError as error:
+            if "locked" not in str(error) and "busy" not in str(error):
+                raise
+            locked += 1
+            continue
+        ops += 1
+        latencies.append(time.perf_counter() - start)
+    db.close()
+    
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95)] * 1000 if latencies else 0.0
+    print(json.dumps({'role': role, 'ops': ops, 'locked': locked, 'p95_ms': p95}))
+
+
+def bench_concurrency(count, readers, writers, seconds, busy_timeout, as_json):
+    results = {}
+    for profile_name in PROFILES:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_name = os.path.join(tmp, "stress.db")
+            db = task_engine.DatabaseManager(db_name, profile=make_profile(profile_name, busy_timeout))
+            db.add_tasks_bulk(new_task(i) for i in range(count))
+            db.close()
+            
+            # Cada proceso es como otra instancia de la aplicación abierta
+            start_at = time.time() + 2.0
+            roles = ["reader"] * readers + ["writer"] * writers
+            probes = [subprocess.Popen([sys.executable, os.path.abspath(__file__), "concurrency",
+                                        "--probe", role, "--profile", profile_name, "--db", db_name,
+                                        "--seconds", str(seconds), "--start-at", str(start_at),
+                                        "--busy-timeout", str(busy_timeout)],
+                                       stdout=subprocess.PIPE, text=True)
+                      for role in roles]
+            samples = [json.loads(probe.communicate()[0].splitlines()[-1]) for probe in probes]
+        
+        result = {}
+        for role in ("reader", "writer"):
+            group = [sample for sample in samples if sample['role'] == role]
+            result[role] = {'ops_per_s': sum(sample['ops'] for sample in group) / seconds,
+                            'locked': sum(sample['locked'] for sample in group),
+                            'p95_ms': max((sample['p95_ms'] for sample in group), default=0.0)}
+        results[profile_name] = result
+    
+    if as_json:
+        print(json.dumps(results))
+        return results
+    print(f"{count:,} tareas, {readers} procesos lectores y {writers} escritores durante {seconds:g} s "
+          f"(busy_timeout {busy_timeout:g} s)")
+    labels = {"sqlite": "SQLite por defecto", "wal": "SQLiteProfile (WAL)"}
+    for profile_name, result in results.items():
+        print(f"  {labels[profile_name]}")
+        for role, label in (("reader", "lecturas"), ("writer", "escrituras")):
+            stats = result[role]
+            print(f"    {label:<12}{stats['ops_per_s']:>10,.0f} ops/s   p95 {stats['p95_ms']:>8.1f} ms"
+                  f"   {stats['locked']:>5} 'database is locked'")
+    return results
+
+
+# ======================
+# ASYNCIO
+# ======================
+def bench_async(count, requests, concurrency):
+    import asyncio
+    
+    async def measure(label, request, stream=None):
+        """Atiende requests pedidos a la vez mientras un latido mide el retraso del bucle"""
+        lags = []
+        done = asyncio.Event()
+        
+        async def heartbeat(interval=0.001):
+            while not done.is_set():
+                start = time.perf_counter()
+                await asyncio.sleep(interval)
+                lags.append(time.perf_counter() - start - interval)
+        
+        beat = asyncio.create_task(heartbeat())
+        await asyncio.sleep(0.01)
+        start = time.perf_counter()
+        if stream is None:
+            await asyncio.gather(*(request(i) for i in range(requests)))
+        else:
+            rows = 0
+            async for task in stream():
+                rows += 1
+        elapsed = time.perf_counter() - start
+        done.set()
+        await beat
+        
+        lags.sort()
+        rate = f"{requests / elapsed:>8,.0f} req/s" if stream is None else f"{rows / elapsed:>8,.0f} filas/s"
+        print(f"  {label:<34}{rate}   retraso del bucle p50 {lags[len(lags) // 2] * 1000:>6.2f} ms"
+              f"  p99 {lags[int(len(lags) * 0.99)] * 1000:>7.2f} ms  máx {lags[-1] * 1000:>8.2f} ms")
+    
+    def operation(db, i):
+        """Mezcla de pedidos: 10% altas, 10% ediciones, el resto lecturas"""
+        kind = i % 10
+        if kind == 0:
+            return db.add_task, (new_task(i),), {}
+        if kind == 1:
+            return db.update_task, (i % count + 1, new_task(i)), {}
+        if kind < 6:
+            return db.query_tasks, (), {'priority': ("alta", "media", "baja")[i % 3],
+                                        'order_by': "due_date", 'limit': 50}
+        return db.get_tasks_by_ids, ([(i * 7919 + k) % count + 1 for k in range(20)],), {}
+    
+    async def main():
+        with tempfile.TemporaryDirectory() as tmp:
+            db_name = os.path.join(tmp, "async.db")
+            db = task_engine.DatabaseManager(db_name)
+            db.add_tasks_bulk(new_task(i) for i in range(count))
+            print(f"{count:,} tareas, {requests:,} pedidos simultáneos")
+            
+            async def blocking(i):
+                fn, args, kwargs = operation(db, i)
+                return fn(*args, **kwargs)
+            await measure("DatabaseManager (bloqueante)", blocking)
+            
+            async with task_engine.AsyncDatabaseManager(db=db, max_concurrency=concurrency) as adb:
+                async def non_blocking(i):
+                    fn, args, kwargs = operation(adb, i)
+                    return await fn(*args, **kwargs)
+                await measure(f"AsyncDatabaseManager (máx. {adb.max_concurrency})", non_blocking)
+                await measure("AsyncDatabaseManager.iter_tasks", None,
+                              stream=lambda: adb.iter_tasks(batch_size=2000))
+            db.close()
+    
+    asyncio.run(main())
+
+
+# ======================
+# SUITE COMPLETA
+# ======================
+def synthetic_task(rng, i, tags, words, today):
+    """Tarea realista: prioridades, estados y fechas mezclados y etiquetas con distribución de Zipf"""
+    priority = rng.choices(task_engine.PRIORITIES, weights=(2, 5, 3))[0]
+    status = rng.choices(task_engine.STATUSES, weights=(5, 2, 3))[0]
+    if rng.random() < 0.15:
+        due_date = task_engine.NO_DUE_DATE
+    else:
+        # La mayoría vence en los próximos meses; algunas ya están vencidas
+        due_date = (today + timedelta(days=int(rng.triangular(-60, 365, 14)))).isoformat()
+    tag_names, tag_weights = tags
+    tag_count = rng.choices((0, 1, 2, 3, 4), weights=(2, 4, 3, 1, 1))[0]
+    task_tags = set(rng.choices(tag_names, cum_weights=tag_weights, k=tag_count))
+    word_names, word_weights = words
+    title = " ".join(rng.choices(word_names, cum_weights=word_weights, k=3)) + f" {i}"
+    description = " ".join(rng.choices(word_names, cum_weights=word_weights, k=rng.randint(0, 12)))
+    return task_engine.Task(None, title, description, due_date, priority, status, sorted(task_tags))
+
+
+def suite_vocabularies(seed):
+    """(etiquetas, palabras) para synthetic_task: pocas etiquetas, muchas palabras"""
+    return zipf_vocabulary(size=300, exponent=1.2, seed=seed), zipf_vocabulary(size=5000, exponent=1.1, seed=seed + 1)
+
+
+def synthetic_db(path, count, seed=0):
+    """Genera tasks.db sintético con count tareas; si el archivo ya existe lo reutiliza"""
+    if os.path.exists(path):
+        return False
+    rng = random.Random(seed)
+    tags, words = suite_vocabularies(seed)
+    today = date.today()
+    db = task_engine.DatabaseManager(path)
+    try:
+        db.add_tasks_bulk(synthetic_task(rng, i, tags, words, today) for i in range(count))
+    finally:
+        db.close()
+    return True
+
+
+def suite_filters(seed):
+    """Filtros fijos del panel: etiquetas frecuentes, raras, prefijos y combinaciones"""
+    tag_names = suite_vocabularies(seed)[0][0]
+    terms = ["", tag_names[0], tag_names[5], tag_names[100], tag_names[2][:2], f"{tag_names[1]},{tag_names[50]}"]
+    return [task_engine.TaskFilter(priority, status, term)
+            for priority in ("Todas", "alta") for status in ("Todas", "pendiente") for term in terms]
+
+
+def measure(fn, repeat, setup=None):
+    """Mediana en ms de repeat ejecuciones de fn(setup()) (o fn() sin setup)"""
+    samples = []
+    for _ in range(repeat):
+        argument = setup() if setup is not None else None
+        start = time.perf_counter()
+        fn(argument) if setup is not None else fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def suite_crud(db, repeat, ops, seed):
+    """ms de ops llamadas a add_task, update_task y delete_task (deja la base como estaba)"""
+    rng = random.Random(seed)
+    tags, words = suite_vocabularies(seed)
+    today = date.today()
+    samples = {'crud.add_task': [], 'crud.update_task': [], 'crud.delete_task': []}
+    for _ in range(repeat):
+        tasks = [synthetic_task(rng, i, tags, words, today) for i in range(ops)]
+        start = time.perf_counter()
+        tasks = [db.add_task(task) for task in tasks]
+        samples['crud.add_task'].append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        for task in tasks:
+            db.update_task(task.id, task.replace(status="completada", tags=task.tags + ("revisada",)))
+        samples['crud.update_task'].append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        for task in tasks:
+            db.delete_task(task.id)
+        samples['crud.delete_task'].append((time.perf_counter() - start) * 1000)
+    return {stage: statistics.median(values) for stage, values in samples.items()}
+
+
+def suite_tasks_list(app, tasks, filtered, repeat):
+    """TaskListView sobre un Treeview en una raíz Tk oculta (necesita pantalla)"""
+    import tkinter as tk
+    from tkinter import ttk
+    root = tk.Tk()
+    root.withdraw()
+    try:
+        def new_view():
+            for child in root.winfo_children():
+                child.destroy()
+            tree = ttk.Treeview(root, columns=("title", "due_date", "priority", "status", "tags"), show="headings")
+            scrollbar = ttk.Scrollbar(root, orient=tk.VERTICAL, command=tree.yview)
+            view = app.TaskListView(tree, scrollbar, lambda task: app.TaskManager._task_row(None, task))
+            root.update_idletasks()
+            return view
+        
+        def fill(view):
+            view.set_tasks(tasks)
+            root.update_idletasks()
+        
+        def filled_view():
+            view = new_view()
+            fill(view)
+            return view
+        
+        def refilter(view):
+            view.set_tasks(filtered)
+            root.update_idletasks()
+        
+        return {'update_tasks_list.full': measure(fill, repeat, new_view),
+                'update_tasks_list.filter': measure(refilter, repeat, filled_view)}
+    finally:
+        root.destroy()
+
+
+def suite_timeline(app, tasks, filtered, repeat):
+    """TimelineChart sobre una figura con el backend Agg, sin ventana"""
+    app._load_chart_modules()
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    
+    def new_chart():
+        figure = Figure(figsize=(8, 3), facecolor='#2d2d2d')
+        FigureCanvasAgg(figure)
+        chart = app.TimelineChart(figure.add_subplot())
+        return chart
+    
+    def drawn_chart():
+        chart = new_chart()
+        chart.set_tasks(tasks, force=True)
+        return chart
+    
+    return {'update_timeline_chart.full': measure(lambda chart: chart.set_tasks(tasks, force=True), repeat, new_chart),
+            'update_timeline_chart.filter': measure(lambda chart: chart.set_tasks(filtered), repeat, drawn_chart)}
+
+
+def suite_run(app, path, repeat, crud_ops, seed):
+    """Todas las etapas sobre una base ya generada: {etapa: ms}.
+
+    Las etapas cortas se miden por tandas (crud_ops escrituras, todos los
+    filtros de suite_filters) para que las diferencias superen el ruido.
+    """
+    results = {}
+    db = task_engine.DatabaseManager(path)
+    try:
+        results.update(suite_crud(db, repeat, crud_ops, seed))
+        results['get_all_tasks'] = measure(db.get_all_tasks, repeat)
+        tasks = db.get_all_tasks()
+        
+        engine = task_engine.FilterEngine()
+        results['filter_engine.load'] = measure(lambda: task_engine.FilterEngine().load(tasks), repeat)
+        engine.load(tasks)
+        filters = suite_filters(seed)
+        # apply_filters: índices en memoria o, en modo paginado, la primera página desde SQLite
+        results['apply_filters.memory'] = measure(
+            lambda: [engine.query(task_filter) for task_filter in filters], repeat)
+        results['apply_filters.sqlite'] = measure(lambda: [
+            db.query_tasks(priority=task_filter.priority, status=task_filter.status,
+                           tag_terms=task_filter.search_tags, limit=task_engine.TaskEngine.PAGE_SIZE)
+            for task_filter in filters], repeat)
+    finally:
+        db.close()
+    
+    # Lo que queda en la lista tras el filtro más común (una etiqueta frecuente)
+    filtered = engine.query(filters[1])
+    try:
+        results.update(suite_tasks_list(app, tasks, filtered, repeat))
+    except Exception as error:  # tkinter.TclError sin pantalla
+        print(f"  update_tasks_list omitido: {error}", file=sys.stderr)
+    results.update(suite_timeline(app, tasks, filtered, repeat))
+    return results
+
+
+def compare_baseline(results, baseline, tolerance, min_delta):
+    """Etapas más lentas que en baseline: [(filas, etapa, ms antes, ms ahora)].
+
+    Cuenta como regresión un aumento mayor que tolerance (relativo) y que
+    min_delta ms, para no marcar el ruido de las etapas muy cortas.
+    """
+    regressions = []
+    for rows, stages in results['results'].items():
+        previous = baseline.get('results', {}).get(rows, {})
+        for stage, elapsed in stages.items():
+            before = previous.get(stage)
+            if before is not None and elapsed > before * (1 + tolerance) and elapsed - before > min_delta:
+                regressions.append((rows, stage, before, elapsed))
+    return regressions
+
+
+def bench_suite(row_counts, repeat, crud_ops, seed, data_dir, output, baseline, tolerance, min_delta):
+    import platform
+    app = load_app()
+    results = {'meta': {'python': platform.python_version(), 'sqlite': sqlite3.sqlite_version,
+                        'platform': platform.platform(), 'seed': seed, 'repeat': repeat,
+                        'crud_ops': crud_ops, 'filters': len(suite_filters(seed)),
+                        'created': time.strftime("%Y-%m-%dT%H:%M:%S")},
+               'results': {}}
+    # Sin --output el JSON va a la salida estándar y la tabla a stderr
+    log = sys.stdout if output else sys.stderr
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = data_dir or tmp
+        os.makedirs(directory, exist_ok=True)
+        for count in row_counts:
+            path = os.path.join(directory, f"tasks_{count}_s{seed}.db")
+            start = time.perf_counter()
+            if synthetic_db(path, count, seed):
+                print(f"{count:,} tareas generadas en {time.perf_counter() - start:.1f} s ({path})", file=log)
+            results['results'][str(count)] = stages = suite_run(app, path, repeat, crud_ops, seed)
+            print(f"{count:,} tareas (mediana de {repeat}, ms)", file=log)
+            for stage, elapsed in stages.items():
+                print(f"  {stage:<32}{elapsed:>12.3f}", file=log)
+    
+    if output:
+        with open(output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+    else:
+        print(json.dumps(results))
+    
+    if baseline is None:
+        return []
+    with open(baseline, encoding="utf-8") as file:
+        regressions = compare_baseline(results, json.load(file), tolerance, min_delta)
+    for rows, stage, before, elapsed in regressions:
+        print(f"REGRESIÓN {int(rows):,} tareas, {stage}: {before:.3f} -> {elapsed:.3f} ms "
+              f"({(elapsed / before - 1) * 100:+.0f}%)", file=log)
+    if not regressions:
+        print(f"Sin regresiones frente a {baseline}", file=log)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks del gestor de tareas")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    pool = sub.add_parser("pool", help="ops/s con conexión por llamada frente al pool")
+    pool.add_argument("--ops", type=int, default=2000)
+
+    filters = sub.add_parser("filters", help="apply_filters original frente a FilterEngine")
+    filters.add_argument("--tasks", type=int, default=50000)
+    filters.add_argument("--queries", type=int, default=200)
+
+    columns = sub.add_parser("columns", help="filtros en SQLite, FilterEngine y TaskColumns")
+    columns.add_argument("--tasks", type=int, default=1000000)
+    columns.add_argument("--queries", type=int, default=30)
+
+    search = sub.add_parser("search", help="DatabaseManager.search (FTS5) frente a LIKE")
+    search.add_argument("--tasks", type=int, default=1000000)
+    search.add_argument("--repeat", type=int, default=5)
+
+    month = sub.add_parser("calendar", help="consultas y tiempo por navegación del calendario 5.0")
+    month.add_argument("--tasks", type=int, default=200000)
+    month.add_argument("--months", type=int, default=24)
+    month.add_argument("--pause", type=float, default=0.05, help="segundos entre navegaciones")
+
+    events = sub.add_parser("calendar-events", help="eventos del calendario grande (requiere pantalla)")
+    events.add_argument("--tasks", type=int, default=50000)
+    events.add_argument("--legacy-tasks", type=int, default=5000)
+    events.add_argument("--months", type=int, default=12)
+
+    startup = sub.add_parser("startup", help="tiempo de import y de primer dibujo (requiere pantalla)")
+    startup.add_argument("--tasks", type=int, default=50000)
+    startup.add_argument("--runs", type=int, default=5)
+    startup.add_argument("--json", action="store_true", help="salida JSON para CI")
+    startup.add_argument("--probe", action="store_true", help=argparse.SUPPRESS)
+
+    engine_import = sub.add_parser("engine-import", help="tiempo de import de task_engine, sin interfaz")
+    engine_import.add_argument("--runs", type=int, default=10)
+    engine_import.add_argument("--limit-ms", type=float, default=50.0)
+    engine_import.add_argument("--json", action="store_true", help="salida JSON para CI")
+
+    memory = sub.add_parser("memory", help="RSS y tiempo de carga: diccionarios frente a Task")
+    memory.add_argument("--rows", type=int, nargs="+", default=[100000, 1000000])
+    memory.add_argument("--json", action="store_true", help="salida JSON para CI")
+    memory.add_argument("--probe", choices=("dict", "task"), help=argparse.SUPPRESS)
+    memory.add_argument("--db", help=argparse.SUPPRESS)
+
+    concurrency = sub.add_parser("concurrency", help="varios procesos leyendo y escribiendo la misma base")
+    concurrency.add_argument("--tasks", type=int, default=20000)
+    concurrency.add_argument("--readers", type=int, default=4)
+    concurrency.add_argument("--writers", type=int, default=2)
+    concurrency.add_argument("--seconds", type=float, default=10.0)
+    concurrency.add_argument("--busy-timeout", type=float, default=1.0)
+    concurrency.add_argument("--json", action="store_true", help="salida JSON para CI")
+    concurrency.add_argument("--probe", choices=("reader", "writer"), help=argparse.SUPPRESS)
+    concurrency.add_argument("--profile", choices=PROFILES, help=argparse.SUPPRESS)
+    concurrency.add_argument("--db", help=argparse.SUPPRESS)
+    concurrency.add_argument("--start-at", type=float, help=argparse.SUPPRESS)
+
+    asyncio_bench = sub.add_parser("async", help="retraso del bucle asyncio con miles de pedidos a la vez")
+    asyncio_bench.add_argument("--tasks", type=int, default=100000)
+    asyncio_bench.add_argument("--requests", type=int, default=5000)
+    asyncio_bench.add_argument("--concurrency", type=int, default=None,
+                               help="operaciones en vuelo (por defecto, una por conexión)")
+
+    suite = sub.add_parser("suite", help="cada etapa de Final Code.py sobre bases sintéticas, con salida JSON")
+    suite.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000, 1000000])
+    suite.add_argument("--repeat", type=int, default=3)
+    suite.add_argument("--crud-ops", type=int, default=200, help="operaciones por corrida de add/update/delete")
+    suite.add_argument("--seed", type=int, default=0)
+    suite.add_argument("--data-dir", help="dónde generar y reutilizar las bases (por defecto, temporal)")
+    suite.add_argument("--output", help="archivo JSON de resultados (por defecto, a la salida estándar)")
+    suite.add_argument("--baseline", help="JSON de una corrida anterior contra el que comparar")
+    suite.add_argument("--tolerance", type=float, default=0.2, help="aumento relativo que cuenta como regresión")
+    suite.add_argument("--min-delta", type=float, default=1.0, help="ms de diferencia que se ignoran como ruido")
+
+    args = parser.parse_args(argv)
+    if args.command == "suite":
+        regressions = bench_suite(args.rows, args.repeat, args.crud_ops, args.seed, args.data_dir, args.output,
+                                  args.baseline, args.tolerance, args.min_delta)
+        sys.exit(1 if regressions else 0)
+    if args.command == "engine-import":
+        sys.exit(0 if bench_engine_import(args.runs, args.limit_ms, args.json) else 1)
+    if args.command == "concurrency":
+        if args.probe:
+            concurrency_probe(args.probe, args.profile, args.db, args.seconds, args.start_at, args.busy_timeout)
+        else:
+            bench_concurrency(args.tasks, args.readers, args.writers, args.seconds, args.busy_timeout, args.json)
+        return
+    if args.command == "memory":
+        if args.probe:
+            memory_probe(args.probe, args.db)
+        else:
+            bench_memory(args.rows, args.json)
+        return
+    if args.command == "startup":
+        if args.probe:
+            startup_probe()
+        else:
+            bench_startup(args.tasks, args.runs, args.json)
+        return
+    if args.command == "calendar":
+        bench_calendar(args.tasks, args.months, args.pause)
+        return
+    if args.command == "pool":
+        bench_pool(args.ops)
+    elif args.command == "filters":
+        bench_filters(args.tasks, args.queries)
+    elif args.command == "columns":
+        bench_columns(args.tasks, args.queries)
+    elif args.command == "search":
+        bench_search(args.tasks, args.repeat)
+    elif args.command == "calendar-events":
+        bench_calendar_events(load_app(), args.tasks, args.legacy_tasks, args.months)
+    elif args.command == "async":
+        bench_async(args.tasks, args.requests, args.concurrency)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,2436 @@
+# Núcleo del gestor de tareas, sin interfaz gráfica
+#
+# Validación, persistencia en SQLite, almacén en memoria, filtros y datos de
+# los gráficos. Final Code.py y Proyecto Final 5.0.py son vistas de Tkinter
+# sobre TaskEngine; un servidor o un proceso por lotes lo usan igual:
+#
+#   engine = TaskEngine("tasks.db").load()
+#   engine.add_task("Informe", due_date="2030-01-15", tags="trabajo")
+#   engine.find(TaskFilter(priority="alta"), text="informe")
+#
+# No importa tkinter ni matplotlib, y numpy solo cuando se usa la caché
+# columnar o los datos del modo densidad.
+#
+#   python task_engine.py --import tareas.csv   (importación masiva)
+
+from datetime import date, datetime
+import sqlite3
+import queue
+import threading
+import calendar
+import csv
+import json
+import os
+import random
+import sys
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from functools import wraps
+
+
+# ======================
+# TAREA
+# ======================
+NO_DUE_DATE = "Sin fecha"
+# Las fechas se comparan como días desde 1970-01-01 (columna due_day)
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def _intern(value):
+    """sys.intern para los textos; deja pasar NULL y otros tipos"""
+    # gestor de tareas.py inserta solo el título: prioridad y estado NULL
+    return sys.intern(value) if type(value) is str else value
+
+
+class Task:
+    """Registro compacto de una tarea.
+
+    Usa __slots__ en lugar de un diccionario por fila. Prioridad, estado y
+    fecha se internan y las etiquetas se guardan como tuplas compartidas,
+    así un millón de tareas reutiliza las mismas pocas cadenas y tuplas.
+    id es None mientras la tarea no está guardada.
+
+    due es la fecha límite ya interpretada (date, o None si no tiene): cada
+    texto distinto de due_date se interpreta una sola vez y las tareas con
+    la misma fecha comparten el objeto.
+    """
+
+    FIELDS = ('id', 'title', 'description', 'due_date', 'priority', 'status', 'tags')
+    __slots__ = FIELDS + ('due',)
+
+    # texto de la columna tags o tupla de etiquetas -> tupla interna compartida
+    _interned_tags = {}
+    # texto de la columna due_date -> (texto internado, date o None)
+    _due_dates = {}
+
+    def __init__(self, id, title, description, due_date, priority, status, tags=()):
+        self.id = id
+        self.title = title
+        self.description = description
+        self.due_date, self.due = self._due_entry(due_date)
+        self.priority = _intern(priority)
+        self.status = _intern(status)
+        self.tags = self.intern_tags(tags)
+
+    @classmethod
+    def clear_caches(cls):
+        """Olvida las etiquetas y fechas internadas; se llama antes de releer toda la tabla"""
+        # Se reemplazan en lugar de vaciarlas: un hilo que esté leyendo filas
+        # sigue con los diccionarios anteriores sin errores
+        cls._interned_tags = {}
+        cls._due_dates = {}
+
+    @classmethod
+    def intern_tags(cls, tags):
+        key = tuple(tags)
+        interned = cls._interned_tags.get(key)
+        if interned is None:
+            interned = cls._interned_tags.setdefault(key, tuple(sys.intern(tag) for tag in key))
+        return interned
+
+    @classmethod
+    def _due_entry(cls, text):
+        entry = cls._due_dates.get(text)
+        if entry is None:
+            due = None
+            if text and text != NO_DUE_DATE:
+                try:
+                    due = datetime.strptime(text, '%Y-%m-%d').date()
+                except ValueError:
+                    pass
+                # Igual que due_day en SQLite: solo cuenta la forma YYYY-MM-DD exacta
+                if due is not None and due.isoformat() != text:
+                    due = None
+            interned = sys.intern(text) if text is not None else NO_DUE_DATE
+            entry = cls._due_dates.setdefault(text, (interned, due))
+        return entry
+
+    @classmethod
+    def parse_due_date(cls, text):
+        """date de un texto 'YYYY-MM-DD', o None si no es una fecha"""
+        return cls._due_entry(text)[1]
+
+    @property
+    def due_day(self):
+        """Días desde 1970-01-01, el valor de due_day en SQLite (None sin fecha)"""
+        return None if self.due is None else self.due.toordinal() - EPOCH_ORDINAL
+
+    @classmethod
+    def from_row(cls, row):
+        """Construye la tarea desde (id, title, description, due_date, priority, status, tags)"""
+        tags = cls._interned_tags.get(row[6])
+        if tags is None:
+            tags = cls._interned_tags.setdefault(row[6], cls.intern_tags(row[6].split(",") if row[6] else ()))
+        task = cls.__new__(cls)
+        task.id = row[0]
+        task.title = row[1]
+        task.description = row[2]
+        entry = cls._due_dates.get(row[3])
+        task.due_date, task.due = entry if entry is not None else cls._due_entry(row[3])
+        task.priority = _intern(row[4])
+        task.status = _intern(row[5])
+        task.tags = tags
+        return task
+
+    def replace(self, **changes):
+        """Copia de la tarea con algunos campos cambiados"""
+        values = {field: getattr(self, field) for field in self.FIELDS}
+        values.update(changes)
+        return Task(**values)
+
+    def __eq__(self, other):
+        if not isinstance(other, Task):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in self.FIELDS)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Task(id={self.id!r}, title={self.title!r}, due_date={self.due_date!r})"
+
+# ======================
+# VALIDACIÓN
+# ======================
+PRIORITIES = ("alta", "media", "baja")
+STATUSES = ("pendiente", "en progreso", "completada")
+
+
+class TaskValidationError(ValueError):
+    """Datos de tarea rechazados; el mensaje se muestra tal cual al usuario"""
+
+
+def build_task(title, description="", due_date="", priority="media", status="pendiente", tags="",
+               allow_past=False):
+    """Valida los datos de una tarea y devuelve la Task (sin id) que se guarda"""
+    if not title:
+        raise TaskValidationError("El título es obligatorio")
+    
+    due = None
+    if due_date and due_date != NO_DUE_DATE:
+        due = Task.parse_due_date(due_date)
+        if due is None:
+            # strptime también acepta la fecha sin ceros (2030-1-5); se guarda
+            # con ceros porque due_day solo reconoce esa forma
+            try:
+                due = datetime.strptime(due_date, '%Y-%m-%d').date()
+            except ValueError:
+                raise TaskValidationError("Formato de fecha inválido. Use YYYY-MM-DD") from None
+        # Como el formulario (datetime.now()), hoy ya cuenta como pasado.
+        # allow_past: solo el formato, la regla de Proyecto Final 5.0
+        if not allow_past and due <= date.today():
+            raise TaskValidationError("La fecha no puede ser en el pasado")
+    
+    # La tabla tiene CHECK sobre estos campos: mejor un mensaje que un IntegrityError
+    if priority not in PRIORITIES:
+        raise TaskValidationError(f"Prioridad inválida: {priority}")
+    if status not in STATUSES:
+        raise TaskValidationError(f"Estado inválido: {status}")
+    
+    # Texto separado por comas o lista
+    if isinstance(tags, str):
+        tags = tags.split(",")
+    return Task(None, title, description, due.isoformat() if due else NO_DUE_DATE, priority, status,
+                [tag.strip() for tag in (tags or []) if tag and tag.strip()])
+
+# ======================
+# BASE DE DATOS (SQLite)
+# ======================
+class ConnectionPool:
+    """Pool de conexiones SQLite persistentes.
+
+    Cada hilo toma una conexión propia mientras dura la operación (las
+    llamadas anidadas del mismo hilo reutilizan la misma) y al terminar la
+    devuelve al pool en lugar de cerrarla. Así el esquema y las sentencias
+    preparadas quedan en caché entre operaciones.
+    """
+
+    def __init__(self, db_name, size=5, timeout=30.0, cached_statements=128, on_connect=None):
+        self.db_name = db_name
+        # Cada conexión a ":memory:" abre una base distinta: se comparte una sola
+        self.size = 1 if db_name == ":memory:" else max(1, size)
+        self.timeout = timeout
+        self.cached_statements = cached_statements
+        self.on_connect = on_connect  # configura cada conexión nueva
+        self._idle = queue.LifoQueue()
+        self._connections = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._closed = False
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_name,
+                               timeout=self.timeout,
+                               check_same_thread=False,
+                               cached_statements=self.cached_statements)
+        if self.on_connect is not None:
+            self.on_connect(conn)
+        return conn
+
+    def _acquire(self):
+        if self._closed:
+            raise sqlite3.ProgrammingError("El pool de conexiones está cerrado")
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if len(self._connections) < self.size:
+                conn = self._connect()
+                self._connections.append(conn)
+                return conn
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise sqlite3.OperationalError("No hay conexiones libres en el pool") from None
+
+    def _release(self, conn):
+        if self._closed:
+            conn.close()
+        else:
+            self._idle.put(conn)
+
+    @property
+    def in_transaction(self):
+        """True si el hilo actual ya tiene una conexión prestada"""
+        return getattr(self._local, 'conn', None) is not None
+
+    @contextmanager
+    def connection(self):
+        """Presta una conexión al hilo actual dentro de una transacción"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            # Llamada anidada: la transacción la cierra el bloque exterior
+            yield conn
+            return
+
+        conn = self._acquire()
+        self._local.conn = conn
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self._local.conn = None
+            self._release(conn)
+
+    def close(self):
+        """Cierra todas las conexiones; las que están en uso se cierran al devolverse"""
+        with self._lock:
+            self._closed = True
+            self._connections.clear()
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+
+
+class QueryCancelled(Exception):
+    """Consulta interrumpida con DatabaseManager.cancellable()"""
+
+
+class SQLiteProfile:
+    """Ajustes de rendimiento que se aplican a cada conexión del pool.
+
+    Los valores por defecto permiten que varias instancias de la aplicación
+    compartan tasks.db: con WAL los lectores no bloquean al escritor ni al
+    revés, synchronous=NORMAL solo sincroniza el disco en los checkpoints,
+    y la caché de páginas, mmap y temp_store=MEMORY evitan lecturas y
+    archivos temporales. Las escrituras empiezan con BEGIN IMMEDIATE, así
+    que esperan el bloqueo (busy_timeout) en lugar de fallar a mitad de la
+    transacción, y si aun así la base sigue bloqueada se reintentan hasta
+    retries veces con espera exponencial. None deja el valor de SQLite.
+    """
+
+    def __init__(self, journal_mode="WAL", synchronous="NORMAL", cache_size_mb=64, mmap_size_mb=256,
+                 temp_store="MEMORY", busy_timeout=5.0, retries=5, retry_delay=0.05, immediate=True):
+        self.journal_mode = journal_mode
+        self.synchronous = synchronous
+        self.cache_size_mb = cache_size_mb
+        self.mmap_size_mb = mmap_size_mb
+        self.temp_store = temp_store
+        self.busy_timeout = busy_timeout  # segundos
+        self.retries = retries
+        self.retry_delay = retry_delay  # segundos, se duplica en cada intento
+        self.immediate = immediate
+
+    @classmethod
+    def sqlite_defaults(cls):
+        """Configuración de SQLite sin tocar (journal de rollback, sync FULL)"""
+        return cls(journal_mode=None, synchronous=None, cache_size_mb=None, mmap_size_mb=None,
+                   temp_store=None, retries=0, immediate=False)
+
+    def apply(self, conn):
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout * 1000)}")
+        if self.journal_mode is not None:
+            # journal_mode queda guardado en el archivo de la base
+            conn.execute(f"PRAGMA journal_mode = {self.journal_mode}")
+        if self.synchronous is not None:
+            conn.execute(f"PRAGMA synchronous = {self.synchronous}")
+        if self.cache_size_mb is not None:
+            # Un valor negativo se interpreta en KiB en lugar de páginas
+            conn.execute(f"PRAGMA cache_size = {-self.cache_size_mb * 1024}")
+        if self.mmap_size_mb is not None:
+            conn.execute(f"PRAGMA mmap_size = {self.mmap_size_mb * 1024 * 1024}")
+        if self.temp_store is not None:
+            conn.execute(f"PRAGMA temp_store = {self.temp_store}")
+        if self.immediate:
+            conn.isolation_level = "IMMEDIATE"
+
+    def delays(self):
+        """Esperas entre reintentos con espera exponencial"""
+        for attempt in range(self.retries):
+            # Algo de azar para que varios procesos no reintenten a la vez
+            yield self.retry_delay * 2 ** attempt * random.uniform(0.5, 1.5)
+
+
+def _retry_when_locked(method):
+    """Repite la transacción completa si SQLite responde que la base está bloqueada"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.pool.in_transaction:
+            # Dentro de otra transacción reintenta el bloque exterior
+            return method(self, *args, **kwargs)
+        for delay in self.profile.delays():
+            try:
+                return method(self, *args, **kwargs)
+            except sqlite3.OperationalError as error:
+                if not self.is_locked(error):
+                    raise
+            time.sleep(delay)
+        return method(self, *args, **kwargs)
+    return wrapper
+
+
+class DatabaseManager:
+    # Sentencias fijas: al reutilizar el mismo texto SQL, sqlite3 recupera la
+    # sentencia ya preparada de la caché de cada conexión
+    INSERT_TASK_SQL = """
+        INSERT INTO tasks (title, description, due_date, priority, status, tags)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """
+    TASK_COLUMNS = "tasks.id, tasks.title, tasks.description, tasks.due_date, tasks.priority, tasks.status, tasks.tags"
+    SELECT_ALL_SQL = f"SELECT {TASK_COLUMNS} FROM tasks"
+    UPDATE_TASK_SQL = """
+        UPDATE tasks 
+        SET title=?, description=?, due_date=?, priority=?, status=?, tags=?
+        WHERE id=?
+    """
+    DELETE_TASK_SQL = "DELETE FROM tasks WHERE id=?"
+    
+    # Etiquetas normalizadas (tags + task_tags)
+    INSERT_TAG_SQL = "INSERT OR IGNORE INTO tags (name) VALUES (?)"
+    INSERT_TASK_TAG_SQL = """
+        INSERT OR IGNORE INTO task_tags (task_id, tag_id)
+        SELECT ?, id FROM tags WHERE name=?
+    """
+    # Etiquetas de NEW.tags (texto separado por comas), sin espacios alrededor
+    # ni vacías; la usan los triggers que mantienen task_tags (las repetidas
+    # las descarta INSERT OR IGNORE)
+    NEW_TAGS_SQL = """
+        WITH RECURSIVE split(name, rest) AS (
+            SELECT '', NEW.tags || ','
+            UNION ALL
+            SELECT trim(substr(rest, 1, instr(rest, ',') - 1), char(32, 9, 10, 13)),
+                   substr(rest, instr(rest, ',') + 1)
+            FROM split WHERE rest != ''
+        )
+        SELECT name FROM split WHERE name != ''
+    """
+    
+    # Versión del esquema guardada en PRAGMA user_version
+    SCHEMA_VERSION = 7
+    
+    # Fecha límite como entero (días desde 1970-01-01), NULL si due_date no
+    # es una fecha YYYY-MM-DD válida. Es una columna generada: se mantiene
+    # sola también cuando escriben las otras aplicaciones, que siguen usando
+    # el texto de due_date
+    DUE_DAY_SQL = """
+        CASE WHEN date(julianday(due_date)) = due_date
+             THEN CAST(julianday(due_date) - 2440587.5 AS INTEGER) END
+    """
+    
+    # Cada cuántas instrucciones de SQLite se revisa si cancelar una consulta
+    PROGRESS_STEPS = 1000
+
+    def __init__(self, db_name="tasks.db", pool_size=5, profile=None):
+        self.db_name = db_name
+        self.profile = profile if profile is not None else SQLiteProfile()
+        self.pool = ConnectionPool(db_name, size=pool_size, on_connect=self._configure_connection)
+        self._create_tables()
+
+    @staticmethod
+    def is_locked(error):
+        """True si el error es un bloqueo de la base ("locked" o "busy"), que pasa al reintentar"""
+        message = str(error)
+        return "locked" in message or "busy" in message
+
+    def _configure_connection(self, conn):
+        self.profile.apply(conn)
+        # lower() de SQLite solo convierte ASCII; el filtro usa el de Python
+        conn.create_function("py_lower", 1, lambda text: text.lower() if text else text,
+                             deterministic=True)
+
+    @contextmanager
+    def _get_cursor(self):
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                yield cursor
+            finally:
+                cursor.close()
+
+    @contextmanager
+    def cancellable(self, cancelled):
+        """Permite interrumpir las consultas del bloque desde otro hilo.
+
+        Mientras dura el bloque, SQLite consulta cancelled.is_set() cada
+        PROGRESS_STEPS instrucciones de su máquina virtual: en cuanto el
+        evento se activa la consulta en curso se corta y se lanza
+        QueryCancelled. Solo tiene sentido para lecturas.
+        """
+        if cancelled.is_set():
+            raise QueryCancelled()
+        with self.pool.connection() as conn:
+            conn.set_progress_handler(cancelled.is_set, self.PROGRESS_STEPS)
+            try:
+                yield
+            except sqlite3.OperationalError:
+                if cancelled.is_set():
+                    raise QueryCancelled() from None
+                raise
+            finally:
+                conn.set_progress_handler(None, self.PROGRESS_STEPS)
+
+    def close(self):
+        """Cierra las conexiones del pool"""
+        self.pool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @_retry_when_locked
+    def _create_tables(self):
+        with self._get_cursor() as cursor:
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS tasks (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    title TEXT NOT NULL,
+                    description TEXT,
+                    due_date TEXT,
+                    priority TEXT CHECK(priority IN ('alta', 'media', 'baja')),
+                    status TEXT CHECK(status IN ('pendiente', 'en progreso', 'completada')),
+                    tags TEXT
+                )
+            """)
+            # Antes de los índices: idx_status necesita la columna
+            self._upgrade_5_0_table(cursor)
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_priority ON tasks(priority)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_status ON tasks(status)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_due_date ON tasks(due_date)")
+            
+            # Etiquetas normalizadas: una fila por etiqueta distinta y una
+            # tabla de unión indexada en ambos sentidos
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS tags (
+                    id INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL UNIQUE COLLATE NOCASE
+                )
+            """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS task_tags (
+                    task_id INTEGER NOT NULL REFERENCES tasks(id) ON DELETE CASCADE,
+                    tag_id INTEGER NOT NULL REFERENCES tags(id),
+                    PRIMARY KEY (task_id, tag_id)
+                ) WITHOUT ROWID
+            """)
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_task_tags_tag ON task_tags(tag_id, task_id)")
+            # Las otras aplicaciones que comparten tasks.db solo escriben la
+            # columna tags y no activan foreign_keys: task_tags se mantiene
+            # con triggers, igual que el índice FTS y el registro de cambios
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS trg_tasks_delete_tags AFTER DELETE ON tasks
+                BEGIN
+                    DELETE FROM task_tags WHERE task_id = OLD.id;
+                END
+            """)
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_tasks_insert_tags AFTER INSERT ON tasks
+                WHEN NEW.tags IS NOT NULL AND NEW.tags != ''
+                BEGIN
+                    INSERT OR IGNORE INTO tags (name) {self.NEW_TAGS_SQL};
+                    INSERT OR IGNORE INTO task_tags (task_id, tag_id)
+                    SELECT NEW.id, id FROM tags WHERE name IN ({self.NEW_TAGS_SQL});
+                END
+            """)
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_tasks_update_tags AFTER UPDATE OF tags ON tasks
+                BEGIN
+                    DELETE FROM task_tags WHERE task_id = NEW.id;
+                    INSERT OR IGNORE INTO tags (name) {self.NEW_TAGS_SQL};
+                    INSERT OR IGNORE INTO task_tags (task_id, tag_id)
+                    SELECT NEW.id, id FROM tags WHERE name IN ({self.NEW_TAGS_SQL});
+                END
+            """)
+            
+            # Búsqueda de texto completo: índice FTS5 sobre title/description
+            # que lee el contenido de tasks; los triggers lo mantienen al día
+            # también cuando escriben las otras aplicaciones
+            cursor.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+                    title, description,
+                    content='tasks', content_rowid='id',
+                    tokenize='unicode61 remove_diacritics 2'
+                )
+            """)
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS trg_tasks_fts_insert AFTER INSERT ON tasks
+                BEGIN
+                    INSERT INTO tasks_fts (rowid, title, description)
+                    VALUES (NEW.id, NEW.title, NEW.description);
+                END
+            """)
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS trg_tasks_fts_delete AFTER DELETE ON tasks
+                BEGIN
+                    INSERT INTO tasks_fts (tasks_fts, rowid, title, description)
+                    VALUES ('delete', OLD.id, OLD.title, OLD.description);
+                END
+            """)
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS trg_tasks_fts_update AFTER UPDATE OF title, description ON tasks
+                BEGIN
+                    INSERT INTO tasks_fts (tasks_fts, rowid, title, description)
+                    VALUES ('delete', OLD.id, OLD.title, OLD.description);
+                    INSERT INTO tasks_fts (rowid, title, description)
+                    VALUES (NEW.id, NEW.title, NEW.description);
+                END
+            """)
+            
+            # Registro de cambios: cada escritura en tasks, venga de la
+            # instancia que venga, deja una fila con un seq creciente que las
+            # demás consultan (ver ChangeFeed)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS task_changes (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    task_id INTEGER NOT NULL,
+                    action TEXT NOT NULL CHECK(action IN ('add', 'update', 'delete')),
+                    changed_at INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER))
+                )
+            """)
+            for action, event, row in (("add", "INSERT", "NEW"), ("update", "UPDATE", "NEW"),
+                                       ("delete", "DELETE", "OLD")):
+                cursor.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS trg_tasks_changes_{action} AFTER {event} ON tasks
+                    BEGIN
+                        INSERT INTO task_changes (task_id, action) VALUES ({row}.id, '{action}');
+                    END
+                """)
+            self._migrate(cursor)
+
+    def _migrate(self, cursor):
+        """Actualiza en el lugar las bases creadas con versiones anteriores"""
+        version = cursor.execute("PRAGMA user_version").fetchone()[0]
+        
+        if version < 2:
+            # Indexar las tareas que ya existían antes de tasks_fts
+            cursor.execute("INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')")
+        
+        if version < 4:
+            # Columna due_day; otra instancia pudo agregarla mientras tanto
+            columns = {row[1] for row in cursor.execute("PRAGMA table_xinfo(tasks)")}
+            if "due_day" not in columns:
+                cursor.execute(f"ALTER TABLE tasks ADD COLUMN due_day INTEGER "
+                               f"GENERATED ALWAYS AS ({self.DUE_DAY_SQL}) VIRTUAL")
+            # Rango de fechas y orden por fecha sobre enteros, también
+            # filtrando por prioridad o estado
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_due_day ON tasks(due_day)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_priority_due_day ON tasks(priority, due_day)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_status_due_day ON tasks(status, due_day)")
+            cursor.execute("DROP INDEX IF EXISTS idx_priority_due_date")
+            cursor.execute("DROP INDEX IF EXISTS idx_status_due_date")
+        
+        # Versión 5: ver _upgrade_5_0_table
+        
+        if version < 6:
+            # Copiar la columna tags (texto separado por comas) a task_tags.
+            # Antes de los triggers las filas de las otras aplicaciones
+            # quedaban sin etiquetas indexadas: se reconstruye completa
+            cursor.execute("DELETE FROM task_tags")
+            rows = cursor.connection.execute(
+                "SELECT id, tags FROM tasks WHERE tags IS NOT NULL AND tags != ''")
+            for task_id, tags in rows:
+                self._set_task_tags(cursor, task_id, tags.split(","))
+        
+        if version < 7:
+            # Fechas sin ceros (2030-1-7) guardadas antes de build_task: sin
+            # due_day la tarea no sale en la línea de tiempo ni en el calendario
+            rows = cursor.connection.execute(
+                "SELECT id, due_date FROM tasks WHERE due_day IS NULL AND due_date IS NOT NULL").fetchall()
+            for task_id, due_date in rows:
+                try:
+                    due = datetime.strptime(due_date, '%Y-%m-%d').date()
+                except ValueError:
+                    continue
+                cursor.execute("UPDATE tasks SET due_date = ? WHERE id = ?", (due.isoformat(), task_id))
+        
+        if version < self.SCHEMA_VERSION:
+            cursor.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+
+    def _upgrade_5_0_table(self, cursor):
+        """Adapta la tabla creada y escrita por Proyecto Final 5.0 (versión 5)"""
+        # 5.0 creaba tasks sin status; agregarla no toca las filas
+        columns = {row[1] for row in cursor.execute("PRAGMA table_xinfo(tasks)")}
+        if "status" not in columns:
+            cursor.execute("ALTER TABLE tasks ADD COLUMN status TEXT "
+                           "CHECK(status IN ('pendiente', 'en progreso', 'completada'))")
+        # Datos, una sola vez: sin esto sus tareas no pasan build_task ni los filtros
+        if cursor.execute("PRAGMA user_version").fetchone()[0] < 5:
+            cursor.execute("UPDATE tasks SET priority = lower(priority) WHERE priority IN ('Alta', 'Media', 'Baja')")
+            cursor.execute("UPDATE tasks SET status = 'pendiente' WHERE status IS NULL")
+
+    def _set_task_tags(self, cursor, task_id, tags):
+        """Agrega a task_tags las etiquetas de una tarea (solo al migrar)"""
+        names = [tag.strip() for tag in tags if tag.strip()]
+        if names:
+            cursor.executemany(self.INSERT_TAG_SQL, ((name,) for name in names))
+            cursor.executemany(self.INSERT_TASK_TAG_SQL, ((task_id, name) for name in names))
+
+    @_retry_when_locked
+    def add_task(self, task):
+        with self._get_cursor() as cursor:
+            cursor.execute(self.INSERT_TASK_SQL, (
+                task.title,
+                task.description,
+                task.due_date,
+                task.priority,
+                task.status,
+                ",".join(task.tags) if task.tags else ""
+            ))
+            task_id = cursor.lastrowid
+            # Devolver la fila tal como la leería get_all_tasks
+            return task.replace(id=task_id)
+
+    def add_tasks_bulk(self, tasks, chunk_size=1000, progress=None):
+        """Inserta muchas tareas ya validadas en una sola transacción.
+
+        Consume el iterable por lotes de chunk_size con executemany, así que
+        acepta generadores sin materializarlos. progress(insertadas) se llama
+        tras cada lote. Devuelve la cantidad de tareas insertadas. Por lo
+        mismo no se reintenta si la base está bloqueada: solo espera
+        busy_timeout a que se libere.
+        """
+        inserted = 0
+        with self._get_cursor() as cursor:
+            iterator = iter(tasks)
+            while True:
+                chunk = [task for _, task in zip(range(chunk_size), iterator)]
+                if not chunk:
+                    break
+                cursor.executemany(self.INSERT_TASK_SQL, ((
+                    task.title,
+                    task.description,
+                    task.due_date,
+                    task.priority,
+                    task.status,
+                    ",".join(task.tags) if task.tags else ""
+                ) for task in chunk))
+                inserted += len(chunk)
+                if progress is not None:
+                    progress(inserted)
+        return inserted
+
+    def get_all_tasks(self):
+        # Las cachés de Task quedan con los valores de esta lectura, no de todas las anteriores
+        Task.clear_caches()
+        with self._get_cursor() as cursor:
+            cursor.execute(self.SELECT_ALL_SQL)
+            return [Task.from_row(row) for row in cursor]
+
+    @_retry_when_locked
+    def update_task(self, task_id, updated_task):
+        with self._get_cursor() as cursor:
+            cursor.execute(self.UPDATE_TASK_SQL, (
+                updated_task.title,
+                updated_task.description,
+                updated_task.due_date,
+                updated_task.priority,
+                updated_task.status,
+                ",".join(updated_task.tags) if updated_task.tags else "",
+                task_id
+            ))
+
+    @_retry_when_locked
+    def delete_task(self, task_id):
+        with self._get_cursor() as cursor:
+            cursor.execute(self.DELETE_TASK_SQL, (task_id,))
+
+    # Columnas permitidas en query_tasks(order_by=...)
+    ORDER_COLUMNS = ("id", "due_date", "title", "priority", "status")
+    # La fecha se ordena por el entero indexado; Task.due_day da el mismo valor
+    SORT_KEYS = {"due_date": "due_day"}
+
+    def _build_where(self, priority=None, status=None, tags=None, tag_match="any",
+                     tag_terms=None, due_from=None, due_to=None, text=None):
+        """Construye la cláusula WHERE y sus parámetros para query_tasks"""
+        conditions = []
+        params = []
+        
+        if priority is not None:
+            conditions.append("tasks.priority = ?")
+            params.append(priority)
+        if status is not None:
+            conditions.append("tasks.status = ?")
+            params.append(status)
+        
+        # Las tareas sin fecha tienen due_day NULL y quedan fuera de cualquier rango
+        if due_from is not None:
+            conditions.append("tasks.due_day >= ?")
+            params.append(self._epoch_day(due_from))
+        if due_to is not None:
+            conditions.append("tasks.due_day <= ?")
+            params.append(self._epoch_day(due_to))
+        
+        if tags is not None:
+            if tag_match not in ("any", "all"):
+                raise ValueError("tag_match debe ser 'any' o 'all'")
+            names = list(dict.fromkeys(tag.strip().lower() for tag in tags if tag.strip()))
+            placeholders = ", ".join("?" * len(names))
+            having = f"HAVING COUNT(*) = {len(names)}" if tag_match == "all" else ""
+            conditions.append(f"""tasks.id IN (
+                SELECT task_tags.task_id FROM tags
+                JOIN task_tags ON task_tags.tag_id = tags.id
+                WHERE tags.name IN ({placeholders})
+                GROUP BY task_tags.task_id {having}
+            )""")
+            params.extend(names)
+        
+        if tag_terms is not None:
+            # Semántica del panel de filtros: cada etiqueta de la tarea debe
+            # contener alguno de los términos (las tareas sin etiquetas pasan)
+            terms = [term.strip().lower() for term in tag_terms if term.strip()]
+            matches = " OR ".join("instr(py_lower(tags.name), ?) > 0" for _ in terms) or "0"
+            conditions.append(f"""NOT EXISTS (
+                SELECT 1 FROM task_tags
+                JOIN tags ON tags.id = task_tags.tag_id
+                WHERE task_tags.task_id = tasks.id AND NOT ({matches})
+            )""")
+            params.extend(terms)
+        
+        if text is not None:
+            match = self._fts_query(text)
+            if match:
+                conditions.append("tasks.id IN (SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH ?)")
+                params.append(match)
+        
+        return (" AND ".join(conditions) or "1"), params
+
+    @staticmethod
+    def _epoch_day(value):
+        """date o texto 'YYYY-MM-DD' como valor comparable con due_day"""
+        if isinstance(value, str):
+            parsed = Task.parse_due_date(value)
+            if parsed is None:
+                raise ValueError(f"Fecha inválida: {value!r}")
+            value = parsed
+        return value.toordinal() - EPOCH_ORDINAL
+
+    def query_tasks(self, priority=None, status=None, tags=None, due_from=None, due_to=None,
+                    order_by="id", limit=None, offset=0, after=None, tag_match="any", tag_terms=None,
+                    text=None):
+        """Consulta filtrada, ordenada y paginada resuelta por completo en SQLite.
+
+        order_by acepta una columna de ORDER_COLUMNS, con "-" delante para
+        orden descendente; el id desempata siempre. Para paginar conviene
+        pasar en after la última tarea de la página anterior (keyset), que
+        usa los índices en lugar de recorrer las filas que salta offset.
+        due_from y due_to aceptan date o 'YYYY-MM-DD'; al ordenar por
+        due_date las tareas sin fecha van primero (al final con "-due_date").
+        """
+        descending = order_by.startswith("-")
+        column = order_by.lstrip("-")
+        if column not in self.ORDER_COLUMNS:
+            raise ValueError(f"No se puede ordenar por {order_by!r}")
+        column = self.SORT_KEYS.get(column, column)
+        
+        where, params = self._build_where(priority, status, tags, tag_match, tag_terms, due_from, due_to, text)
+        direction = "DESC" if descending else "ASC"
+        comparison = "<" if descending else ">"
+        
+        if after is not None:
+            if column == "id":
+                where += f" AND tasks.id {comparison} ?"
+                params.append(after.id)
+            elif getattr(after, column) is None:
+                # NULL va antes que cualquier valor: en orden ascendente siguen
+                # las demás filas con NULL y luego todas las que tienen valor
+                where += f" AND (tasks.{column} IS NULL AND tasks.id {comparison} ?"
+                where += ")" if descending else f" OR tasks.{column} IS NOT NULL)"
+                params.append(after.id)
+            else:
+                where += f" AND ((tasks.{column}, tasks.id) {comparison} (?, ?)"
+                where += f" OR tasks.{column} IS NULL)" if descending else ")"
+                params.extend([getattr(after, column), after.id])
+        
+        order = f"tasks.id {direction}" if column == "id" else f"tasks.{column} {direction}, tasks.id {direction}"
+        sql = f"SELECT {self.TASK_COLUMNS} FROM tasks WHERE {where} ORDER BY {order}"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params.extend([limit, offset])
+        
+        with self._get_cursor() as cursor:
+            cursor.execute(sql, params)
+            return [Task.from_row(row) for row in cursor.fetchall()]
+
+    def count_tasks(self, **filters):
+        """Cantidad de tareas que cumplen los mismos filtros que query_tasks"""
+        where, params = self._build_where(**filters)
+        with self._get_cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) FROM tasks WHERE {where}", params)
+            return cursor.fetchone()[0]
+
+    def count_by_day(self, due_from, due_to):
+        """{'YYYY-MM-DD': cantidad} de los días entre due_from y due_to que tienen tareas"""
+        with self._get_cursor() as cursor:
+            # Solo lee el índice de due_day
+            cursor.execute("SELECT due_day, COUNT(*) FROM tasks WHERE due_day BETWEEN ? AND ? GROUP BY due_day",
+                           (self._epoch_day(due_from), self._epoch_day(due_to)))
+            return {date.fromordinal(day + EPOCH_ORDINAL).isoformat(): count for day, count in cursor}
+
+    def has_more_than(self, count):
+        """Indica si la tabla supera count filas sin contarla entera"""
+        with self._get_cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM (SELECT 1 FROM tasks LIMIT ?)", (count + 1,))
+            return cursor.fetchone()[0] > count
+
+    def get_tasks_by_tags(self, tags, match="any"):
+        """Tareas con alguna ("any") o todas ("all") las etiquetas dadas.
+
+        El filtro se resuelve en SQLite con el índice de task_tags, sin
+        recorrer la tabla de tareas. Las etiquetas no distinguen mayúsculas.
+        """
+        if match not in ("any", "all"):
+            raise ValueError("match debe ser 'any' o 'all'")
+        if not any(tag.strip() for tag in tags):
+            return []
+        return self.query_tasks(tags=tags, tag_match=match)
+
+    def get_all_tags(self):
+        """Nombres de etiquetas en uso, en orden alfabético"""
+        with self._get_cursor() as cursor:
+            cursor.execute("""
+                SELECT name FROM tags
+                WHERE EXISTS (SELECT 1 FROM task_tags WHERE task_tags.tag_id = tags.id)
+                ORDER BY name
+            """)
+            return [row[0] for row in cursor.fetchall()]
+
+    @staticmethod
+    def _fts_query(text):
+        """Convierte el texto del usuario en una consulta FTS5 segura.
+
+        Cada palabra se busca como prefijo ("plan" encuentra "planificar") y
+        deben aparecer todas. Van entre comillas, así que ningún texto
+        produce un error de sintaxis de FTS5.
+        """
+        return " ".join('"{}"*'.format(term.replace('"', '""')) for term in text.split())
+
+    def search(self, query, limit=20, mark=("[", "]")):
+        """Búsqueda de texto completo en título y descripción.
+
+        Devuelve pares (tarea, fragmento) ordenados por relevancia (bm25, con
+        más peso para el título). El fragmento es la parte del texto con más
+        coincidencias, que quedan entre los marcadores de mark. limit=None
+        devuelve todos los resultados.
+        """
+        match = self._fts_query(query)
+        if not match:
+            return []
+        with self._get_cursor() as cursor:
+            cursor.execute(f"""
+                SELECT {self.TASK_COLUMNS}, snippet(tasks_fts, -1, ?, ?, '…', 12)
+                FROM tasks_fts JOIN tasks ON tasks.id = tasks_fts.rowid
+                WHERE tasks_fts MATCH ?
+                ORDER BY bm25(tasks_fts, 10.0, 1.0)
+                LIMIT ?
+            """, (mark[0], mark[1], match, -1 if limit is None else limit))
+            return [(Task.from_row(row), row[7]) for row in cursor]
+
+    def search_ids(self, query):
+        """Ids de todas las tareas que coinciden con query, por relevancia"""
+        match = self._fts_query(query)
+        if not match:
+            return []
+        with self._get_cursor() as cursor:
+            cursor.execute("""
+                SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH ?
+                ORDER BY bm25(tasks_fts, 10.0, 1.0)
+            """, (match,))
+            return [row[0] for row in cursor]
+
+    def change_seq(self):
+        """seq del último cambio registrado en task_changes (0 si no hay)"""
+        with self._get_cursor() as cursor:
+            cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'task_changes'")
+            row = cursor.fetchone()
+            return row[0] if row else 0
+
+    def changes_since(self, seq, limit=1000):
+        """Cambios con seq mayor al dado, en orden: lista de (seq, id, tarea).
+
+        tarea es la fila actual de tasks, o None si la tarea ya no existe.
+        Es una sola consulta por rango de la clave primaria: sin cambios
+        nuevos cuesta una búsqueda en el índice.
+        """
+        with self._get_cursor() as cursor:
+            cursor.execute(f"""
+                SELECT task_changes.seq, task_changes.task_id, {self.TASK_COLUMNS}
+                FROM task_changes LEFT JOIN tasks ON tasks.id = task_changes.task_id
+                WHERE task_changes.seq > ?
+                ORDER BY task_changes.seq
+                LIMIT ?
+            """, (seq, limit))
+            return [(row[0], row[1], Task.from_row(row[2:]) if row[2] is not None else None)
+                    for row in cursor]
+
+    @_retry_when_locked
+    def compact_changes(self, max_age=86400):
+        """Borra del registro los cambios con más de max_age segundos.
+
+        El último cambio se conserva siempre, así una instancia que quedó
+        atrás ve el salto de seq y recarga en lugar de creer que no hubo
+        cambios. Devuelve la cantidad de filas borradas.
+        """
+        with self._get_cursor() as cursor:
+            cursor.execute("""
+                DELETE FROM task_changes WHERE seq < COALESCE(
+                    (SELECT seq FROM task_changes WHERE changed_at >= ? ORDER BY seq LIMIT 1),
+                    (SELECT MAX(seq) FROM task_changes)
+                )
+            """, (int(time.time()) - max_age,))
+            return cursor.rowcount
+
+    def iter_task_columns(self, batch_size=50000):
+        """Recorre (id, due_date, priority, status, tags) de todas las tareas por lotes.
+
+        Alimenta TaskColumns en una sola pasada sin materializar la tabla.
+        """
+        with self._get_cursor() as cursor:
+            cursor.execute("SELECT id, due_date, priority, status, tags FROM tasks ORDER BY id")
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+
+    def get_tasks_by_ids(self, ids):
+        """Tareas con los ids dados, en orden de id"""
+        tasks = []
+        with self._get_cursor() as cursor:
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                cursor.execute(f"SELECT {self.TASK_COLUMNS} FROM tasks WHERE id IN ({placeholders}) ORDER BY id", chunk)
+                tasks.extend(Task.from_row(row) for row in cursor)
+        return tasks
+
+class TaskPager:
+    """Paginación por keyset sobre DatabaseManager.query_tasks.
+
+    Guarda la última tarea de cada página visitada y pide la siguiente con
+    after=..., así que cambiar de página cuesta lo mismo al principio que al
+    final de una tabla de millones de filas.
+    """
+
+    def __init__(self, db, page_size=200, order_by="id", **filters):
+        self.db = db
+        self.page_size = page_size
+        self.order_by = order_by
+        self.filters = filters
+        self.page = 0
+        self.rows = []
+        self.has_next = False
+        self._cursors = [None]  # valor de after para cada página
+
+    def _fetch(self):
+        rows = self.db.query_tasks(order_by=self.order_by, limit=self.page_size + 1,
+                                   after=self._cursors[self.page], **self.filters)
+        self.has_next = len(rows) > self.page_size
+        self.rows = rows[:self.page_size]
+        # Las páginas siguientes pueden haber cambiado con la última escritura
+        del self._cursors[self.page + 1:]
+        if self.has_next:
+            self._cursors.append(self.rows[-1])
+        return self.rows
+
+    def first(self):
+        self.page = 0
+        return self._fetch()
+
+    def next(self):
+        if self.has_next:
+            self.page += 1
+        return self._fetch()
+
+    def previous(self):
+        if self.page > 0:
+            self.page -= 1
+        return self._fetch()
+
+    def reload(self):
+        return self._fetch()
+
+
+class ColumnPager:
+    """Paginación sobre ids ya filtrados en memoria (ver TaskColumns).
+
+    Misma interfaz que TaskPager: el filtro no pasa por SQLite y cada página
+    es una sola lectura por id. set_ids() cambia los ids tras una escritura
+    manteniendo la página actual.
+    """
+
+    def __init__(self, db, ids, page_size=200):
+        self.db = db
+        self.page_size = page_size
+        self.page = 0
+        self.rows = []
+        self.ids = ids
+
+    @property
+    def has_next(self):
+        return (self.page + 1) * self.page_size < len(self.ids)
+
+    @property
+    def pages(self):
+        return max(1, -(-len(self.ids) // self.page_size))
+
+    def set_ids(self, ids):
+        self.ids = ids
+        self.page = min(self.page, self.pages - 1)
+
+    def _fetch(self):
+        start = self.page * self.page_size
+        self.rows = self.db.get_tasks_by_ids(self.ids[start:start + self.page_size].tolist())
+        return self.rows
+
+    def first(self):
+        self.page = 0
+        return self._fetch()
+
+    def next(self):
+        if self.has_next:
+            self.page += 1
+        return self._fetch()
+
+    def previous(self):
+        if self.page > 0:
+            self.page -= 1
+        return self._fetch()
+
+    def reload(self):
+        return self._fetch()
+
+# ======================
+# ALMACÉN DE TAREAS EN MEMORIA
+# ======================
+class TaskStore:
+    """Colección de tareas en memoria con escritura directa a la base de datos.
+
+    Las tareas se indexan por id, de modo que agregar, editar o eliminar solo
+    toca la fila afectada en lugar de recargar toda la tabla. Los observadores
+    registrados con subscribe() reciben (acción, tarea) por cada cambio.
+    
+    add/update/delete escriben en la base y luego en memoria; los métodos
+    apply_* hacen solo la parte en memoria de una escritura que ya se hizo en
+    otro hilo (ver DatabaseExecutor).
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self._tasks = {}  # id -> tarea, en el mismo orden que la tabla
+        self._listeners = []
+
+    def load(self):
+        """Carga todas las tareas desde la base de datos (solo al iniciar)"""
+        self.replace(self.db.get_all_tasks())
+
+    def replace(self, tasks):
+        """Reemplaza el contenido sin notificar (tareas ya leídas de la base)"""
+        self._tasks = {task.id: task for task in tasks}
+
+    def subscribe(self, listener):
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        self._listeners.remove(listener)
+
+    def _notify(self, action, task):
+        for listener in self._listeners:
+            listener(action, task)
+
+    def __iter__(self):
+        return iter(self._tasks.values())
+
+    def __len__(self):
+        return len(self._tasks)
+
+    def __contains__(self, task_id):
+        return task_id in self._tasks
+
+    def get(self, task_id):
+        return self._tasks.get(task_id)
+
+    def reload(self):
+        """Vuelve a leer la tabla completa (tras una importación masiva)"""
+        self.load()
+        self._notify('reload', None)
+
+    def remember(self, tasks):
+        """Incorpora tareas leídas aparte (por ejemplo, una página) sin notificar"""
+        for task in tasks:
+            self._tasks[task.id] = task
+
+    def add(self, task):
+        return self.apply_add(self.db.add_task(task))
+
+    def update(self, task_id, updated_task):
+        self.db.update_task(task_id, updated_task)
+        return self.apply_update(task_id, updated_task)
+
+    def delete(self, task_id):
+        self.db.delete_task(task_id)
+        return self.apply_delete(task_id)
+
+    def apply_add(self, new_task):
+        self._tasks[new_task.id] = new_task
+        self._notify('add', new_task)
+        return new_task
+
+    def apply_update(self, task_id, updated_task):
+        task = updated_task.replace(id=task_id)
+        self._tasks[task_id] = task
+        self._notify('update', task)
+        return task
+
+    def apply_delete(self, task_id):
+        task = self._tasks.pop(task_id, None)
+        if task is not None:
+            self._notify('delete', task)
+        return task
+
+    def apply_changes(self, changes):
+        """Aplica cambios que otra instancia ya guardó (ver ChangeFeed).
+
+        changes son pares (id, tarea) con tarea None si se eliminó. Las
+        escrituras propias también vuelven por el registro: si la tarea en
+        memoria ya es igual no se notifica nada.
+        """
+        for task_id, task in changes:
+            current = self._tasks.get(task_id)
+            if task is None:
+                self._tasks.pop(task_id, None)
+                # En modo paginado el almacén no tiene todas las tareas, pero
+                # la caché columnar igual tiene que enterarse del borrado
+                self._notify('delete', current if current is not None
+                             else Task(task_id, "", "", NO_DUE_DATE, "media", "pendiente"))
+            elif current != task:
+                self._tasks[task_id] = task
+                self._notify('add' if current is None else 'update', task)
+
+# ======================
+# SINCRONIZACIÓN ENTRE INSTANCIAS
+# ======================
+class ChangeFeed:
+    """Sigue task_changes para enterarse de lo que escriben otras instancias.
+
+    poll() pide solo los cambios con seq mayor al último visto y los resume
+    en pares (id, tarea actual o None) para TaskStore.apply_changes. Devuelve
+    None cuando conviene recargar todo: si el atraso llega a batch_size
+    (por ejemplo, otra instancia importó un archivo) o si la compactación
+    ya borró cambios que esta instancia no vio. Cada compact_every consultas
+    borra del registro lo que tenga más de max_age segundos.
+    """
+
+    def __init__(self, db, batch_size=1000, compact_every=600, max_age=86400):
+        self.db = db
+        self.batch_size = batch_size
+        self.compact_every = compact_every
+        self.max_age = max_age
+        self.seq = None  # último cambio visto; None hasta la primera carga
+        self._polls = 0
+
+    def mark(self):
+        """Da por visto todo lo registrado hasta ahora (antes de una carga completa)"""
+        self.seq = self.db.change_seq()
+
+    def poll(self):
+        if self.seq is None:
+            return []
+        self._polls += 1
+        if self._polls % self.compact_every == 0:
+            self.db.compact_changes(self.max_age)
+        
+        rows = self.db.changes_since(self.seq, self.batch_size)
+        if not rows:
+            return []
+        if rows[0][0] != self.seq + 1 or len(rows) == self.batch_size:
+            self.mark()
+            return None
+        self.seq = rows[-1][0]
+        
+        # Solo importa el último estado de cada tarea
+        latest = {}
+        for _, task_id, task in rows:
+            latest[task_id] = task
+        return list(latest.items())
+# ======================
+# ACCESO ASÍNCRONO (asyncio)
+# ======================
+def _load_asyncio():
+    """Importa asyncio y el ejecutor de hilos solo cuando se usan.
+
+    La interfaz de Tk no los necesita y alargan el import del módulo.
+    """
+    global asyncio, ThreadPoolExecutor
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+
+
+class AsyncDatabaseManager:
+    """Las operaciones de DatabaseManager como corrutinas, para servicios asyncio.
+
+    Cada llamada corre en un ThreadPoolExecutor propio con un hilo por
+    conexión del pool, así el bucle de eventos nunca espera a SQLite. Un
+    semáforo limita las operaciones en vuelo a max_concurrency: el resto
+    espera su turno en el bucle sin llenar la cola del ejecutor. Si se
+    cancela la corrutina de una lectura, la consulta se interrumpe en SQLite
+    (ver DatabaseManager.cancellable). iter_batches() e iter_tasks() recorren
+    resultados grandes por lotes con keyset, sin tener toda la tabla en memoria.
+    """
+
+    def __init__(self, db_name="tasks.db", pool_size=5, max_concurrency=None, profile=None, db=None):
+        _load_asyncio()
+        self._owns_db = db is None
+        self.db = db if db is not None else DatabaseManager(db_name, pool_size=pool_size, profile=profile)
+        workers = self.db.pool.size
+        self.max_concurrency = max_concurrency or workers
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="adb")
+        self._limit = asyncio.Semaphore(self.max_concurrency)
+
+    async def _run(self, fn, *args, cancellable=False, **kwargs):
+        async with self._limit:
+            loop = asyncio.get_running_loop()
+            if not cancellable:
+                return await loop.run_in_executor(self._executor, lambda: fn(*args, **kwargs))
+            
+            cancelled = threading.Event()
+            def read():
+                with self.db.cancellable(cancelled):
+                    return fn(*args, **kwargs)
+            future = loop.run_in_executor(self._executor, read)
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # Cortar la consulta y liberar el hilo antes de soltar el semáforo
+                cancelled.set()
+                await asyncio.gather(future, return_exceptions=True)
+                raise
+
+    # ---------------------------
+    # Escrituras
+    # ---------------------------
+    async def add_task(self, task):
+        return await self._run(self.db.add_task, task)
+
+    async def add_tasks_bulk(self, tasks, chunk_size=1000):
+        return await self._run(self.db.add_tasks_bulk, tasks, chunk_size=chunk_size)
+
+    async def update_task(self, task_id, updated_task):
+        return await self._run(self.db.update_task, task_id, updated_task)
+
+    async def delete_task(self, task_id):
+        return await self._run(self.db.delete_task, task_id)
+
+    # ---------------------------
+    # Lecturas
+    # ---------------------------
+    async def get_all_tasks(self):
+        return await self._run(self.db.get_all_tasks, cancellable=True)
+
+    async def query_tasks(self, **filters):
+        return await self._run(self.db.query_tasks, cancellable=True, **filters)
+
+    async def count_tasks(self, **filters):
+        return await self._run(self.db.count_tasks, cancellable=True, **filters)
+
+    async def get_tasks_by_ids(self, ids):
+        return await self._run(self.db.get_tasks_by_ids, ids, cancellable=True)
+
+    async def search(self, query, limit=20):
+        return await self._run(self.db.search, query, limit, cancellable=True)
+
+    async def changes_since(self, seq, limit=1000):
+        return await self._run(self.db.changes_since, seq, limit, cancellable=True)
+
+    async def iter_batches(self, batch_size=1000, order_by="id", **filters):
+        """Listas de hasta batch_size tareas con los filtros de query_tasks.
+
+        Cada lote es una consulta indexada aparte (keyset), así que entre
+        lote y lote no queda ninguna conexión ni transacción abierta.
+        """
+        after = None
+        while True:
+            batch = await self.query_tasks(order_by=order_by, limit=batch_size, after=after, **filters)
+            if batch:
+                yield batch
+            if len(batch) < batch_size:
+                return
+            after = batch[-1]
+
+    async def iter_tasks(self, batch_size=1000, order_by="id", **filters):
+        async for batch in self.iter_batches(batch_size, order_by, **filters):
+            for task in batch:
+                yield task
+
+    def close(self):
+        """Espera las operaciones en curso y cierra el pool si es propio"""
+        self._executor.shutdown(wait=True)
+        if self._owns_db:
+            self.db.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+# ======================
+# IMPORTACIÓN MASIVA
+# ======================
+class TaskImporter:
+    """Importa tareas desde CSV o JSON Lines sin cargar el archivo en memoria.
+
+    Lee el archivo fila por fila, valida cada una con build_task y las inserta
+    en lotes con DatabaseManager.add_tasks_bulk dentro de una sola
+    transacción. Las filas inválidas se saltan y quedan en errors como
+    (línea, mensaje). progress recibe (filas leídas, filas por segundo).
+    """
+
+    FIELDS = ("title", "description", "due_date", "priority", "status", "tags")
+
+    def __init__(self, db, chunk_size=1000, progress=None):
+        self.db = db
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self.errors = []
+        self.read = 0
+        self.imported = 0
+        self.elapsed = 0.0
+
+    def import_file(self, path, file_format=None):
+        """Importa un archivo .csv o .jsonl y devuelve la cantidad de tareas nuevas"""
+        if file_format is None:
+            file_format = "csv" if path.lower().endswith(".csv") else "jsonl"
+        if file_format not in ("csv", "jsonl"):
+            raise ValueError(f"Formato no soportado: {file_format}")
+        
+        self.errors = []
+        self.read = 0
+        self._start = time.perf_counter()
+        with open(path, newline="", encoding="utf-8-sig") as file:
+            records = self._read_csv(file) if file_format == "csv" else self._read_jsonl(file)
+            self.imported = self.db.add_tasks_bulk(self._validated(records),
+                                                   chunk_size=self.chunk_size,
+                                                   progress=self._report)
+        self.elapsed = time.perf_counter() - self._start
+        return self.imported
+
+    @property
+    def rate(self):
+        """Filas por segundo de la última importación"""
+        return self.read / self.elapsed if self.elapsed else 0.0
+
+    def _read_csv(self, file):
+        # La línea 1 es el encabezado
+        for line, record in enumerate(csv.DictReader(file), start=2):
+            yield line, record
+
+    def _read_jsonl(self, file):
+        for line, text in enumerate(file, start=1):
+            if not text.strip():
+                continue
+            try:
+                record = json.loads(text)
+            except json.JSONDecodeError as error:
+                self.errors.append((line, f"JSON inválido: {error.msg}"))
+                continue
+            if not isinstance(record, dict):
+                self.errors.append((line, "Se esperaba un objeto JSON"))
+                continue
+            yield line, record
+
+    def _validated(self, records):
+        for line, record in records:
+            self.read += 1
+            values = {field: record.get(field) or "" for field in self.FIELDS}
+            for field, value in values.items():
+                if isinstance(value, list):
+                    values[field] = [str(item) for item in value]
+                elif not isinstance(value, str):
+                    values[field] = str(value)
+            values['priority'] = values['priority'] or "media"
+            values['status'] = values['status'] or "pendiente"
+            try:
+                yield build_task(**values)
+            except TaskValidationError as error:
+                self.errors.append((line, str(error)))
+
+    def _report(self, inserted):
+        if self.progress is not None:
+            elapsed = time.perf_counter() - self._start
+            self.progress(self.read, self.read / elapsed if elapsed else 0.0)
+
+
+def import_from_command_line(argv):
+    """python task_engine.py --import tareas.csv [--db tasks.db] [--chunk-size N]
+
+    "Final Code.py" acepta los mismos argumentos.
+    """
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Importa tareas sin abrir la ventana")
+    parser.add_argument("--import", dest="path", required=True, metavar="ARCHIVO",
+                        help="archivo .csv o .jsonl con las tareas")
+    parser.add_argument("--db", default="tasks.db")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args(argv)
+    
+    def show_progress(read, rate):
+        print(f"\r{read:,} filas leídas ({rate:,.0f} filas/s)", end="", flush=True)
+    
+    with DatabaseManager(args.db) as db:
+        importer = TaskImporter(db, chunk_size=args.chunk_size, progress=show_progress)
+        importer.import_file(args.path)
+    
+    print(f"\n{importer.imported:,} tareas importadas en {importer.elapsed:.2f} s ({importer.rate:,.0f} filas/s)")
+    for line, message in importer.errors:
+        print(f"línea {line}: {message}", file=sys.stderr)
+    return 1 if importer.errors else 0
+
+# ======================
+# MOTOR DE FILTROS
+# ======================
+class TaskFilter:
+    """Filtro compilado: los valores de los campos se normalizan una sola vez.
+
+    Reproduce exactamente la regla de la interfaz: "Todas" no filtra, y con
+    texto en etiquetas cada etiqueta de la tarea debe contener alguno de los
+    términos buscados (las tareas sin etiquetas siempre pasan).
+    """
+
+    def __init__(self, priority="Todas", status="Todas", tags=""):
+        self.priority = None if priority == "Todas" else priority
+        self.status = None if status == "Todas" else status
+        tags = tags.lower()
+        self.search_tags = [tag.strip() for tag in tags.split(",") if tag.strip()] if tags else None
+
+    def matches(self, task):
+        if self.priority is not None and task.priority != self.priority:
+            return False
+        if self.status is not None and task.status != self.status:
+            return False
+        if self.search_tags is not None:
+            task_tags = [tag.lower() for tag in task.tags]
+            if not all(any(st in tt for st in self.search_tags) for tt in task_tags):
+                return False
+        return True
+
+
+class FilterEngine:
+    """Índices en memoria para responder filtros sin recorrer todas las tareas.
+
+    Mantiene cubetas por prioridad y estado, un índice invertido etiqueta -> ids
+    y un índice de trigramas sobre el vocabulario de etiquetas para resolver
+    búsquedas por subcadena. Las consultas combinan los conjuntos por
+    intersección y los índices se actualizan con cada cambio del almacén.
+    """
+
+    GRAM = 3
+
+    def __init__(self, store=None):
+        self._store = None
+        self.clear()
+        if store is not None:
+            self.load(store)
+            self.attach(store)
+
+    def attach(self, store):
+        """Mantiene los índices al día con los cambios del almacén"""
+        self._store = store
+        store.subscribe(self.on_task_changed)
+
+    def detach(self):
+        if self._store is not None:
+            self._store.unsubscribe(self.on_task_changed)
+            self._store = None
+
+    def clear(self):
+        self._tasks = {}  # id -> tarea
+        self._tags_of = {}  # id -> etiquetas en minúsculas
+        self._by_priority = defaultdict(set)
+        self._by_status = defaultdict(set)
+        self._by_tag = defaultdict(set)  # etiqueta -> ids
+        self._untagged = set()
+        self._grams = defaultdict(set)  # trigrama -> etiquetas del vocabulario
+        self._term_cache = {}  # término -> etiquetas que lo contienen
+
+    def load(self, tasks):
+        for task in tasks:
+            self.add(task)
+
+    def on_task_changed(self, action, task):
+        if action == 'reload':
+            self.clear()
+            self.load(self._store)
+        elif action == 'add':
+            self.add(task)
+        elif action == 'update':
+            self.update(task)
+        elif action == 'delete':
+            self.remove(task.id)
+
+    # ---------------------------
+    # Mantenimiento de índices
+    # ---------------------------
+    def add(self, task):
+        self._tasks[task.id] = task
+        self._index(task)
+
+    def remove(self, task_id):
+        task = self._tasks.pop(task_id, None)
+        if task is not None:
+            self._unindex(task)
+
+    def update(self, task):
+        # Reemplazar en el mismo lugar para conservar el orden del almacén
+        old_task = self._tasks.get(task.id)
+        if old_task is None:
+            self.add(task)
+            return
+        self._unindex(old_task)
+        self._tasks[task.id] = task
+        self._index(task)
+
+    def _index(self, task):
+        task_id = task.id
+        tags = frozenset(tag.lower() for tag in task.tags)
+        self._tags_of[task_id] = tags
+        self._by_priority[task.priority].add(task_id)
+        self._by_status[task.status].add(task_id)
+        if not tags:
+            self._untagged.add(task_id)
+        for tag in tags:
+            if not self._by_tag[tag]:
+                self._add_vocabulary(tag)
+            self._by_tag[tag].add(task_id)
+
+    def _unindex(self, task):
+        task_id = task.id
+        tags = self._tags_of.pop(task_id)
+        self._by_priority[task.priority].discard(task_id)
+        self._by_status[task.status].discard(task_id)
+        self._untagged.discard(task_id)
+        for tag in tags:
+            postings = self._by_tag[tag]
+            postings.discard(task_id)
+            if not postings:
+                del self._by_tag[tag]
+                self._remove_vocabulary(tag)
+
+    def _grams_of(self, text):
+        return {text[i:i + self.GRAM] for i in range(len(text) - self.GRAM + 1)}
+
+    def _add_vocabulary(self, tag):
+        for gram in self._grams_of(tag):
+            self._grams[gram].add(tag)
+        for term, matches in self._term_cache.items():
+            if term in tag:
+                matches.add(tag)
+
+    def _remove_vocabulary(self, tag):
+        for gram in self._grams_of(tag):
+            self._grams[gram].discard(tag)
+            if not self._grams[gram]:
+                del self._grams[gram]
+        for matches in self._term_cache.values():
+            matches.discard(tag)
+
+    def _tags_containing(self, term):
+        """Etiquetas del vocabulario que contienen el término como subcadena"""
+        matches = self._term_cache.get(term)
+        if matches is None:
+            grams = self._grams_of(term)
+            if grams:
+                candidates = set.intersection(*(self._grams.get(gram, set()) for gram in grams))
+            else:
+                candidates = self._by_tag.keys()
+            matches = {tag for tag in candidates if term in tag}
+            self._term_cache[term] = matches
+        return matches
+
+    # ---------------------------
+    # Consultas
+    # ---------------------------
+    def _matching_vocabulary(self, search_tags):
+        """Etiquetas que contienen alguno de los términos buscados"""
+        vocabulary = set()
+        for term in search_tags:
+            vocabulary |= self._tags_containing(term)
+        return vocabulary
+
+    def _tag_matches(self, vocabulary):
+        """Ids cuyas etiquetas están todas dentro del vocabulario dado"""
+        result = set(self._untagged)
+        matched_postings = [self._by_tag[tag] for tag in vocabulary]
+        if sum(map(len, matched_postings)) <= len(self._tasks) - len(self._untagged):
+            # Pocas coincidencias: comprobar solo las tareas de esas etiquetas
+            for postings in matched_postings:
+                for task_id in postings:
+                    if self._tags_of[task_id] <= vocabulary:
+                        result.add(task_id)
+        else:
+            # Muchas coincidencias: descartar las tareas con alguna etiqueta ajena
+            failing = set()
+            for tag, postings in self._by_tag.items():
+                if tag not in vocabulary:
+                    failing |= postings
+            result |= self._tasks.keys() - self._untagged - failing
+        return result
+
+    def query(self, task_filter):
+        """Tareas que cumplen el filtro, en el mismo orden que el almacén"""
+        buckets = []
+        if task_filter.priority is not None:
+            buckets.append(self._by_priority.get(task_filter.priority, set()))
+        if task_filter.status is not None:
+            buckets.append(self._by_status.get(task_filter.status, set()))
+        buckets.sort(key=len)
+        ids = buckets[0].intersection(*buckets[1:]) if buckets else None
+        
+        if task_filter.search_tags is not None:
+            vocabulary = self._matching_vocabulary(task_filter.search_tags)
+            if ids is None:
+                ids = self._tag_matches(vocabulary)
+            else:
+                # Las cubetas ya acotaron los candidatos: basta comprobar cada uno
+                tags_of = self._tags_of
+                ids = {task_id for task_id in ids if tags_of[task_id] <= vocabulary}
+        
+        if ids is None:
+            return list(self._tasks.values())
+        return [self._tasks[task_id] for task_id in sorted(ids)]
+
+# ======================
+# CACHÉ COLUMNAR
+# ======================
+def _load_numpy():
+    """Importa numpy solo cuando se usa (gráfico o caché columnar)"""
+    global np
+    import numpy as np
+
+
+class TaskColumns:
+    """Copia columnar de la tabla tasks para filtrar y contar con numpy.
+
+    Prioridad y estado se guardan como códigos int8 (su índice en
+    PRIORITIES/STATUSES, -1 si es otro valor), la fecha límite como
+    datetime64[D] (NaT si no tiene) y las etiquetas en formato CSR: las
+    de la fila i son tag_values[tag_start[i]:tag_start[i] + tag_count[i]],
+    códigos de un vocabulario en minúsculas. Los filtros se resuelven con
+    máscaras booleanas sobre todas las filas, sin tocar objetos Python.
+
+    load() la llena en una sola pasada por lotes y on_task_changed() aplica
+    cada escritura en su lugar. Las filas se mantienen ordenadas por id; lo
+    borrado queda marcado y se compacta cuando supera la mitad.
+    """
+
+    PRIORITY_CODES = {priority: code for code, priority in enumerate(PRIORITIES)}
+    STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+    # Representación entera de NaT en datetime64
+    NAT_DAY = -2 ** 63
+
+    def __init__(self):
+        _load_numpy()
+        self.clear()
+
+    def clear(self):
+        self._size = 0
+        self._deleted = 0
+        self._ids = np.empty(0, dtype=np.int64)
+        self._priority = np.empty(0, dtype=np.int8)
+        self._status = np.empty(0, dtype=np.int8)
+        self._due = np.empty(0, dtype='datetime64[D]')
+        self._alive = np.empty(0, dtype=bool)
+        
+        self._tag_start = np.empty(0, dtype=np.int64)
+        self._tag_count = np.empty(0, dtype=np.int32)
+        self._tag_values = np.empty(0, dtype=np.int32)
+        self._tag_rows = np.empty(0, dtype=np.int64)  # fila de cada valor, -1 si quedó libre
+        self._tag_size = 0
+        self._tag_waste = 0
+        self._vocabulary = []  # código -> etiqueta en minúsculas
+        self._tag_codes = {}  # etiqueta en minúsculas -> código
+        self._codes_of = {}  # texto de la columna tags -> códigos
+        self._days_of = {}  # texto de la columna due_date -> día (NAT_DAY sin fecha)
+        self._term_cache = {}
+
+    def load(self, db, batch_size=50000):
+        """Llena las columnas recorriendo la tabla una vez, por lotes"""
+        self.clear()
+        for rows in db.iter_task_columns(batch_size):
+            self._append(rows)
+        return self
+
+    def __len__(self):
+        return self._size - self._deleted
+
+    # --- escritura ---
+
+    @staticmethod
+    def _grown(array, needed):
+        if needed <= len(array):
+            return array
+        grown = np.empty(max(needed, 2 * len(array), 1024), dtype=array.dtype)
+        grown[:len(array)] = array
+        return grown
+
+    def _tag_codes_for(self, text):
+        codes = self._codes_of.get(text)
+        if codes is None:
+            codes = []
+            for tag in {tag.lower() for tag in text.split(",")} if text else ():
+                code = self._tag_codes.get(tag)
+                if code is None:
+                    code = self._tag_codes[tag] = len(self._vocabulary)
+                    self._vocabulary.append(tag)
+                codes.append(code)
+            codes = self._codes_of[text] = tuple(sorted(codes))
+        return codes
+
+    def _day_for(self, text):
+        day = self._days_of.get(text)
+        if day is None:
+            due = Task.parse_due_date(text)
+            day = self._days_of[text] = self.NAT_DAY if due is None else due.toordinal() - EPOCH_ORDINAL
+        return day
+
+    def _append(self, rows):
+        """Agrega filas (id, due_date, priority, status, tags) al final"""
+        start, count = self._size, len(rows)
+        end = start + count
+        for name in ("_ids", "_priority", "_status", "_due", "_alive", "_tag_start", "_tag_count"):
+            setattr(self, name, self._grown(getattr(self, name), end))
+        
+        ids, dues, priorities, statuses, tags = zip(*rows)
+        self._ids[start:end] = ids
+        self._priority[start:end] = [self.PRIORITY_CODES.get(priority, -1) for priority in priorities]
+        self._status[start:end] = [self.STATUS_CODES.get(status, -1) for status in statuses]
+        for text in set(dues).difference(self._days_of):
+            self._day_for(text)
+        days = np.fromiter(map(self._days_of.__getitem__, dues), dtype=np.int64, count=count)
+        self._due[start:end] = days.view('datetime64[D]')
+        self._alive[start:end] = True
+        
+        codes = [self._tag_codes_for(text) for text in tags]
+        counts = np.fromiter(map(len, codes), dtype=np.int32, count=count)
+        values = np.fromiter((code for row in codes for code in row), dtype=np.int32, count=int(counts.sum()))
+        tag_start, tag_end = self._tag_size, self._tag_size + len(values)
+        self._tag_values = self._grown(self._tag_values, tag_end)
+        self._tag_rows = self._grown(self._tag_rows, tag_end)
+        self._tag_start[start:end] = tag_start + np.cumsum(counts) - counts
+        self._tag_count[start:end] = counts
+        self._tag_values[tag_start:tag_end] = values
+        self._tag_rows[tag_start:tag_end] = np.repeat(np.arange(start, end), counts)
+        self._tag_size = tag_end
+        
+        previous = self._ids[start - 1] if start else None
+        self._size = end
+        if previous is not None and ids[0] <= previous:
+            self._compact()  # fuera de orden: se reordena por id
+
+    def _row(self, task_id):
+        index = int(np.searchsorted(self._ids[:self._size], task_id))
+        if index < self._size and self._ids[index] == task_id and self._alive[index]:
+            return index
+        return None
+
+    def _release_tags(self, row):
+        start = self._tag_start[row]
+        self._tag_rows[start:start + self._tag_count[row]] = -1
+        self._tag_waste += int(self._tag_count[row])
+        self._tag_count[row] = 0
+
+    def add(self, task):
+        if self._row(task.id) is not None:
+            self.update(task)
+            return
+        self._append([(task.id, task.due_date, task.priority, task.status, ",".join(task.tags))])
+
+    def update(self, task):
+        row = self._row(task.id)
+        if row is None:
+            self.add(task)
+            return
+        self._priority[row] = self.PRIORITY_CODES.get(task.priority, -1)
+        self._status[row] = self.STATUS_CODES.get(task.status, -1)
+        self._due[row] = np.int64(self._day_for(task.due_date)).view('datetime64[D]')
+        
+        codes = self._tag_codes_for(",".join(task.tags))
+        start, count = self._tag_start[row], self._tag_count[row]
+        if tuple(self._tag_values[start:start + count]) == codes:
+            return
+        self._release_tags(row)
+        # Las etiquetas nuevas van al final de tag_values; la fila no se mueve
+        tag_start, tag_end = self._tag_size, self._tag_size + len(codes)
+        self._tag_values = self._grown(self._tag_values, tag_end)
+        self._tag_rows = self._grown(self._tag_rows, tag_end)
+        self._tag_values[tag_start:tag_end] = codes
+        self._tag_rows[tag_start:tag_end] = row
+        self._tag_start[row], self._tag_count[row] = tag_start, len(codes)
+        self._tag_size = tag_end
+        self._maybe_compact()
+
+    def delete(self, task_id):
+        row = self._row(task_id)
+        if row is None:
+            return
+        self._alive[row] = False
+        self._release_tags(row)
+        self._deleted += 1
+        self._maybe_compact()
+
+    def on_task_changed(self, action, task):
+        if action == 'add':
+            self.add(task)
+        elif action == 'update':
+            self.update(task)
+        elif action == 'delete':
+            self.delete(task.id)
+
+    def _maybe_compact(self):
+        if self._deleted > max(1024, self._size // 2) or self._tag_waste > max(1024, self._tag_size // 2):
+            self._compact()
+
+    def _compact(self):
+        """Descarta filas borradas y etiquetas libres, y ordena por id"""
+        size = self._size
+        rows = np.flatnonzero(self._alive[:size])
+        rows = rows[np.argsort(self._ids[:size][rows], kind='stable')]
+        
+        counts = self._tag_count[rows]
+        new_start = np.cumsum(counts) - counts
+        # Posición de origen de cada valor: inicio viejo + desplazamiento dentro de la fila
+        within = np.arange(int(counts.sum())) - np.repeat(new_start, counts)
+        values = self._tag_values[np.repeat(self._tag_start[rows], counts) + within]
+        
+        self._ids = self._ids[rows]
+        self._priority = self._priority[rows]
+        self._status = self._status[rows]
+        self._due = self._due[rows]
+        self._alive = np.ones(len(rows), dtype=bool)
+        self._tag_start = new_start.astype(np.int64)
+        self._tag_count = counts
+        self._tag_values = values
+        self._tag_rows = np.repeat(np.arange(len(rows)), counts)
+        self._size = len(rows)
+        self._tag_size = len(values)
+        self._deleted = 0
+        self._tag_waste = 0
+
+    # --- consultas ---
+
+    def _accepted_tags(self, terms):
+        """Por código de etiqueta: si contiene alguno de los términos"""
+        key = (tuple(terms), len(self._vocabulary))
+        accepted = self._term_cache.get(key)
+        if accepted is None:
+            accepted = np.fromiter((any(term in tag for term in terms) for tag in self._vocabulary),
+                                   dtype=bool, count=len(self._vocabulary))
+            self._term_cache = {key: accepted}  # el vocabulario solo crece: basta la última
+        return accepted
+
+    def mask(self, task_filter):
+        """Máscara de filas que cumplen el filtro (mismas reglas que TaskFilter)"""
+        size = self._size
+        mask = self._alive[:size].copy()
+        if task_filter.priority is not None:
+            mask &= self._priority[:size] == self.PRIORITY_CODES.get(task_filter.priority, -1)
+        if task_filter.status is not None:
+            mask &= self._status[:size] == self.STATUS_CODES.get(task_filter.status, -1)
+        if task_filter.search_tags is not None:
+            # Cada etiqueta de la tarea debe contener algún término
+            accepted = self._accepted_tags(task_filter.search_tags)
+            values = self._tag_values[:self._tag_size]
+            rows = self._tag_rows[:self._tag_size]
+            mask[rows[(rows >= 0) & ~accepted[values]]] = False
+        return mask
+
+    def isin(self, ids):
+        """Máscara de las filas cuyo id está en ids"""
+        return np.isin(self._ids[:self._size], ids)
+
+    def ids(self, mask):
+        """Ids de las filas de la máscara, en orden ascendente"""
+        return self._ids[:self._size][mask]
+
+    def count(self, mask=None):
+        return int(np.count_nonzero(self._alive[:self._size] if mask is None else mask))
+
+    def counts_by(self, field, mask=None):
+        """Cantidad de tareas por prioridad o por estado: {'alta': 10, ...}"""
+        if field == "priority":
+            codes, names = self._priority, PRIORITIES
+        elif field == "status":
+            codes, names = self._status, STATUSES
+        else:
+            raise ValueError(f"No se puede agrupar por {field!r}")
+        if mask is None:
+            mask = self._alive[:self._size]
+        selected = codes[:self._size][mask]
+        counts = np.bincount(selected[selected >= 0], minlength=len(names))
+        return dict(zip(names, counts.tolist()))
+
+    def due_days(self, mask):
+        """(días desde 1970-01-01 ordenados, código de prioridad) de las tareas con fecha"""
+        due = self._due[:self._size][mask]
+        dated = ~np.isnat(due)
+        days = due[dated].astype(np.int64)
+        codes = self._priority[:self._size][mask][dated].astype(np.int64)
+        order = np.argsort(days, kind='stable')
+        return days[order], codes[order]
+
+# ======================
+# DATOS DE GRÁFICOS Y CALENDARIO
+# ======================
+# Periodos del modo densidad: (nombre, días de rango hasta los que se usa)
+DENSITY_PERIODS = (("día", 120), ("semana", 1000), ("mes", None))
+
+
+def timeline_rows(tasks):
+    """(due_day, id, prioridad, título) de las tareas con fecha, por vencimiento"""
+    return sorted(((task.due_day, task.id, task.priority, task.title)
+                   for task in tasks if task.due is not None),
+                  key=lambda row: row[0])
+
+
+def density_bins(days, codes, start, end):
+    """Cuenta por periodo y prioridad las tareas entre los días start y end.
+
+    days son días desde 1970-01-01 en orden ascendente y codes el índice de
+    la prioridad de cada tarea en PRIORITIES (ver TaskColumns.due_days);
+    start y end pueden tener decimales, como los límites de un eje. El
+    periodo sale de DENSITY_PERIODS según el largo del rango. Devuelve
+    (periodo, tareas en el rango, primer día de cada periodo, días de cada
+    periodo, cantidades por periodo y prioridad). La última columna de
+    cantidades cuenta las prioridades desconocidas (código fuera de rango).
+    """
+    _load_numpy()
+    lo, hi = np.searchsorted(days, [np.floor(start), np.ceil(end)])
+    days, codes = days[lo:hi], codes[lo:hi]
+    
+    span = end - start
+    period = next(name for name, limit in DENSITY_PERIODS if limit is None or span <= limit)
+    if period == "día":
+        buckets, widths = days, np.ones(len(days))
+    elif period == "semana":
+        # 1970-01-05 fue lunes: las semanas empiezan en lunes
+        buckets = days - (days - 4) % 7
+        widths = np.full(len(days), 7.0)
+    else:
+        months = days.astype('datetime64[D]').astype('datetime64[M]')
+        buckets = months.astype('datetime64[D]').astype(np.int64)
+        widths = ((months + 1).astype('datetime64[D]').astype(np.int64) - buckets).astype(float)
+    
+    # Prioridad NULL o ajena (código -1): su propia columna, al final
+    levels = len(PRIORITIES) + 1
+    codes = np.where((codes >= 0) & (codes < len(PRIORITIES)), codes, len(PRIORITIES))
+    starts, first, inverse = np.unique(buckets, return_index=True, return_inverse=True)
+    counts = np.bincount(inverse * levels + codes, minlength=len(starts) * levels).reshape(-1, levels)
+    return period, hi - lo, starts, widths[first], counts
+
+
+class MonthDensityCache:
+    """Cantidad de tareas por día, calculada con una sola consulta por mes.
+
+    Cada mes se resuelve con un GROUP BY sobre el rango de due_day (usa su
+    índice) y queda en caché. Los meses vecinos se precargan en un hilo,
+    que toma su propia conexión del pool, para que navegar sea instantáneo.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.queries = 0  # consultas hechas desde el hilo principal
+        self._months = {}  # (año, mes) -> {fecha: cantidad}
+        self._versions = {}  # (año, mes) -> contador de invalidaciones
+        self._lock = threading.Lock()
+        self._requests = queue.Queue()
+        self._worker = None
+
+    def _query(self, year, month):
+        last_day = calendar.monthrange(year, month)[1]
+        return self.db.count_by_day(date(year, month, 1), date(year, month, last_day))
+
+    def get(self, year, month):
+        """Devuelve {'YYYY-MM-DD': cantidad} del mes, consultando solo si no está en caché"""
+        key = (year, month)
+        with self._lock:
+            counts = self._months.get(key)
+        if counts is None:
+            counts = self._query(year, month)
+            self.queries += 1
+            with self._lock:
+                self._months[key] = counts
+        return counts
+
+    def invalidate(self, date_str):
+        """Descarta el mes de una fecha 'YYYY-MM-DD' tras una escritura"""
+        day = Task.parse_due_date(date_str)
+        if day is None:
+            return
+        key = (day.year, day.month)
+        with self._lock:
+            self._months.pop(key, None)
+            self._versions[key] = self._versions.get(key, 0) + 1
+
+    def invalidate_all(self):
+        """Descarta todos los meses (cambios hechos por otra instancia)"""
+        with self._lock:
+            for key in self._months:
+                self._versions[key] = self._versions.get(key, 0) + 1
+            self._months.clear()
+
+    def prefetch(self, year, month):
+        """Precarga en segundo plano el mes anterior y el siguiente"""
+        previous = (year - 1, 12) if month == 1 else (year, month - 1)
+        following = (year + 1, 1) if month == 12 else (year, month + 1)
+        for key in (following, previous):
+            with self._lock:
+                if key in self._months:
+                    continue
+            self._requests.put(key)
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._prefetch_loop, daemon=True)
+            self._worker.start()
+
+    def _prefetch_loop(self):
+        while True:
+            key = self._requests.get()
+            with self._lock:
+                if key in self._months:
+                    continue
+                version = self._versions.get(key, 0)
+            counts = self._query(*key)
+            with self._lock:
+                # Si hubo una escritura mientras se consultaba, el dato es viejo
+                if self._versions.get(key, 0) == version:
+                    self._months[key] = counts
+
+# ======================
+# INSTRUMENTACIÓN
+# ======================
+def _rows_returned(result):
+    return {'filas': len(result)}
+
+
+def _one_row(result):
+    return {'filas': 1}
+
+
+class Profiler:
+    """Tiempos y contadores por etapa, para saber dónde se va el tiempo.
+
+    No hace nada hasta que se instrumenta un objeto: instrument() reemplaza
+    métodos de esa instancia por versiones que miden cada llamada, y
+    count_calls() cuenta llamadas (por ejemplo, items insertados en el
+    Treeview) dentro de las etapas abiertas en ese hilo. Por etapa se
+    guardan las últimas window duraciones para los percentiles y, aparte,
+    hasta max_events llamadas como eventos de Chrome trace (dump_trace).
+    Es seguro usarlo desde los hilos de DatabaseExecutor.
+    """
+
+    # Métodos de DatabaseManager medidos -> filas que tocó cada llamada
+    DB_METHODS = {
+        'add_task': _one_row,
+        'add_tasks_bulk': lambda inserted: {'filas': inserted},
+        'update_task': _one_row,
+        'delete_task': _one_row,
+        'get_all_tasks': _rows_returned,
+        'query_tasks': _rows_returned,
+        'count_tasks': None,
+        'get_tasks_by_ids': _rows_returned,
+        'search': _rows_returned,
+        'search_ids': _rows_returned,
+        'changes_since': _rows_returned,
+    }
+
+    def __init__(self, window=200, max_events=100000, trace_path=None):
+        self.window = window
+        self.trace_path = trace_path
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._durations = defaultdict(lambda: deque(maxlen=window))  # etapa -> ms recientes
+        self._calls = defaultdict(int)
+        self._last = {}  # etapa -> contadores de la última llamada
+        self._events = deque(maxlen=max_events)
+        self._threads = {}
+        self._origin = time.perf_counter()
+
+    def instrument(self, obj, methods, owner):
+        """Mide obj.método para cada nombre de methods como la etapa "owner.método".
+
+        methods puede ser un diccionario nombre -> función que recibe el
+        resultado y devuelve contadores para la llamada.
+        """
+        counters = methods if isinstance(methods, dict) else dict.fromkeys(methods)
+        for name, counter in counters.items():
+            setattr(obj, name, self._timed(f"{owner}.{name}", getattr(obj, name), counter))
+
+    def count_calls(self, obj, methods):
+        """Cuenta las llamadas a obj.método en las etapas abiertas: {método: contador}"""
+        for name, counter in methods.items():
+            method = getattr(obj, name)
+
+            @wraps(method)
+            def counted(*args, _method=method, _counter=counter, **kwargs):
+                for counters in getattr(self._local, 'stack', ()):
+                    counters[_counter] = counters.get(_counter, 0) + 1
+                return _method(*args, **kwargs)
+            setattr(obj, name, counted)
+
+    def _timed(self, stage, method, counter):
+        @wraps(method)
+        def timed(*args, **kwargs):
+            stack = self._local.__dict__.setdefault('stack', [])
+            counters = {}
+            stack.append(counters)
+            start = time.perf_counter()
+            try:
+                result = method(*args, **kwargs)
+            except BaseException as error:
+                stack.pop()
+                self.record(stage, start, time.perf_counter(), dict(counters, error=type(error).__name__))
+                raise
+            end = time.perf_counter()
+            stack.pop()
+            if counter is not None:
+                counters.update(counter(result))
+            self.record(stage, start, end, counters)
+            return result
+        return timed
+
+    def record(self, stage, start, end, counters=None):
+        """Registra una llamada medida con time.perf_counter()"""
+        thread = threading.current_thread()
+        with self._lock:
+            self._durations[stage].append((end - start) * 1000)
+            self._calls[stage] += 1
+            self._last[stage] = counters or {}
+            self._threads.setdefault(thread.ident, thread.name)
+            self._events.append((stage, start, end, thread.ident, counters))
+
+    @staticmethod
+    def _percentile(values, fraction):
+        return values[min(len(values) - 1, int(fraction * len(values)))]
+
+    def stats(self):
+        """{etapa: (llamadas, p50 ms, p95 ms, contadores de la última llamada)}"""
+        with self._lock:
+            recent = {stage: sorted(values) for stage, values in self._durations.items()}
+            calls, last = dict(self._calls), dict(self._last)
+        return {stage: (calls[stage], self._percentile(values, 0.5), self._percentile(values, 0.95), last[stage])
+                for stage, values in recent.items()}
+
+    def dump_trace(self, path):
+        """Escribe los eventos en formato Chrome trace (chrome://tracing, Perfetto)"""
+        pid = os.getpid()
+        with self._lock:
+            events = list(self._events)
+            threads = dict(self._threads)
+        trace = [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}}
+                 for tid, name in threads.items()]
+        trace.extend({'name': stage, 'cat': stage.split(".")[0], 'ph': 'X', 'pid': pid, 'tid': tid,
+                      'ts': (start - self._origin) * 1e6, 'dur': (end - start) * 1e6, 'args': counters or {}}
+                     for stage, start, end, tid, counters in events)
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({'traceEvents': trace, 'displayTimeUnit': 'ms'}, file)
+        return len(events)
+
+# ======================
+# GESTOR SIN INTERFAZ
+# ======================
+class TaskEngine:
+    """Base, almacén, filtros y paginación del gestor, sin widgets.
+
+    Las vistas leen sus controles y le pasan valores simples (textos, un
+    TaskFilter). Con más de PAGED_MODE_THRESHOLD tareas no se carga la tabla
+    en memoria: los filtros se resuelven sobre TaskColumns y cada página se
+    lee de SQLite.
+
+    read_tasks(), read_columns() y poll_changes() solo leen la base y pueden
+    correr en otro hilo; su resultado se instala con install_tasks(),
+    install_columns() y tasks.apply_changes() desde el hilo dueño del
+    almacén, porque sus oyentes actualizan la vista. load() y sync() hacen
+    las dos partes de una vez, para scripts y servidores.
+    """
+
+    # A partir de este tamaño la lista se pagina desde SQLite en lugar de
+    # cargar toda la tabla en memoria
+    PAGED_MODE_THRESHOLD = 100000
+    PAGE_SIZE = 200
+
+    def __init__(self, db_name="tasks.db", db=None):
+        self.db = db if db is not None else DatabaseManager(db_name)
+        self.tasks = TaskStore(self.db)
+        # Cambios que hacen otras instancias sobre la misma base
+        self.change_feed = ChangeFeed(self.db)
+        self.paged = self.db.has_more_than(self.PAGED_MODE_THRESHOLD)
+        self.filter_engine = None  # índices en memoria, tras install_tasks()
+        self.columns = None  # caché columnar del modo paginado, tras install_columns()
+        # Último filtro resuelto
+        self.search_ids = None  # ids por relevancia de la búsqueda de texto
+        self.pager = None
+        self.column_filter = None
+        self.column_mask = None
+        # Se suscribe antes que la vista: la caché ya está al día cuando le llega el cambio
+        self.tasks.subscribe(self._on_task_changed)
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @property
+    def ready(self):
+        """True cuando terminó la carga inicial"""
+        return (self.columns if self.paged else self.filter_engine) is not None
+
+    def _on_task_changed(self, action, task):
+        if self.columns is not None:
+            self.columns.on_task_changed(action, task)
+
+    # ---------------------------
+    # Carga y sincronización
+    # ---------------------------
+    def read_tasks(self):
+        """Lee todas las tareas y arma los índices de filtros"""
+        # Los cambios registrados desde aquí se verán en el próximo poll_changes()
+        self.change_feed.mark()
+        tasks = self.db.get_all_tasks()
+        engine = FilterEngine()
+        engine.load(tasks)
+        return tasks, engine
+
+    def install_tasks(self, result):
+        tasks, engine = result
+        if self.filter_engine is not None:
+            self.filter_engine.detach()
+        self.tasks.replace(tasks)
+        self.filter_engine = engine
+        engine.attach(self.tasks)
+
+    def read_columns(self):
+        """Construye la caché columnar (modo paginado)"""
+        self.change_feed.mark()
+        Task.clear_caches()
+        return TaskColumns().load(self.db)
+
+    def install_columns(self, columns):
+        self.columns = columns
+
+    def load(self):
+        """Carga inicial completa en el hilo actual"""
+        if self.paged:
+            self.install_columns(self.read_columns())
+        else:
+            self.install_tasks(self.read_tasks())
+        return self
+
+    def poll_changes(self):
+        """Cambios de otras instancias para tasks.apply_changes(); None si conviene recargar"""
+        return self.change_feed.poll()
+
+    def sync(self):
+        """Aplica en el hilo actual lo que escribieron otras instancias"""
+        changes = self.poll_changes()
+        if changes is None:
+            self.load()
+        else:
+            self.tasks.apply_changes(changes)
+
+    # ---------------------------
+    # Escritura
+    # ---------------------------
+    def get(self, task_id):
+        """La tarea con ese id, de memoria o de la base si no está cargada"""
+        task = self.tasks.get(task_id)
+        if task is None:
+            found = self.db.get_tasks_by_ids([task_id])
+            task = found[0] if found else None
+        return task
+
+    def add_task(self, title, description="", due_date="", priority="media", status="pendiente", tags="",
+                 allow_past=False):
+        """Valida con build_task y guarda; TaskValidationError si los datos no sirven"""
+        return self.tasks.add(build_task(title, description, due_date, priority, status, tags, allow_past))
+
+    def update_task(self, task_id, title, description="", due_date="", priority="media", status="pendiente",
+                    tags="", allow_past=False):
+        return self.tasks.update(task_id, build_task(title, description, due_date, priority, status, tags,
+                                                     allow_past))
+
+    def delete_task(self, task_id):
+        self.tasks.delete(task_id)
+
+    # ---------------------------
+    # Consultas
+    # ---------------------------
+    @staticmethod
+    def sql_filters(task_filter, text=None):
+        """Argumentos de query_tasks equivalentes a un filtro y un texto de búsqueda"""
+        return {'priority': task_filter.priority, 'status': task_filter.status,
+                'tag_terms': task_filter.search_tags, 'text': text or None}
+
+    def query(self, task_filter, text=None, **options):
+        """Resuelve el filtro en SQLite; options son el resto de argumentos de query_tasks"""
+        return self.db.query_tasks(**self.sql_filters(task_filter, text), **options)
+
+    def select(self, task_filter, search_ids=None):
+        """Tareas del filtro con los índices en memoria.
+
+        search_ids (ver DatabaseManager.search_ids) restringe el resultado y
+        lo ordena por relevancia.
+        """
+        self.search_ids = search_ids
+        tasks = self.filter_engine.query(task_filter)
+        if search_ids is not None:
+            by_id = {task.id: task for task in tasks}
+            tasks = [by_id[task_id] for task_id in search_ids if task_id in by_id]
+        return tasks
+
+    def find(self, task_filter, text=None):
+        """Tareas del filtro y del texto de búsqueda, en memoria si están cargadas"""
+        if self.filter_engine is None:
+            return self.query(task_filter, text)
+        return self.select(task_filter, self.db.search_ids(text) if text else None)
+
+    # ---------------------------
+    # Paginación (modo paginado)
+    # ---------------------------
+    def page_sql(self, task_filter, text=None):
+        """Filtra, ordena y pagina en SQLite mientras se construye la caché"""
+        self.search_ids = None
+        self.pager = TaskPager(self.db, self.PAGE_SIZE, **self.sql_filters(task_filter, text))
+        return self.pager
+
+    def page_columns(self, task_filter, search_ids=None):
+        """Filtra con máscaras en memoria; SQLite solo lee la página visible"""
+        self.column_filter = task_filter
+        self.search_ids = search_ids
+        self.pager = ColumnPager(self.db, self._column_ids(), self.PAGE_SIZE)
+        return self.pager
+
+    def refresh_columns(self):
+        """Recalcula los ids del filtro actual tras una escritura"""
+        # Con una búsqueda en curso todavía está el TaskPager: la respuesta
+        # instala el ColumnPager y el filtro
+        if not isinstance(self.pager, ColumnPager) or self.column_filter is None:
+            return
+        self.pager.set_ids(self._column_ids())
+
+    def _column_ids(self):
+        self.column_mask = self.columns.mask(self.column_filter)
+        ids = self.columns.ids(self.column_mask)
+        if self.search_ids is not None:
+            ranked = np.asarray(self.search_ids, dtype=np.int64)
+            self.column_mask &= self.columns.isin(ranked)
+            ids = ranked[np.isin(ranked, ids)]
+        return ids
+
+    def due_days(self):
+        """(días, códigos de prioridad) del filtro actual, para el modo densidad"""
+        return self.columns.due_days(self.column_mask)
+
+
+if __name__ == "__main__":
+    sys.exit(import_from_command_line(sys.argv[1:]))
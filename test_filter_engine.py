@@ -0,0 +1,160 @@
+# Equivalencia de FilterEngine con el recorrido original de apply_filters
+#
+#   python -m pytest -q test_filter_engine.py
+
+import random
+import sqlite3
+from datetime import date
+
+import pytest
+
+from task_engine import DatabaseManager, FilterEngine, PRIORITIES, STATUSES, Task, TaskFilter, TaskStore
+
+# Etiquetas que se contienen unas a otras y con mayúsculas, para que los
+# términos de búsqueda coincidan por subcadena con varias a la vez
+TAGS = ("casa", "Casa", "cas", "trabajo", "trabajos", "bajo", "ab", "urgente", "Urgente-hoy",
+        "x", "ñandú", "estudio")
+SEARCHES = ("", ", ", "cas", "CASA", "ab", "bajo, urg", "a", "x", "hoy", "ñan", "trabajos",
+            "estudio, casa, ab", "zzz", "as,  ", "urgente")
+
+
+def old_apply_filters(tasks, priority_filter, status_filter, tags_filter):
+    """El bucle de TaskManager.apply_filters antes de FilterEngine"""
+    tags_filter = tags_filter.lower()
+    filtered_tasks = []
+    for task in tasks:
+        if priority_filter != "Todas" and task.priority != priority_filter:
+            continue
+        if status_filter != "Todas" and task.status != status_filter:
+            continue
+        if tags_filter:
+            task_tags = [tag.lower() for tag in (task.tags or [])]
+            search_tags = [tag.strip().lower() for tag in tags_filter.split(",") if tag.strip()]
+            if not all(any(st in tt for st in search_tags) for tt in task_tags):
+                continue
+        filtered_tasks.append(task)
+    return filtered_tasks
+
+
+def random_task(rng):
+    return Task(None, f"Tarea {rng.randrange(1000)}", "", "2030-01-01",
+                rng.choice(PRIORITIES), rng.choice(STATUSES),
+                rng.sample(TAGS, rng.choice((0, 0, 1, 1, 2, 3))))
+
+
+def random_filter(rng):
+    return (rng.choice(("Todas",) * 3 + PRIORITIES),
+            rng.choice(("Todas",) * 3 + STATUSES),
+            rng.choice(SEARCHES))
+
+
+def assert_same(engine, store, filters):
+    expected = old_apply_filters(store, *filters)
+    assert engine.query(TaskFilter(*filters)) == expected, filters
+
+
+@pytest.fixture
+def store():
+    db = DatabaseManager(":memory:")
+    yield TaskStore(db)
+    db.close()
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_query_matches_old_loop_across_writes(store, seed):
+    rng = random.Random(seed)
+    for _ in range(40):
+        store.add(random_task(rng))
+    engine = FilterEngine(store)
+
+    for _ in range(400):
+        ids = [task.id for task in store]
+        action = rng.random()
+        if action < 0.4 or not ids:
+            store.add(random_task(rng))
+        elif action < 0.75:
+            task_id = rng.choice(ids)
+            changes = rng.choice((
+                {'tags': rng.sample(TAGS, rng.choice((0, 1, 2)))},
+                {'priority': rng.choice(PRIORITIES)},
+                {'status': rng.choice(STATUSES)},
+            ))
+            store.update(task_id, store.get(task_id).replace(**changes))
+        else:
+            store.delete(rng.choice(ids))
+        # Varias consultas por escritura: los términos quedan en _term_cache
+        # y tienen que seguir al día cuando cambia el vocabulario
+        for _ in range(3):
+            assert_same(engine, store, random_filter(rng))
+
+    for filters in ((p, s, t) for p in ("Todas",) + PRIORITIES for s in ("Todas",) + STATUSES
+                    for t in SEARCHES):
+        assert_same(engine, store, filters)
+
+
+def test_vocabulary_follows_last_tag_removed(store):
+    engine = FilterEngine(store)
+    task = store.add(Task(None, "a", "", "2030-01-01", "alta", "pendiente", ["trabajo"]))
+    assert_same(engine, store, ("Todas", "Todas", "abaj"))
+
+    # La única tarea con la etiqueta la pierde: el término cacheado ya no la trae
+    store.update(task.id, task.replace(tags=["casa"]))
+    assert_same(engine, store, ("Todas", "Todas", "abaj"))
+    assert engine.query(TaskFilter(tags="abaj")) == []
+
+    store.delete(task.id)
+    store.add(Task(None, "b", "", "2030-01-01", "baja", "pendiente", ["Trabajos"]))
+    assert_same(engine, store, ("Todas", "Todas", "abaj"))
+    assert_same(engine, store, ("Todas", "Todas", "casa"))
+
+
+def test_reload_rebuilds_indexes(store):
+    rng = random.Random(99)
+    engine = FilterEngine(store)
+    for _ in range(30):
+        store.add(random_task(rng))
+    # Escritura por fuera del almacén y recarga completa (importación masiva)
+    store.db.add_tasks_bulk(random_task(rng) for _ in range(30))
+    store.reload()
+    for filters in ((p, "Todas", t) for p in ("Todas",) + PRIORITIES for t in SEARCHES):
+        assert_same(engine, store, filters)
+
+
+def test_sql_tag_filter_matches_rows_written_elsewhere(tmp_path):
+    # Las otras aplicaciones que comparten tasks.db solo escriben tasks.tags
+    db = DatabaseManager(str(tmp_path / "tasks.db"))
+    rng = random.Random(7)
+    with sqlite3.connect(db.db_name) as conn:
+        for _ in range(60):
+            task = random_task(rng)
+            conn.execute("INSERT INTO tasks (title, description, due_date, priority, status, tags) "
+                         "VALUES (?, ?, ?, ?, ?, ?)", (task.title, "", task.due_date, task.priority,
+                                                       task.status, " , ".join(task.tags)))
+        for task_id in rng.sample(range(1, 61), 20):
+            conn.execute("UPDATE tasks SET tags = ? WHERE id = ?",
+                         (",".join(rng.sample(TAGS, rng.choice((0, 1, 2)))), task_id))
+    tasks = db.get_all_tasks()
+    for search in SEARCHES:
+        task_filter = TaskFilter(tags=search)
+        if task_filter.search_tags is None:
+            continue
+        expected = [task.id for task in tasks if task_filter.matches(task)]
+        assert [task.id for task in db.query_tasks(tag_terms=task_filter.search_tags)] == expected, search
+    db.close()
+
+
+def test_migration_pads_unpadded_due_dates(tmp_path):
+    db = DatabaseManager(str(tmp_path / "tasks.db"))
+    db.close()
+    # Fila escrita antes de build_task, en una base con el esquema 6
+    with sqlite3.connect(db.db_name) as conn:
+        conn.execute("INSERT INTO tasks (title, due_date, priority, status) "
+                     "VALUES ('a', '2030-1-7', 'alta', 'pendiente')")
+        conn.execute("PRAGMA user_version = 6")
+    db = DatabaseManager(db.db_name)
+    [task] = db.get_all_tasks()
+    assert task.due_date == "2030-01-07"
+    assert task.due == date(2030, 1, 7)
+    with sqlite3.connect(db.db_name) as conn:
+        assert conn.execute("SELECT due_day FROM tasks").fetchone()[0] is not None
+    db.close()